@@ -1,16 +1,51 @@
 """AI client for managing API configuration and model interactions."""
 
 import os
-import google.generativeai as genai
-import requests
-from google.auth.transport.requests import Request as GoogleAuthRequest
+import time
+from functools import lru_cache
 from dotenv import load_dotenv
-from config import GEMINI_MODEL, API_KEY_ENV_VAR, PROXY_ENV_VAR
+from config import (
+    GEMINI_MODEL,
+    API_KEY_ENV_VAR,
+    PROXY_ENV_VAR,
+    GEMINI_API_ENDPOINT,
+    GEMINI_REQUESTS_PER_MINUTE,
+    MODEL_ROUTES,
+    MODEL_PRICES,
+)
+from ai.usage import check_budget, record_usage
+from utils.metrics import incr, registry
+from utils.rate_limit import RateLimiter
+from utils.text import estimate_tokens
 
 class ApiKeyError(Exception):
     """Exception raised when API key is missing."""
     pass
 
+class AITimeoutError(Exception):
+    """Exception raised when a model call exceeds its time budget."""
+    pass
+
+@lru_cache(maxsize=None)
+def fallback_errors():
+    """Return the errors after which the next model of a route is tried, with their reasons."""
+    from google.api_core import exceptions as google_exceptions
+
+    return {
+        google_exceptions.TooManyRequests: "quota",
+        google_exceptions.ServiceUnavailable: "unavailable",
+        AITimeoutError: "timeout",
+    }
+
+def route_for(task):
+    """Return the models to try, in order, for a task type."""
+    return MODEL_ROUTES.get(task) or MODEL_ROUTES.get("default") or [GEMINI_MODEL]
+
+def estimate_cost(model_name, prompt_tokens, response_tokens):
+    """Return the estimated USD cost of a call, or 0 for unpriced models."""
+    prompt_price, response_price = MODEL_PRICES.get(model_name, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + response_tokens * response_price) / 1_000_000
+
 class AIClient:
     """
     Handle AI API configuration and request management.
@@ -24,8 +59,11 @@ class AIClient:
             web_mode: If True, throws exceptions instead of calling exit()
         """
         self.model = None
+        self.models = {}
         self.configured = False
         self.web_mode = web_mode
+        # Shared by every edition and thread using this client
+        self.rate_limiter = RateLimiter(GEMINI_REQUESTS_PER_MINUTE)
         self.configure()
     
     def configure(self):
@@ -36,6 +74,10 @@ class AIClient:
             ApiKeyError: If no API key is found (in web mode)
             SystemExit: If no API key is found (in CLI mode)
         """
+        # The Gemini SDK takes most of a second to import, so it is only
+        # loaded once a client is needed (see benchmarks.startup)
+        import google.generativeai as genai
+
         load_dotenv()
         api_key = os.getenv(API_KEY_ENV_VAR)
         proxy_url = os.getenv(PROXY_ENV_VAR)
@@ -57,33 +99,144 @@ class AIClient:
                 'http': proxy_url,
                 'https': proxy_url,
             }
+            import requests
+            from google.auth.transport.requests import Request as GoogleAuthRequest
+
             session = requests.Session()
             session.proxies = proxies
             transport = GoogleAuthRequest(session=session)
 
-        genai.configure(api_key=api_key, transport=transport)
+        if GEMINI_API_ENDPOINT:
+            print(f"Using custom Gemini API endpoint: {GEMINI_API_ENDPOINT}")
+            genai.configure(
+                api_key=api_key,
+                transport="rest",
+                client_options={"api_endpoint": GEMINI_API_ENDPOINT}
+            )
+        else:
+            genai.configure(api_key=api_key, transport=transport)
         self.model = genai.GenerativeModel(GEMINI_MODEL)
+        self.models = {GEMINI_MODEL: self.model}
         self.configured = True
+
+    def model_for(self, model_name):
+        """Return the (cached) model object for ``model_name``."""
+        if model_name not in self.models:
+            import google.generativeai as genai
+
+            self.models[model_name] = genai.GenerativeModel(model_name)
+        return self.models[model_name]
         
-    def generate_content(self, prompt):
+    def generate_content(self, prompt, timeout=None, task="default"):
         """
-        Generate content using the AI model.
+        Generate content using the model routed for ``task``.
+        
+        The models configured for the task in ``MODEL_ROUTES`` are tried in
+        order; quota exhaustion, unavailability or a timeout moves on to the
+        next one. Each attempt gets an equal share of what is left of the
+        ``timeout`` budget, so a model that times out still leaves time for
+        its fallbacks; the last one gets all of it. Every call is recorded
+        in the usage ledger and checked against the token budgets first.
         
         Args:
             prompt: The prompt to send to the model
+            timeout: Optional request timeout in seconds
+            task: Task type, e.g. "selection", "summary" or "qa"
             
         Returns:
             Response from the model
             
         Raises:
+            AITimeoutError: If the last model of the route times out
+            BudgetExceededError: If the call would exceed a token budget
             Exception: If API call fails
         """
         if not self.configured:
             self.configure()
-            
+
+        check_budget(estimate_tokens(prompt if isinstance(prompt, str) else str(prompt)), task)
+
+        models = route_for(task)
+        expires_at = time.monotonic() + timeout if timeout is not None else None
+        for attempt, model_name in enumerate(models):
+            attempt_timeout = None
+            if expires_at is not None:
+                remaining = expires_at - time.monotonic()
+                if remaining <= 0:
+                    raise AITimeoutError(f"No time left to try {model_name} for {task}")
+                attempt_timeout = remaining / (len(models) - attempt)
+            try:
+                return self._call_model(model_name, prompt, attempt_timeout, task)
+            except tuple(fallback_errors()) as e:
+                reason = next(r for error, r in fallback_errors().items() if isinstance(e, error))
+                if attempt == len(models) - 1:
+                    raise
+                incr("llm_fallbacks_total", task=task, model=model_name, reason=reason)
+                print(f"WARNING: {model_name} failed for {task} ({reason}); falling back to {models[attempt + 1]}.")
+
+    # Internal helpers -------------------------------------------------
+
+    def _call_model(self, model_name, prompt, timeout, task):
+        """Make one model call and record latency, tokens and cost for its route."""
+        import requests
+        from google.api_core import exceptions as google_exceptions
+
+        self.rate_limiter.acquire()
+        start = time.perf_counter()
+        request_options = {"timeout": timeout} if timeout is not None else None
         try:
-            response = self.model.generate_content(prompt)
-            return response
+            response = self.model_for(model_name).generate_content(prompt, request_options=request_options)
+        except (google_exceptions.DeadlineExceeded, requests.exceptions.Timeout) as e:
+            incr("llm_errors_total", error="timeout", task=task, model=model_name)
+            record_usage(task, model_name, 0, 0, time.perf_counter() - start, 0.0, status="timeout")
+            print(f"ERROR in AI generation: {model_name} timed out after {timeout}s")
+            raise AITimeoutError(f"Model call timed out after {timeout}s") from e
         except Exception as e:
+            incr("llm_errors_total", error=type(e).__name__, task=task, model=model_name)
+            record_usage(task, model_name, 0, 0, time.perf_counter() - start, 0.0, status=type(e).__name__)
             print(f"ERROR in AI generation: {e}")
             raise
+        finally:
+            registry.observe(
+                "llm_request_duration_seconds", time.perf_counter() - start, task=task, model=model_name
+            )
+
+        latency = time.perf_counter() - start
+        incr("llm_requests_total", task=task, model=model_name)
+        prompt_tokens = response_tokens = 0
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+            response_tokens = getattr(usage, "candidates_token_count", 0) or 0
+        cost = estimate_cost(model_name, prompt_tokens, response_tokens)
+        incr("llm_tokens_total", prompt_tokens, type="prompt", task=task, model=model_name)
+        incr("llm_tokens_total", response_tokens, type="response", task=task, model=model_name)
+        incr("llm_cost_usd_total", cost, task=task, model=model_name)
+        record_usage(task, model_name, prompt_tokens, response_tokens, latency, cost)
+        return response
+
+    def start_session(self, newsletter_data=None, session_path=None):
+        """
+        Start or resume a multi-turn Q&A session.
+        
+        Args:
+            newsletter_data: Collected newsletter data (needed for new sessions)
+            session_path: File the session is persisted to; an existing file
+                is resumed without re-ingesting the newsletter
+            
+        Returns:
+            QASession instance
+            
+        Raises:
+            ValueError: If there is neither a saved session nor newsletter data
+        """
+        from ai.session import QASession
+
+        if session_path is not None and session_path.exists():
+            print(f"Resuming Q&A session from {session_path}")
+            return QASession.load(self, session_path)
+
+        if newsletter_data is None:
+            raise ValueError("Newsletter data is required to start a new Q&A session.")
+
+        return QASession.from_newsletter_data(self, newsletter_data, path=session_path)
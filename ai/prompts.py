@@ -40,61 +40,125 @@ def create_article_selection_prompt(links, newsletter_text, max_chars=None):
     
     return prompt
 
-def create_summary_prompt(newsletter_data, date):
+def create_summary_prompt(newsletter_data, date, topics=None, max_chars=None):
     """
     Create a prompt for newsletter summarization.
     
     Args:
         newsletter_data: Dictionary with newsletter content and links
         date: The newsletter date
+        topics: Optional topic descriptions the reader is interested in
+        max_chars: Content limit (defaults to SUMMARY_CONTENT_MAX_CHARS)
         
     Returns:
         A prompt string for summarization
     """
     content = truncate_text(
         newsletter_data['content'], 
-        SUMMARY_CONTENT_MAX_CHARS
+        SUMMARY_CONTENT_MAX_CHARS if max_chars is None else max_chars
     )
+    edition_name = newsletter_data.get('edition_name', 'TLDR AI')
+    briefing_title = newsletter_data.get('briefing_title', 'AI News Briefing')
+    
+    prompt = _briefing_instructions(edition_name, briefing_title, date) + f"""
+    NEWSLETTER CONTENT:
+    {content}
+    """
+    prompt += _topic_focus(topics)
+    
+    return prompt
+
+def create_article_summary_prompt(url, content):
+    """
+    Create a short prompt that summarises one article (map step).
     
+    Args:
+        url: The article URL
+        content: Extracted article text
+        
+    Returns:
+        A prompt string for a single article summary
+    """
     prompt = f"""
-    Create a strategic AI news briefing for IT Specialists, Businessmen, and Programmers based on this TLDR AI newsletter. from {date}.
+    Summarise this article for an AI news briefing in 3-5 sentences.
+    Keep company and product names, numbers, dates and technical details; skip marketing language.
+    Answer in plain English text without markup.
 
-    CRITICAL: Preserve the actual news content - specific company names, product launches, research findings, and concrete developments. Don't turn everything into abstract concepts.
+    URL: {url}
 
-    For each significant news item, provide:
+    ARTICLE:
+    {content}
+    """
+    
+    return prompt
 
-    <b>🔹 [Specific headline - use actual company/product names]</b>
+def create_reduce_summary_prompt(newsletter_data, article_summaries, date, topics=None):
+    """
+    Create a prompt that assembles the briefing from article summaries (reduce step).
+    
+    Args:
+        newsletter_data: Dictionary with newsletter text and edition details
+        article_summaries: List of dictionaries with url and summary
+        date: The newsletter date
+        topics: Optional topic descriptions the reader is interested in
+        
+    Returns:
+        A prompt string for summarization
+    """
+    edition_name = newsletter_data.get('edition_name', 'TLDR AI')
+    briefing_title = newsletter_data.get('briefing_title', 'AI News Briefing')
+    notes = "\n\n".join(
+        f"    - {item['url']}\n      {item['summary'].strip()}" for item in article_summaries
+    ) or "    (no article summaries available)"
+    
+    prompt = _briefing_instructions(edition_name, briefing_title, date) + f"""
+    NEWSLETTER CONTENT:
+    {newsletter_data['newsletter_text']}
 
-    <b>Что произошло:</b> [Detailed factual summary - provide comprehensive context about who did what, when, how, and with what specific details. For unfamiliar companies or concepts, include brief definitions (e.g., "CoreWeave, a cloud service provider specializing in AI infrastructure, announced..."). Include technical specifications, timelines, and background context.]
+    ARTICLE SUMMARIES (one per selected article):
+{notes}
+    """
+    prompt += _topic_focus(topics)
+    
+    return prompt
 
-    <b>Почему важно:</b> [Explain the strategic importance AND what specific problem this solves or opportunity it creates. Address both immediate business impact and longer-term implications for AI/ML teams and competitive positioning.]
+def create_weekly_digest_prompt(material, week_label, edition_name="TLDR AI", briefing_title="AI News Briefing"):
+    """
+    Create a prompt for the weekly digest from compact per-day story lists.
+    
+    Args:
+        material: Deduplicated stories grouped by day (see newsletter.digest)
+        week_label: Human-readable week, e.g. "2025-06-09 – 2025-06-13"
+        edition_name: Name of the TLDR edition
+        briefing_title: Title used in the briefing header
+        
+    Returns:
+        A prompt string for the weekly digest
+    """
+    prompt = f"""
+    Create a "week in review" briefing for IT Specialists, Businessmen, and Programmers from the {edition_name} daily briefings of {week_label}.
+    The stories below are already deduplicated; "also covered" marks stories that developed over several days.
 
-    <b>Действия:</b> [Specific next steps - evaluate, pilot, monitor, invest, or ignore - with clear rationale]
+    Pick the 5-7 developments that matter most for the week and connect related stories into one item where it helps.
 
-    WRITING GUIDELINES:
-    - Use actual company names (OpenAI, Google, Microsoft, Anthropic, etc.)
-    - For lesser-known companies, provide brief context (e.g., "Sakana AI, a Tokyo-based AI research company,...")
-    - Include specific products, features, numbers, dates, and technical details
-    - Preserve research findings and their implications
-    - Make "What Happened" sections comprehensive - don't just summarize, provide full context
-    - In "Why It Matters", always explain what problem is being solved or opportunity created
-    - Выдавать пользователю новости на русском языке
+    For each item, provide:
 
-    AUDIENCE: Technical managers, IT specialists, programmers who need comprehensive news facts AND strategic context to make informed decisions.
+    <b>🔹 [Specific headline - use actual company/product names]</b>
+
+    <b>Что произошло:</b> [What happened over the week, with names, numbers and dates]
+
+    <b>Почему важно:</b> [Why it matters for AI/ML teams and businesses]
+
+    <b>Действия:</b> [Specific next steps - evaluate, pilot, monitor, invest, or ignore]
 
     FORMATTING:
-    - Generate clean text with ONLY <b> for bold and <i> for italic when needed
-    - Start with: <b>📰 AI News Briefing - {date}</b>
-    - Use emoji 🔹 for bullet points/news items
-    - Separate sections with double line breaks (NOT <br> tags!)
+    - Выдавать пользователю новости на русском языке
+    - Start with: <b>📰 {briefing_title} - неделя {week_label}</b>
+    - Use ONLY <b> and <i> tags, separate sections with double line breaks
     - Keep under 800 words to fit Telegram message limits
-    - Focus on 4-5 most important developments
-    - Professional, informative tone
-    - NO HTML tags except <b> and <i>
-    - NO <p>, <br>, <div>, <h1-h6> or any other HTML tags
 
-    NEWSLETTER CONTENT:
-    {content}
+    STORIES BY DAY:
+    {material}
     """
     
     return prompt
@@ -130,3 +194,110 @@ def create_qa_prompt(question, newsletter_content, date):
     """
     
     return prompt
+
+def create_session_preamble(date, history_summary=""):
+    """
+    Create the opening message of a multi-turn Q&A session.
+    
+    Args:
+        date: The newsletter date
+        history_summary: Summary of earlier, compacted conversation turns
+        
+    Returns:
+        A prompt string that frames the whole conversation
+    """
+    prompt = f"""
+    You are answering follow-up questions about the TLDR AI newsletter from {date}.
+    Each question comes with newsletter excerpts; excerpts from earlier turns remain valid.
+    If the excerpts don't contain information to answer the question, use your general knowledge to provide a helpful response.
+    Be concise but thorough.
+    """
+    
+    if history_summary:
+        prompt += f"""
+    SUMMARY OF THE CONVERSATION SO FAR:
+    {history_summary}
+    """
+    
+    return prompt
+
+def create_history_summary_prompt(previous_summary, turns):
+    """
+    Create a prompt that compacts older Q&A turns into a short summary.
+    
+    Args:
+        previous_summary: Summary of turns compacted earlier (may be empty)
+        turns: List of dictionaries with question and answer
+        
+    Returns:
+        A prompt string for history compaction
+    """
+    dialogue = "\n\n".join(
+        f"Q: {turn['question']}\nA: {turn['answer']}" for turn in turns
+    )
+    
+    prompt = f"""
+    Summarise this Q&A conversation about an AI newsletter in at most 150 words.
+    Keep the facts, names and numbers the user may refer back to.
+    
+    EARLIER SUMMARY:
+    {previous_summary or "(none)"}
+    
+    CONVERSATION:
+    {dialogue}
+    """
+    
+    return prompt
+
+# Internal helpers ---------------------------------------------------------
+
+def _briefing_instructions(edition_name, briefing_title, date):
+    """Return the briefing format instructions shared by both summary modes."""
+    return f"""
+    Create a strategic AI news briefing for IT Specialists, Businessmen, and Programmers based on this {edition_name} newsletter. from {date}.
+
+    CRITICAL: Preserve the actual news content - specific company names, product launches, research findings, and concrete developments. Don't turn everything into abstract concepts.
+
+    For each significant news item, provide:
+
+    <b>🔹 [Specific headline - use actual company/product names]</b>
+
+    <b>Что произошло:</b> [Detailed factual summary - provide comprehensive context about who did what, when, how, and with what specific details. For unfamiliar companies or concepts, include brief definitions (e.g., "CoreWeave, a cloud service provider specializing in AI infrastructure, announced..."). Include technical specifications, timelines, and background context.]
+
+    <b>Почему важно:</b> [Explain the strategic importance AND what specific problem this solves or opportunity it creates. Address both immediate business impact and longer-term implications for AI/ML teams and competitive positioning.]
+
+    <b>Действия:</b> [Specific next steps - evaluate, pilot, monitor, invest, or ignore - with clear rationale]
+
+    WRITING GUIDELINES:
+    - Use actual company names (OpenAI, Google, Microsoft, Anthropic, etc.)
+    - For lesser-known companies, provide brief context (e.g., "Sakana AI, a Tokyo-based AI research company,...")
+    - Include specific products, features, numbers, dates, and technical details
+    - Preserve research findings and their implications
+    - Make "What Happened" sections comprehensive - don't just summarize, provide full context
+    - In "Why It Matters", always explain what problem is being solved or opportunity created
+    - Выдавать пользователю новости на русском языке
+
+    AUDIENCE: Technical managers, IT specialists, programmers who need comprehensive news facts AND strategic context to make informed decisions.
+
+    FORMATTING:
+    - Generate clean text with ONLY <b> for bold and <i> for italic when needed
+    - Start with: <b>📰 {briefing_title} - {date}</b>
+    - Use emoji 🔹 for bullet points/news items
+    - Separate sections with double line breaks (NOT <br> tags!)
+    - Keep under 800 words to fit Telegram message limits
+    - Focus on 4-5 most important developments
+    - Professional, informative tone
+    - NO HTML tags except <b> and <i>
+    - NO <p>, <br>, <div>, <h1-h6> or any other HTML tags
+"""
+
+def _topic_focus(topics):
+    """Return the topic restriction appended for profiled readers."""
+    if not topics:
+        return ""
+    topic_list = "\n".join(f"    - {topic}" for topic in topics)
+    return f"""
+    TOPIC FOCUS: this reader only wants news about:
+{topic_list}
+    Pick the most important developments within these topics only. If nothing matches, say so in one short sentence after the header.
+    """
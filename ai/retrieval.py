@@ -0,0 +1,140 @@
+"""Local BM25 index for retrieval-based Q&A over newsletter content."""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List
+
+from config import QA_CHUNK_MAX_CHARS
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split ``text`` into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A piece of newsletter or article text that can be retrieved."""
+
+    source: str
+    text: str
+
+
+def chunk_text(text: str, source: str, max_chars: int = QA_CHUNK_MAX_CHARS) -> List[Chunk]:
+    """Pack the lines of ``text`` into chunks of at most ``max_chars`` characters."""
+    chunks: List[Chunk] = []
+    current = ""
+
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+
+        # Hard-split lines that would never fit into a single chunk
+        while len(line) > max_chars:
+            if current:
+                chunks.append(Chunk(source, current))
+                current = ""
+            chunks.append(Chunk(source, line[:max_chars]))
+            line = line[max_chars:]
+
+        if current and len(current) + len(line) + 1 > max_chars:
+            chunks.append(Chunk(source, current))
+            current = ""
+        current += ("\n" if current else "") + line
+
+    if current:
+        chunks.append(Chunk(source, current))
+
+    return chunks
+
+
+class ContentIndex:
+    """Okapi BM25 index built once per newsletter."""
+
+    def __init__(self, chunks: List[Chunk], k1: float = 1.5, b: float = 0.75):
+        """
+        Build the index.
+        
+        Args:
+            chunks: Chunks to index
+            k1: BM25 term frequency saturation
+            b: BM25 length normalisation
+        """
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self._term_freqs: List[Counter] = [Counter(tokenize(c.text)) for c in chunks]
+        self._lengths = [sum(tf.values()) for tf in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if chunks else 0.0
+
+        doc_freqs: Counter = Counter()
+        for tf in self._term_freqs:
+            doc_freqs.update(tf.keys())
+        total = len(chunks)
+        self._idf: Dict[str, float] = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in doc_freqs.items()
+        }
+
+    @classmethod
+    def from_newsletter_data(cls, newsletter_data, max_chars: int = QA_CHUNK_MAX_CHARS) -> "ContentIndex":
+        """
+        Build an index over the newsletter text and each extracted article.
+        
+        Falls back to the combined ``content`` string for data produced
+        without per-article breakdown.
+        """
+        chunks: List[Chunk] = []
+        newsletter_text = newsletter_data.get("newsletter_text")
+        articles = newsletter_data.get("articles")
+
+        if newsletter_text is None and articles is None:
+            return cls(chunk_text(newsletter_data.get("content", ""), "newsletter", max_chars))
+
+        chunks.extend(chunk_text(newsletter_text or "", "newsletter", max_chars))
+        for article in articles or []:
+            chunks.extend(chunk_text(article["content"], article["url"], max_chars))
+        return cls(chunks)
+
+    def score(self, query_terms: List[str], index: int) -> float:
+        """Return the BM25 score of chunk ``index`` for ``query_terms``."""
+        tf = self._term_freqs[index]
+        length = self._lengths[index]
+        norm = self.k1 * (1 - self.b + self.b * length / (self._avg_length or 1))
+
+        total = 0.0
+        for term in query_terms:
+            freq = tf.get(term)
+            if not freq:
+                continue
+            total += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+        return total
+
+    def search_ids(self, query: str, top_k: int) -> List[int]:
+        """
+        Return the positions of the ``top_k`` most relevant chunks for ``query``.
+        
+        When nothing matches (e.g. a question asked in another language),
+        the leading chunks are returned so the model still gets the
+        newsletter overview.
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        scored = [(self.score(query_terms, i), i) for i in range(len(self.chunks))]
+        ranked = sorted((item for item in scored if item[0] > 0), key=lambda item: (-item[0], item[1]))
+
+        if not ranked:
+            return list(range(min(top_k, len(self.chunks))))
+
+        # Keep the original document order so the context reads naturally
+        return sorted(i for _, i in ranked[:top_k])
+
+    def search(self, query: str, top_k: int) -> List[Chunk]:
+        """Return the ``top_k`` most relevant chunks for ``query``."""
+        return [self.chunks[i] for i in self.search_ids(query, top_k)]
@@ -0,0 +1,158 @@
+"""Persistent multi-turn Q&A sessions with history compaction."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ai.prompts import create_history_summary_prompt, create_session_preamble
+from ai.retrieval import Chunk, ContentIndex
+from config import QA_HISTORY_KEEP_TURNS, QA_HISTORY_MAX_TOKENS, QA_TOP_K_CHUNKS
+from utils.files import write_atomic
+from utils.text import estimate_tokens
+
+
+class QASession:
+    """
+    Conversation state for Q&A about a single newsletter.
+
+    The newsletter is indexed once; each turn attaches only the excerpts that
+    are not already part of the retained history, so the context is reused
+    across turns the same way a chat would. The stable preamble keeps the
+    prompt prefix identical between turns, which lets Gemini's implicit
+    context caching kick in.
+    """
+
+    def __init__(self, ai_client, date, chunks: List[Chunk], path: Optional[Path] = None,
+                 summary: str = "", turns: Optional[List[Dict]] = None):
+        """
+        Initialize the session.
+        
+        Args:
+            ai_client: The AI client used for answers and compaction
+            date: The newsletter date
+            chunks: Indexed newsletter and article chunks
+            path: Where the session is persisted (None disables saving)
+            summary: Summary of turns that were already compacted
+            turns: Retained turns with question, answer and chunk_ids
+        """
+        self.ai_client = ai_client
+        self.date = date
+        self.index = ContentIndex(chunks)
+        self.path = path
+        self.summary = summary
+        self.turns: List[Dict] = turns or []
+
+    @classmethod
+    def from_newsletter_data(cls, ai_client, newsletter_data, path: Optional[Path] = None) -> "QASession":
+        """Start a fresh session over freshly collected newsletter data."""
+        index = ContentIndex.from_newsletter_data(newsletter_data)
+        return cls(ai_client, newsletter_data['date'], index.chunks, path=path)
+
+    @classmethod
+    def load(cls, ai_client, path: Path) -> "QASession":
+        """
+        Resume a saved session without re-ingesting the newsletter.
+        
+        Raises:
+            OSError: If the session file cannot be read
+            ValueError: If the session file is malformed
+        """
+        with path.open("r", encoding="utf-8") as fh:
+            state = json.load(fh)
+
+        chunks = [Chunk(item["source"], item["text"]) for item in state["chunks"]]
+        return cls(
+            ai_client,
+            state["date"],
+            chunks,
+            path=path,
+            summary=state.get("summary", ""),
+            turns=state.get("turns", []),
+        )
+
+    def ask(self, question: str):
+        """
+        Answer ``question`` in the context of the conversation so far.
+        
+        Returns:
+            Tuple of (answer text, estimated prompt tokens)
+        """
+        sent_ids = {i for turn in self.turns for i in turn["chunk_ids"]}
+        new_ids = [i for i in self.index.search_ids(question, QA_TOP_K_CHUNKS) if i not in sent_ids]
+
+        contents = self._build_contents(question, new_ids)
+        response = self.ai_client.generate_content(contents, task="qa")
+        answer = response.text
+
+        self.turns.append({"question": question, "answer": answer, "chunk_ids": new_ids})
+        self._compact_if_needed()
+        self.save()
+
+        prompt_tokens = sum(estimate_tokens(part) for item in contents for part in item["parts"])
+        return answer, prompt_tokens
+
+    def history_tokens(self) -> int:
+        """Estimate how many tokens the retained history costs per turn."""
+        total = estimate_tokens(self.summary)
+        for turn in self.turns:
+            total += estimate_tokens(self._format_question(turn["question"], turn["chunk_ids"]))
+            total += estimate_tokens(turn["answer"])
+        return total
+
+    def save(self) -> None:
+        """Persist the session so it can be resumed later."""
+        if self.path is None:
+            return
+
+        state = {
+            "date": self.date,
+            "chunks": [{"source": c.source, "text": c.text} for c in self.index.chunks],
+            "summary": self.summary,
+            "turns": self.turns,
+        }
+        write_atomic(self.path, json.dumps(state, ensure_ascii=False, indent=2))
+
+    # Internal helpers -------------------------------------------------
+    def _format_question(self, question: str, chunk_ids: List[int]) -> str:
+        if not chunk_ids:
+            return question
+
+        excerpts = "\n\n".join(
+            f"SOURCE: {self.index.chunks[i].source}\n{self.index.chunks[i].text}"
+            for i in chunk_ids
+        )
+        return f"NEWSLETTER EXCERPTS:\n{excerpts}\n\nQUESTION:\n{question}"
+
+    def _build_contents(self, question: str, new_ids: List[int]) -> List[Dict]:
+        contents = [
+            {"role": "user", "parts": [create_session_preamble(self.date, self.summary)]},
+            {"role": "model", "parts": ["Understood. Ask your question."]},
+        ]
+        for turn in self.turns:
+            contents.append({"role": "user", "parts": [self._format_question(turn["question"], turn["chunk_ids"])]})
+            contents.append({"role": "model", "parts": [turn["answer"]]})
+        contents.append({"role": "user", "parts": [self._format_question(question, new_ids)]})
+        return contents
+
+    def _compact_if_needed(self) -> None:
+        if len(self.turns) <= QA_HISTORY_KEEP_TURNS:
+            return
+        if self.history_tokens() <= QA_HISTORY_MAX_TOKENS:
+            return
+
+        old_turns = self.turns[:-QA_HISTORY_KEEP_TURNS]
+        print(f"Compacting {len(old_turns)} earlier Q&A turn(s) into a summary...")
+        try:
+            response = self.ai_client.generate_content(
+                create_history_summary_prompt(self.summary, old_turns),
+                task="history_summary"
+            )
+        except Exception as e:
+            # Keep the full history rather than losing context
+            print(f"WARNING: history compaction failed: {e}")
+            return
+
+        self.summary = response.text.strip()
+        self.turns = self.turns[-QA_HISTORY_KEEP_TURNS:]
@@ -0,0 +1,333 @@
+"""
+LLM usage ledger and token budgets.
+
+Every model call is recorded with its prompt/response tokens, latency, model,
+task (call site) and the run and label (e.g. "ai/2025-06-10") it belongs to,
+so the cost of a date, a backfill or a web request can be rolled up later.
+
+Two optional budgets bound spending: ``LLM_DAILY_TOKEN_BUDGET`` across every
+process sharing the ledger, and ``LLM_RUN_TOKEN_BUDGET`` per run. When little
+is left the pipeline degrades (simple article selection, a single shorter
+summary prompt) before it refuses calls with ``BudgetExceededError``.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import config
+from utils.sqlite import connect
+
+BUDGET_OK = "ok"
+BUDGET_TIGHT = "tight"
+BUDGET_EXHAUSTED = "exhausted"
+
+# Approximate characters per token, as in ``utils.text.estimate_tokens``
+CHARS_PER_TOKEN = 4
+
+# Columns a rollup can be grouped by
+ROLLUP_COLUMNS = ("day", "run_id", "scope", "label", "task", "model", "status")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    day TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    label TEXT NOT NULL,
+    task TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    response_tokens INTEGER NOT NULL,
+    latency_ms REAL NOT NULL,
+    cost_usd REAL NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_day ON calls (day);
+CREATE INDEX IF NOT EXISTS calls_run ON calls (run_id);
+"""
+
+
+class BudgetExceededError(RuntimeError):
+    """Exception raised when a model call would exceed a token budget."""
+    pass
+
+
+@dataclass
+class RunUsage:
+    """Tokens spent by one run (a CLI invocation, daemon cycle or web request)."""
+
+    run_id: str
+    scope: str
+    budget: int = 0
+    calls: int = 0
+    tokens: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, tokens: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.tokens += tokens
+
+    def remaining(self) -> Optional[int]:
+        """Return the tokens left in this run, or ``None`` without a run budget."""
+        if self.budget <= 0:
+            return None
+        return self.budget - self.tokens
+
+
+_current_run: ContextVar[Optional[RunUsage]] = ContextVar("usage_run", default=None)
+_current_label: ContextVar[str] = ContextVar("usage_label", default="")
+
+# Ledgers already pruned by this process
+_pruned = set()
+
+
+@contextmanager
+def usage_run(scope: str, budget: Optional[int] = None) -> Iterator[RunUsage]:
+    """
+    Attribute the model calls made inside the block to a new run.
+
+    Args:
+        scope: Where the run comes from, e.g. "cli", "daemon" or "web"
+        budget: Token budget of the run (defaults to ``LLM_RUN_TOKEN_BUDGET``)
+    """
+    run = RunUsage(
+        run_id=uuid.uuid4().hex[:12],
+        scope=scope,
+        budget=config.LLM_RUN_TOKEN_BUDGET if budget is None else budget,
+    )
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+        if run.calls:
+            print(f"LLM usage ({scope} run {run.run_id}): {run.calls} call(s), {run.tokens} token(s).")
+
+
+@contextmanager
+def usage_label(label: str) -> Iterator[None]:
+    """Label the model calls made inside the block, e.g. with the edition and date."""
+    token = _current_label.set(label)
+    try:
+        yield
+    finally:
+        _current_label.reset(token)
+
+
+@dataclass(frozen=True)
+class UsageLedger:
+    """SQLite record of every model call."""
+
+    path: Path
+
+    def record(
+        self,
+        task: str,
+        model: str,
+        prompt_tokens: int,
+        response_tokens: int,
+        latency_seconds: float,
+        cost_usd: float,
+        status: str = "ok",
+        run: Optional[RunUsage] = None,
+        label: str = "",
+    ) -> None:
+        """Append one call; the ledger never fails the call it records."""
+        now = datetime.now()
+        try:
+            with connect(self.path, SCHEMA) as conn:
+                conn.execute(
+                    "INSERT INTO calls (ts, day, run_id, scope, label, task, model, prompt_tokens, "
+                    "response_tokens, latency_ms, cost_usd, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        now.isoformat(timespec="seconds"),
+                        now.date().isoformat(),
+                        run.run_id if run else "",
+                        run.scope if run else "",
+                        label,
+                        task,
+                        model,
+                        prompt_tokens,
+                        response_tokens,
+                        round(latency_seconds * 1000, 1),
+                        cost_usd,
+                        status,
+                    ),
+                )
+                if self.path not in _pruned:
+                    # Old calls are dropped once per process
+                    self._prune(conn)
+                    _pruned.add(self.path)
+        except (sqlite3.Error, OSError) as e:
+            print(f"WARNING: Could not record LLM usage in {self.path}: {e}")
+
+    def tokens_on(self, day: date) -> int:
+        """Return the prompt and response tokens recorded on ``day``."""
+        if not self.path.exists():
+            return 0
+        try:
+            with connect(self.path, SCHEMA) as conn:
+                row = conn.execute(
+                    "SELECT COALESCE(SUM(prompt_tokens + response_tokens), 0) FROM calls WHERE day = ?",
+                    (day.isoformat(),),
+                ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            print(f"WARNING: Could not read LLM usage from {self.path}: {e}")
+            return 0
+        return row[0]
+
+    def rollup(self, by: Sequence[str] = ("day", "task", "model"), since: Optional[date] = None) -> List[Dict[str, object]]:
+        """
+        Aggregate calls, most expensive groups first.
+
+        Args:
+            by: Columns to group by, from ``ROLLUP_COLUMNS``
+            since: Only include calls on or after this day
+
+        Returns:
+            One dictionary per group with calls, errors, tokens, cost and latency
+
+        Raises:
+            ValueError: If a grouping column is unknown
+        """
+        unknown = [column for column in by if column not in ROLLUP_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown usage rollup column(s): {', '.join(unknown)}")
+        if not self.path.exists():
+            return []
+
+        columns = ", ".join(by)
+        where, params = ("WHERE day >= ?", (since.isoformat(),)) if since else ("", ())
+        with connect(self.path, SCHEMA) as conn:
+            rows = conn.execute(
+                f"SELECT {columns}, COUNT(*), SUM(status != 'ok'), SUM(prompt_tokens), SUM(response_tokens), "
+                f"SUM(cost_usd), AVG(latency_ms), MAX(latency_ms) FROM calls {where} "
+                f"GROUP BY {columns} ORDER BY SUM(prompt_tokens + response_tokens) DESC",
+                params,
+            ).fetchall()
+
+        names = list(by) + [
+            "calls", "errors", "prompt_tokens", "response_tokens", "cost_usd", "avg_latency_ms", "max_latency_ms",
+        ]
+        return [dict(zip(names, row)) for row in rows]
+
+    # Internal helpers -------------------------------------------------
+    def _prune(self, conn) -> None:
+        cutoff = (date.today() - timedelta(days=config.LLM_USAGE_RETENTION_DAYS)).isoformat()
+        conn.execute("DELETE FROM calls WHERE day < ?", (cutoff,))
+
+
+def ledger() -> Optional[UsageLedger]:
+    """Return the configured ledger, or ``None`` if ``LLM_USAGE_DB_FILE`` is empty."""
+    if not config.LLM_USAGE_DB_FILE:
+        return None
+    return UsageLedger(Path(config.LLM_USAGE_DB_FILE))
+
+
+def record_usage(task, model, prompt_tokens, response_tokens, latency_seconds, cost_usd, status="ok") -> None:
+    """Record a model call in the ledger and charge it to the current run."""
+    run = _current_run.get()
+    if run is not None:
+        run.add(prompt_tokens + response_tokens)
+    store = ledger()
+    if store is not None:
+        store.record(
+            task, model, prompt_tokens, response_tokens, latency_seconds, cost_usd,
+            status=status, run=run, label=_current_label.get(),
+        )
+
+
+def remaining_tokens() -> Optional[int]:
+    """Return the tokens left under the tighter budget, or ``None`` if unlimited."""
+    limits = []
+    run = _current_run.get()
+    if run is not None and run.remaining() is not None:
+        limits.append(run.remaining())
+    if config.LLM_DAILY_TOKEN_BUDGET > 0:
+        store = ledger()
+        used = store.tokens_on(date.today()) if store is not None else 0
+        limits.append(config.LLM_DAILY_TOKEN_BUDGET - used)
+    return min(limits) if limits else None
+
+
+def budget_state() -> str:
+    """Return ``BUDGET_OK``, ``BUDGET_TIGHT`` or ``BUDGET_EXHAUSTED``."""
+    remaining = remaining_tokens()
+    if remaining is None or remaining >= config.LLM_TIGHT_BUDGET_TOKENS:
+        return BUDGET_OK
+    if remaining <= config.LLM_RESPONSE_TOKEN_RESERVE:
+        return BUDGET_EXHAUSTED
+    return BUDGET_TIGHT
+
+
+def check_budget(prompt_tokens: int, task: str) -> None:
+    """
+    Refuse a call whose prompt plus a response reserve no longer fits.
+
+    Raises:
+        BudgetExceededError: If the remaining budget is too small
+    """
+    remaining = remaining_tokens()
+    if remaining is None:
+        return
+    needed = prompt_tokens + config.LLM_RESPONSE_TOKEN_RESERVE
+    if needed > remaining:
+        raise BudgetExceededError(
+            f"LLM token budget exhausted: {task} needs ~{needed} token(s), {max(remaining, 0)} left."
+        )
+
+
+def fit_chars(max_chars: int, overhead_chars: int = 0) -> int:
+    """
+    Shrink a prompt content limit so the call fits the remaining budget.
+
+    Args:
+        max_chars: Normal content limit in characters
+        overhead_chars: Characters of the prompt besides the content
+
+    Returns:
+        ``max_chars``, or fewer characters when the budget is short
+    """
+    remaining = remaining_tokens()
+    if remaining is None:
+        return max_chars
+    available = (remaining - config.LLM_RESPONSE_TOKEN_RESERVE) * CHARS_PER_TOKEN - overhead_chars
+    return max(0, min(max_chars, available))
+
+
+def format_report(store: UsageLedger, since: date) -> str:
+    """Render usage rollups per day, per run, per label and per call site."""
+    sections = [
+        ("Per day", ("day",)),
+        ("Per run", ("run_id", "scope")),
+        ("Per edition and date", ("label",)),
+        ("Per call site and model", ("task", "model")),
+    ]
+    lines = [f"LLM usage since {since.isoformat()} ({store.path})"]
+    for title, by in sections:
+        rows = store.rollup(by, since)
+        lines.append("")
+        lines.append(title)
+        if not rows:
+            lines.append("  (no calls)")
+            continue
+        header = " / ".join(by)
+        lines.append(f"  {header:<36} {'calls':>6} {'errors':>6} {'prompt':>10} {'response':>10} {'cost $':>9} {'avg ms':>8}")
+        for row in rows:
+            key = " / ".join(str(row[column] or "-") for column in by)
+            lines.append(
+                f"  {key[:36]:<36} {row['calls']:>6} {row['errors']:>6} {row['prompt_tokens']:>10} "
+                f"{row['response_tokens']:>10} {row['cost_usd']:>9.4f} {row['avg_latency_ms']:>8.0f}"
+            )
+    return "\n".join(lines)
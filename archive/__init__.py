@@ -0,0 +1 @@
+"""Archive package for the pre-rendered static briefing pages."""
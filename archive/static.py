@@ -0,0 +1,278 @@
+"""
+Static per-date briefing archive with precompressed variants.
+
+The daily run renders each stored briefing into ``result.html`` once and
+writes it, with gzip (and brotli, when the ``brotli`` package is installed)
+variants, under ``ARCHIVE_DIR``. A manifest keeps a strong ETag per page, so
+Flask and Lambda can answer requests, including conditional GETs, by reading
+one file and running no pipeline.
+
+Layout::
+
+    ARCHIVE_DIR/index.html(.gz|.br)           list of archived dates
+    ARCHIVE_DIR/<edition>/<date>.html(.gz|.br)
+    ARCHIVE_DIR/manifest.json                 ETags and encodings per page
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from newsletter.editions import EDITIONS
+from utils.files import write_atomic
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip variants are written without it
+    brotli = None
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "web" / "templates"
+INDEX_PAGE = "index.html"
+MANIFEST_FILE = "manifest.json"
+
+# Encodings in order of preference, with the suffix of their variant files
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Dated pages rarely change once written; the index changes daily
+PAGE_MAX_AGE_SECONDS = 3600
+INDEX_MAX_AGE_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class StaticResponse:
+    """Status, headers and body of an archived page."""
+
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    encoding: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class StaticArchive:
+    """Pre-rendered briefing pages under ``base_dir``."""
+
+    base_dir: Path
+
+    def page_name(self, edition: str, date_str: str) -> str:
+        """Return the archive-relative file of a dated briefing."""
+        return f"{edition}/{date_str}.html"
+
+    def has(self, edition: str, date_str: str) -> bool:
+        """Return True if the briefing of ``date_str`` is archived."""
+        return self.page_name(edition, date_str) in self._read_manifest()
+
+    def dates(self, edition: str) -> List[str]:
+        """Return the archived dates of ``edition``, newest first."""
+        prefix = f"{edition}/"
+        return sorted(
+            (name[len(prefix):-len(".html")] for name in self._read_manifest() if name.startswith(prefix)),
+            reverse=True,
+        )
+
+    def publish_briefing(
+        self,
+        edition: str,
+        date_str: str,
+        summary: str,
+        newsletter_url: str = "",
+        article_links: Sequence[str] = (),
+    ) -> None:
+        """
+        Render a briefing into the archive and refresh the index page.
+
+        Args:
+            edition: Edition slug
+            date_str: ISO date of the issue
+            summary: Sanitized briefing HTML
+            newsletter_url: Source newsletter URL
+            article_links: Source article URLs
+        """
+        html = _render(
+            "result.html",
+            summary=summary,
+            date=date_str,
+            newsletter_url=newsletter_url,
+            article_links=list(article_links),
+            back_url="../",
+        )
+        manifest = self._read_manifest()
+        manifest[self.page_name(edition, date_str)] = self._write_page(self.page_name(edition, date_str), html)
+        manifest[INDEX_PAGE] = self._write_page(INDEX_PAGE, self._render_index(manifest))
+        self._write_manifest(manifest)
+
+    def respond(self, name: str, accept_encoding: str = "", if_none_match: str = "") -> Optional[StaticResponse]:
+        """
+        Serve an archived page with content negotiation and conditional GET.
+
+        Args:
+            name: Archive-relative page, e.g. "index.html" or "ai/2025-06-10.html"
+            accept_encoding: The request's Accept-Encoding header
+            if_none_match: The request's If-None-Match header
+
+        Returns:
+            A 200 or 304 response, or ``None`` if the page is not archived
+        """
+        entry = self._read_manifest().get(name)
+        if entry is None:
+            return None
+
+        encoding = choose_encoding(accept_encoding, entry.get("encodings", []))
+        etag = _etag(entry["hash"], encoding)
+        max_age = INDEX_MAX_AGE_SECONDS if name == INDEX_PAGE else PAGE_MAX_AGE_SECONDS
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={max_age}",
+            "Vary": "Accept-Encoding",
+            "Last-Modified": entry["modified"],
+        }
+        if etag_matches(if_none_match, etag):
+            return StaticResponse(304, headers)
+
+        suffix = dict(ENCODINGS).get(encoding, "")
+        try:
+            body = (self.base_dir / (name + suffix)).read_bytes()
+        except OSError:
+            return None
+        headers["Content-Type"] = "text/html; charset=utf-8"
+        headers["Content-Length"] = str(len(body))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return StaticResponse(200, headers, body, encoding)
+
+    # Internal helpers -------------------------------------------------
+    def _write_page(self, name: str, html: str) -> Dict[str, object]:
+        raw = html.encode("utf-8")
+        path = self.base_dir / name
+        write_atomic(path, raw)
+        encodings = []
+        if brotli is not None:
+            write_atomic(path.with_name(path.name + ".br"), brotli.compress(raw, quality=11))
+            encodings.append("br")
+        # mtime=0 keeps the gzip bytes identical for identical pages
+        write_atomic(path.with_name(path.name + ".gz"), gzip.compress(raw, compresslevel=9, mtime=0))
+        encodings.append("gzip")
+        return {
+            "hash": hashlib.sha256(raw).hexdigest()[:32],
+            "encodings": encodings,
+            "modified": _http_date(datetime.now(timezone.utc)),
+        }
+
+    def _render_index(self, manifest: Dict[str, Dict[str, object]]) -> str:
+        editions = []
+        for slug, edition in EDITIONS.items():
+            prefix = f"{slug}/"
+            dates = sorted(
+                (name[len(prefix):-len(".html")] for name in manifest if name.startswith(prefix)),
+                reverse=True,
+            )
+            if dates:
+                editions.append({"slug": slug, "name": edition.name, "dates": dates})
+        return _render("archive_index.html", editions=editions)
+
+    def _read_manifest(self) -> Dict[str, Dict[str, object]]:
+        try:
+            with (self.base_dir / MANIFEST_FILE).open("r", encoding="utf-8") as fh:
+                return json.load(fh).get("pages", {})
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _write_manifest(self, pages: Dict[str, Dict[str, object]]) -> None:
+        data = json.dumps({"pages": pages}, ensure_ascii=False, indent=2, sort_keys=True)
+        write_atomic(self.base_dir / MANIFEST_FILE, data.encode("utf-8"))
+
+
+def choose_encoding(accept_encoding: str, available: Sequence[str]) -> Optional[str]:
+    """Return the preferred available encoding the client accepts, or ``None`` for identity."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+
+    for encoding, _ in ENCODINGS:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Return True if an If-None-Match header lists ``etag`` (or ``*``)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def latest_page(
+    archive: StaticArchive,
+    edition: str,
+    today: date,
+    is_published: Callable[[date], bool],
+) -> Optional[str]:
+    """
+    Return the archived page that live generation would produce now, if any.
+
+    That is the newest weekday's briefing; before today's issue is out it is
+    the previous weekday's. ``is_published`` is only asked about today.
+
+    Returns:
+        Archive-relative page name, or ``None`` to generate live
+    """
+    newest = today
+    while newest.weekday() >= 5:
+        newest -= timedelta(days=1)
+    if archive.has(edition, newest.isoformat()):
+        return archive.page_name(edition, newest.isoformat())
+    if newest != today:
+        return None
+
+    previous = newest - timedelta(days=1)
+    while previous.weekday() >= 5:
+        previous -= timedelta(days=1)
+    if archive.has(edition, previous.isoformat()) and not is_published(today):
+        return archive.page_name(edition, previous.isoformat())
+    return None
+
+
+# Internal helpers -----------------------------------------------------------
+
+_environment = None
+
+
+def _render(template_name: str, **context) -> str:
+    global _environment
+    if _environment is None:
+        from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+        _environment = Environment(
+            loader=FileSystemLoader(str(TEMPLATE_DIR)),
+            autoescape=select_autoescape(["html"]),
+        )
+    return _environment.get_template(template_name).render(**context)
+
+
+def _etag(content_hash: str, encoding: Optional[str]) -> str:
+    # Each encoded representation needs its own strong validator
+    return f'"{content_hash}-{encoding}"' if encoding else f'"{content_hash}"'
+
+
+def _http_date(moment: datetime) -> str:
+    return moment.strftime("%a, %d %b %Y %H:%M:%S GMT")
@@ -0,0 +1,281 @@
+"""
+Site adapters: lightweight sources for link targets the HTML scrape handles badly.
+
+Many newsletter links point to arXiv papers, GitHub repositories, Hugging
+Face model cards and YouTube videos. Their HTML pages are large (or a PDF)
+and mostly navigation, so each adapter in ``ADAPTERS`` maps a URL pattern to
+the smallest source that still describes the link:
+
+* arXiv abstract and PDF pages (and Hugging Face paper pages): title,
+  authors and abstract from the arXiv export API
+* GitHub repositories: the raw README via the GitHub API; Markdown files
+  linked with ``/blob/``: the raw file
+* Hugging Face models and datasets: the raw model or dataset card
+* YouTube videos: title and channel from oEmbed
+
+Each adapter caps the bytes it reads and the characters it returns.
+``extract_article_content`` falls back to the generic HTML extraction when
+no adapter matches, or when an adapter that allows it finds nothing.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass
+from typing import Callable, Dict, Match, Optional, Pattern, Tuple
+from urllib.parse import quote
+
+import config
+from utils.http import make_request
+from utils.metrics import incr
+from utils.text import truncate_text
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+# First path segments that are site pages rather than an owner or user
+GITHUB_RESERVED = (
+    "about|collections|enterprise|events|explore|features|marketplace|orgs|"
+    "pricing|security|settings|sponsors|topics|trending|users"
+)
+HUGGINGFACE_RESERVED = (
+    "blog|collections|docs|join|learn|login|models|organizations|papers|pricing|settings|spaces|tasks"
+)
+
+
+@dataclass(frozen=True)
+class SiteAdapter:
+    """How to read links matching ``pattern`` from a lighter source."""
+
+    name: str
+    pattern: Pattern[str]
+    # Source URL for a matched link
+    source_url: Callable[[Match], str]
+    # Text of the source (decoded, at most ``max_bytes``), or None if it has none
+    parse: Callable[[str, Match], Optional[str]]
+    max_bytes: int
+    max_chars: int
+    headers: Callable[[], Dict[str, str]] = lambda: {}
+    # Whether the link's HTML page is worth scraping when the source fails
+    generic_fallback: bool = True
+
+    def fetch(self, match: Match, timeout: float = 15, max_chars: Optional[int] = None) -> Optional[str]:
+        """
+        Read the source of a matched link.
+
+        Args:
+            match: Match of ``pattern`` against the link
+            timeout: Request timeout in seconds
+            max_chars: Caller's character limit; the adapter's own cap applies too
+
+        Returns:
+            Extracted text, or None if the source is unavailable or empty
+        """
+        response = make_request(
+            self.source_url(match), timeout=timeout, headers=self.headers() or None, max_bytes=self.max_bytes
+        )
+        if not response:
+            incr("article_adapter_total", adapter=self.name, outcome="unavailable")
+            return None
+
+        text = self.parse(response.content.decode(response.encoding or "utf-8", errors="replace"), match)
+        if not text:
+            incr("article_adapter_total", adapter=self.name, outcome="empty")
+            return None
+
+        incr("article_adapter_total", adapter=self.name, outcome="ok")
+        limit = min(max_chars, self.max_chars) if max_chars else self.max_chars
+        return truncate_text(text.strip(), limit)
+
+
+def match_adapter(url: str) -> Tuple[Optional[SiteAdapter], Optional[Match]]:
+    """Return the first adapter whose pattern matches ``url`` and its match, or ``(None, None)``."""
+    if not config.SITE_ADAPTERS_ENABLED:
+        return None, None
+    for adapter in ADAPTERS:
+        match = adapter.pattern.match(url.strip())
+        if match:
+            return adapter, match
+    return None, None
+
+
+def markdown_text(markdown: str) -> str:
+    """
+    Reduce Markdown (a README or model card) to its readable text.
+
+    Front matter, HTML tags, images and badges are dropped, links keep their
+    text, and heading and emphasis markers are removed.
+    """
+    text = re.sub(r"\A---\s*\n.*?\n---\s*\n", "", markdown, flags=re.S)
+    text = re.sub(r"<!--.*?-->", "", text, flags=re.S)
+    text = re.sub(r"\[!\[[^\]]*\]\([^)]*\)\]\([^)]*\)", "", text)
+    text = re.sub(r"!\[[^\]]*\]\([^)]*\)", "", text)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = re.sub(r"\[([^\]]+)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"^\s{0,3}#{1,6}\s*", "", text, flags=re.M)
+    text = re.sub(r"(\*\*|__)(.+?)\1", r"\2", text)
+
+    lines = [line.rstrip() for line in text.splitlines()]
+    kept = []
+    for line in lines:
+        if not line.strip() and (not kept or not kept[-1]):
+            continue
+        kept.append(line if line.strip() else "")
+    return "\n".join(kept).strip()
+
+
+# Parsers --------------------------------------------------------------------
+
+def _parse_arxiv(xml_text: str, match: Match) -> Optional[str]:
+    try:
+        root = ElementTree.fromstring(xml_text)
+    except ElementTree.ParseError:
+        return None
+
+    entry = root.find(f"{ATOM_NS}entry")
+    if entry is None or entry.find(f"{ATOM_NS}summary") is None:
+        # Unknown IDs come back as an entry titled "Error" without a summary
+        return None
+
+    def field(name: str) -> str:
+        element = entry.find(f"{ATOM_NS}{name}")
+        return " ".join((element.text or "").split()) if element is not None else ""
+
+    authors = [" ".join((name.text or "").split()) for name in entry.iterfind(f"{ATOM_NS}author/{ATOM_NS}name")]
+    lines = [field("title")]
+    if authors:
+        shown = ", ".join(authors[:8]) + (" et al." if len(authors) > 8 else "")
+        lines.append(f"Authors: {shown}")
+    if field("published"):
+        lines.append(f"arXiv {match.group('id')}, published {field('published')[:10]}")
+    lines.append("")
+    lines.append(field("summary"))
+    return "\n".join(lines)
+
+
+def _parse_markdown(markdown: str, match: Match) -> Optional[str]:
+    text = markdown_text(markdown)
+    if not text:
+        return None
+    groups = match.groupdict()
+    if groups.get("repo"):
+        return f"{groups['owner']}/{groups['repo']}\n\n{text}"
+    if groups.get("card"):
+        return f"{groups['card']}\n\n{text}"
+    return text
+
+
+def _parse_youtube(json_text: str, match: Match) -> Optional[str]:
+    try:
+        data = json.loads(json_text)
+    except json.JSONDecodeError:
+        return None
+    title = data.get("title")
+    if not title:
+        return None
+    lines = [f"YouTube video: {title}"]
+    if data.get("author_name"):
+        lines.append(f"Channel: {data['author_name']}")
+    return "\n".join(lines)
+
+
+# Sources --------------------------------------------------------------------
+
+def _github_headers() -> Dict[str, str]:
+    headers = {"Accept": "application/vnd.github.raw", "User-Agent": "ai-news-brief"}
+    if config.GITHUB_TOKEN:
+        headers["Authorization"] = f"Bearer {config.GITHUB_TOKEN}"
+    return headers
+
+
+def _github_readme_url(match: Match) -> str:
+    url = f"https://api.github.com/repos/{match.group('owner')}/{match.group('repo')}/readme"
+    if match.group("ref"):
+        url += f"?ref={quote(match.group('ref'), safe='')}"
+    return url
+
+
+def _youtube_oembed_url(match: Match) -> str:
+    video_url = f"https://www.youtube.com/watch?v={match.group('id')}"
+    return f"https://www.youtube.com/oembed?format=json&url={quote(video_url, safe='')}"
+
+
+ARXIV_ID = r"(?P<id>(?:\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?)"
+URL_TAIL = r"/?(?:[?#].*)?$"
+
+ADAPTERS: Tuple[SiteAdapter, ...] = (
+    SiteAdapter(
+        name="arxiv",
+        pattern=re.compile(
+            rf"^https?://(?:www\.|export\.)?arxiv\.org/(?:abs|pdf|html)/{ARXIV_ID}(?:\.pdf)?{URL_TAIL}", re.I
+        ),
+        source_url=lambda match: f"https://export.arxiv.org/api/query?id_list={match.group('id')}",
+        parse=_parse_arxiv,
+        max_bytes=64 * 1024,
+        max_chars=4000,
+        # The alternative would be the PDF
+        generic_fallback=False,
+    ),
+    SiteAdapter(
+        name="huggingface-paper",
+        pattern=re.compile(rf"^https?://huggingface\.co/papers/{ARXIV_ID}{URL_TAIL}", re.I),
+        source_url=lambda match: f"https://export.arxiv.org/api/query?id_list={match.group('id')}",
+        parse=_parse_arxiv,
+        max_bytes=64 * 1024,
+        max_chars=4000,
+    ),
+    SiteAdapter(
+        name="github-file",
+        pattern=re.compile(
+            r"^https?://(?:www\.)?github\.com/(?P<owner>[\w.-]+)/(?P<name>[\w.-]+)/blob/"
+            rf"(?P<path>[^?#]+\.(?:md|markdown|rst|txt)){URL_TAIL}",
+            re.I,
+        ),
+        source_url=lambda match: (
+            f"https://raw.githubusercontent.com/{match.group('owner')}/{match.group('name')}/{match.group('path')}"
+        ),
+        parse=_parse_markdown,
+        max_bytes=256 * 1024,
+        max_chars=6000,
+    ),
+    SiteAdapter(
+        name="github-repo",
+        pattern=re.compile(
+            rf"^https?://(?:www\.)?github\.com/(?!(?:{GITHUB_RESERVED})/)(?P<owner>[\w.-]+)/"
+            rf"(?P<repo>[\w.-]+?)(?:\.git)?(?:/tree/(?P<ref>[^/?#]+))?{URL_TAIL}",
+            re.I,
+        ),
+        source_url=_github_readme_url,
+        parse=_parse_markdown,
+        max_bytes=256 * 1024,
+        max_chars=6000,
+        headers=_github_headers,
+    ),
+    SiteAdapter(
+        name="huggingface-card",
+        pattern=re.compile(
+            rf"^https?://huggingface\.co/(?!(?:{HUGGINGFACE_RESERVED})/)"
+            rf"(?P<card>(?:datasets/)?[\w.-]+/[\w.-]+){URL_TAIL}",
+            re.I,
+        ),
+        source_url=lambda match: f"https://huggingface.co/{match.group('card')}/raw/main/README.md",
+        parse=_parse_markdown,
+        max_bytes=256 * 1024,
+        max_chars=6000,
+    ),
+    SiteAdapter(
+        name="youtube",
+        pattern=re.compile(
+            r"^https?://(?:www\.|m\.)?(?:youtube\.com/(?:watch\?(?:[^#]*&)?v=|shorts/|embed/|live/)|youtu\.be/)"
+            r"(?P<id>[\w-]{11})",
+            re.I,
+        ),
+        source_url=_youtube_oembed_url,
+        parse=_parse_youtube,
+        max_bytes=16 * 1024,
+        max_chars=500,
+        # The watch page is a megabyte of script with no readable text
+        generic_fallback=False,
+    ),
+)
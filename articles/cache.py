@@ -0,0 +1,70 @@
+"""Run-scoped deduplication of article extraction."""
+
+import re
+import threading
+from concurrent.futures import Future
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|ref|ref_src|ref_url|fbclid|gclid|mc_cid|mc_eid|_hsenc|_hsmi)$', re.I)
+
+
+class ArticleCache:
+    """
+    Share extracted article content between editions processed in one run.
+    
+    Concurrent requests for the same article wait for the first fetch
+    instead of downloading it again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(url):
+        """
+        Return the cache key for ``url``.
+        
+        Tracking parameters and the fragment are stripped; other query
+        parameters (e.g. ``watch?v=...``) identify the page and are kept.
+        """
+        parts = urlsplit(url.strip())
+        query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                 if not TRACKING_PARAMS.match(name)]
+        return urlunsplit((parts.scheme, parts.netloc, parts.path.rstrip('/'), urlencode(query), ''))
+
+    def get_or_extract(self, url, extract):
+        """
+        Return the content for ``url``, calling ``extract(url)`` only once.
+        
+        Args:
+            url: Article URL
+            extract: Callable performing the actual extraction
+            
+        Returns:
+            Extracted content, or None if extraction failed
+        """
+        key = self.key_for(url)
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[key] = future
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            content = extract(url)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        future.set_result(content)
+        return content
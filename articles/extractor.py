@@ -1,55 +1,217 @@
 """Article content extraction."""
 
-from bs4 import BeautifulSoup
+import re
+from articles.adapters import match_adapter
 from utils.http import make_request
 from utils.text import truncate_text
 
-def extract_article_content(url, timeout=15, max_chars=None):
+# Elements that never hold article text
+NON_CONTENT_TAGS = ['script', 'style', 'nav', 'header', 'footer', 'aside', 'form',
+                    'iframe', 'noscript', 'svg', 'button']
+
+# class/id hints used to score containers, as in Readability
+POSITIVE_HINTS = re.compile(r'article|body|content|entry|main|page|post|text|blog|story', re.I)
+NEGATIVE_HINTS = re.compile(
+    r'comment|cookie|consent|banner|related|share|social|sidebar|newsletter|subscribe|'
+    r'promo|advert|sponsor|popup|modal|footer|masthead|breadcrumb|recommend|widget|meta|tags',
+    re.I
+)
+
+# A hinted block holding more than this share of the page's text is a wrapper
+# around the content (e.g. "container has-sidebar"), not boilerplate
+MAX_BOILERPLATE_TEXT_SHARE = 0.5
+
+# Blocks whose text is scored and kept
+TEXT_BLOCK_TAGS = ['p', 'pre', 'blockquote', 'li', 'h1', 'h2', 'h3', 'h4', 'td']
+MIN_BLOCK_CHARS = 25
+
+def _class_weight(element):
+    """Score an element by its class and id names."""
+    hints = " ".join(element.get('class') or []) + " " + (element.get('id') or "")
+    weight = 0
+    if POSITIVE_HINTS.search(hints):
+        weight += 25
+    if NEGATIVE_HINTS.search(hints):
+        weight -= 25
+    return weight
+
+def _link_density(element):
+    """Return the share of an element's text that sits inside links."""
+    text_length = len(element.get_text(strip=True))
+    if not text_length:
+        return 1.0
+    link_length = sum(len(a.get_text(strip=True)) for a in element.find_all('a'))
+    return link_length / text_length
+
+def remove_boilerplate(soup):
+    """
+    Drop non-content tags and blocks whose class/id marks them as boilerplate.
+
+    A hinted block is kept when it wraps an ``<article>`` or ``<main>`` or
+    holds most of the page's text, since the hints also match layout wrappers.
+    """
+    for element in soup(NON_CONTENT_TAGS):
+        element.decompose()
+
+    candidates = []
+    for element in soup.find_all(True):
+        if element.name in ('html', 'body', 'article', 'main'):
+            continue
+        hints = " ".join(element.get('class') or []) + " " + (element.get('id') or "")
+        if NEGATIVE_HINTS.search(hints) and not POSITIVE_HINTS.search(hints):
+            candidates.append(element)
+    if not candidates:
+        return
+
+    has_landmarks = soup.find(['article', 'main']) is not None
+    max_chars = len(soup.get_text(strip=True)) * MAX_BOILERPLATE_TEXT_SHARE
+    for element in candidates:
+        if element.decomposed:
+            continue
+        if has_landmarks and element.find(['article', 'main']) is not None:
+            continue
+        if len(element.get_text(strip=True)) > max_chars:
+            continue
+        element.decompose()
+
+def select_container(soup):
+    """
+    Pick the first conventional content container.
+    
+    This is the original heuristic and the fallback when scoring finds nothing
+    or its result is empty.
+    """
+    article = soup.find('article')
+    if not article:
+        # Look for other containers
+        for container in ['main', 'div[class*="content"]', 'div[class*="article"]', 'div[role="main"]']:
+            article = soup.select_one(container)
+            if article:
+                break
+    
+    # Last resort: use body if other containers not found
+    if not article:
+        article = soup.find('body')
+    
+    return article
+
+def select_main_content(soup):
+    """
+    Find the main article element by content-density scoring.
+    
+    Every text block adds to its parent's score (more for long, comma-rich
+    paragraphs) and half as much to its grandparent. Containers are then
+    weighted by class/id hints and penalised by link density, so comment
+    threads, related-links lists and banners lose to the article body.
+    
+    Returns:
+        The best scoring element, or None if there are no text blocks
+    """
+    scores = {}
+    elements = {}
+
+    for block in soup.find_all(['p', 'pre', 'blockquote', 'td']):
+        text = block.get_text(" ", strip=True)
+        if len(text) < MIN_BLOCK_CHARS:
+            continue
+
+        block_score = 1 + text.count(',') + min(len(text) // 100, 3)
+        for parent, share in ((block.parent, 1.0), (block.parent.parent if block.parent else None, 0.5)):
+            if parent is None or parent.name in (None, '[document]'):
+                continue
+            key = id(parent)
+            if key not in scores:
+                elements[key] = parent
+                scores[key] = _class_weight(parent)
+            scores[key] += block_score * share
+
+    if not scores:
+        return None
+
+    best_key = max(scores, key=lambda key: scores[key] * (1 - _link_density(elements[key])))
+    return elements[best_key]
+
+def content_text(element):
+    """Return the text of an element's content blocks, one block per line."""
+    blocks = []
+    for block in element.find_all(TEXT_BLOCK_TAGS):
+        # Nested blocks (e.g. a <p> inside an <li>) are reported by the outer one
+        if block.find_parent(TEXT_BLOCK_TAGS) is not None:
+            continue
+        text = block.get_text(" ", strip=True)
+        if text and (len(text) >= MIN_BLOCK_CHARS or block.name.startswith('h')) and _link_density(block) < 0.5:
+            blocks.append(text)
+
+    if blocks:
+        return "\n".join(blocks)
+    return element.get_text(separator='\n', strip=True)
+
+def extract_from_html(html, max_chars=None):
+    """
+    Extract the main article text from raw HTML.
+    
+    Args:
+        html: Raw HTML bytes or string
+        max_chars: Maximum characters to return
+        
+    Returns:
+        Extracted text, or None if the page has no content
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    remove_boilerplate(soup)
+
+    article = select_main_content(soup)
+    text = content_text(article) if article is not None else None
+    if not text:
+        # Scoring found nothing: the original heuristic, on a page that only
+        # lost its non-content tags
+        soup = BeautifulSoup(html, 'html.parser')
+        for element in soup(NON_CONTENT_TAGS):
+            element.decompose()
+        article = select_container(soup)
+        text = article.get_text(separator='\n', strip=True) if article else None
+
+    if not text:
+        return None
+
+    # Limit length if specified
+    if max_chars and len(text) > max_chars:
+        text = truncate_text(text, max_chars)
+
+    return text
+
+def extract_article_content(url, timeout=15, max_chars=None, html_extractor=extract_from_html):
     """
     Extract main content from an article URL.
     
+    Links with a site adapter (arXiv, GitHub, Hugging Face, YouTube) are
+    read from the adapter's lighter source; the page's HTML is only scraped
+    when no adapter matches or the adapter finds nothing and allows it.
+    
     Args:
         url: The article URL
         timeout: Request timeout in seconds
         max_chars: Maximum characters to extract
+        html_extractor: Callable turning (html, max_chars) into text, e.g. a
+            process-pool wrapper around ``extract_from_html``
         
     Returns:
         Extracted article content if successful, None otherwise
     """
     try:
+        adapter, match = match_adapter(url)
+        if adapter is not None:
+            content = adapter.fetch(match, timeout=timeout, max_chars=max_chars)
+            if content or not adapter.generic_fallback:
+                return content
+
         response = make_request(url, timeout=timeout)
         if not response:
             return None
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove non-content elements
-        for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-            element.decompose()
-        
-        # Find main content element
-        article = soup.find('article')
-        if not article:
-            # Look for other containers
-            for container in ['main', 'div[class*="content"]', 'div[class*="article"]', 'div[role="main"]']:
-                article = soup.select_one(container)
-                if article:
-                    break
-        
-        # Last resort: use body if other containers not found
-        if not article:
-            article = soup.find('body')
-        
-        if article:
-            text = article.get_text(separator='\n', strip=True)
-            
-            # Limit length if specified
-            if max_chars and len(text) > max_chars:
-                text = truncate_text(text, max_chars)
-                
-            return text
-            
-        return None
+        return html_extractor(response.content, max_chars)
         
     except Exception as e:
         print(f"Error extracting content from {url}: {e}")
@@ -0,0 +1,118 @@
+"""Speculative article fetching while AI selection runs."""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from articles.cache import ArticleCache
+from utils.metrics import incr, registry, span
+
+
+class ArticlePrefetcher:
+    """
+    Fetch the likeliest articles of an issue while the selection call runs.
+
+    The network would otherwise sit idle during the model call. Once
+    selection returns, ``resolve`` cancels queued fetches of rejected links
+    (running ones cannot be interrupted and count as wasted) and extraction
+    takes the futures of selected links with ``take`` instead of fetching
+    them again.
+    """
+
+    def __init__(self, extract, max_workers):
+        """
+        Initialize the prefetcher; nothing is fetched before ``start``.
+
+        Args:
+            extract: Callable returning the content of a URL (or None)
+            max_workers: Concurrent speculative fetches
+        """
+        self._extract = extract
+        self._executor = ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._started = {}
+        self._finished = {}
+        self._selected = set()
+        self.hits = 0
+        self.wasted = 0
+        self.cancelled = 0
+        self.saved_seconds = 0.0
+
+    def start(self, urls):
+        """Queue speculative fetches of ``urls``, most likely first."""
+        for url in urls:
+            key = ArticleCache.key_for(url)
+            if key not in self._futures:
+                self._futures[key] = self._executor.submit(contextvars.copy_context().run, self._fetch, url)
+
+    def resolve(self, selected_urls):
+        """
+        Settle the speculation once selection is known.
+
+        Args:
+            selected_urls: URLs chosen by selection
+        """
+        selected_at = time.perf_counter()
+        self._selected = {ArticleCache.key_for(url) for url in selected_urls}
+        for key, future in self._futures.items():
+            if key in self._selected:
+                continue
+            if future.cancel():
+                self.cancelled += 1
+            else:
+                self.wasted += 1
+
+        with self._lock:
+            for key in self._selected & set(self._futures):
+                started = self._started.get(key)
+                if started is None:
+                    # Still queued: nothing done ahead of extraction
+                    continue
+                self.hits += 1
+                # Fetch time that overlapped selection is taken off extraction
+                saved = min(self._finished.get(key, selected_at), selected_at) - started
+                self.saved_seconds += saved
+                registry.observe("article_prefetch_saved_seconds", saved)
+
+        incr("article_prefetch_total", self.hits, outcome="hit")
+        incr("article_prefetch_total", len(self._selected) - self.hits, outcome="miss")
+        incr("article_prefetch_total", self.wasted, outcome="wasted")
+        incr("article_prefetch_total", self.cancelled, outcome="cancelled")
+        # Queued fetches of selected links keep running; the executor stops with them
+        self._executor.shutdown(wait=False)
+
+    def take(self, url):
+        """Return the future of a prefetched selected link, or None to fetch it normally."""
+        key = ArticleCache.key_for(url)
+        if key not in self._selected:
+            return None
+        future = self._futures.get(key)
+        if future is None or future.cancelled():
+            return None
+        return future
+
+    def summary(self):
+        """Return a one-line report of hit rate, waste and time saved."""
+        selected = len(self._selected)
+        rate = self.hits * 100 / selected if selected else 0.0
+        return (
+            f"Prefetch: {self.hits}/{selected} selected article(s) started during selection "
+            f"(hit rate {rate:.0f}%), {self.wasted} wasted, {self.cancelled} cancelled, "
+            f"{self.saved_seconds:.1f}s of fetching overlapped selection."
+        )
+
+    # Internal helpers -------------------------------------------------
+    def _fetch(self, url):
+        key = ArticleCache.key_for(url)
+        with self._lock:
+            self._started[key] = time.perf_counter()
+        try:
+            with span("prefetch", url=url) as prefetch_span:
+                content = self._extract(url)
+                prefetch_span["chars"] = len(content or "")
+            return content
+        finally:
+            with self._lock:
+                self._finished[key] = time.perf_counter()
@@ -1,19 +1,79 @@
 """Article selection strategies."""
 
 import re
+from ai.client import AITimeoutError
+from articles.cache import ArticleCache
+from ai.usage import BUDGET_OK, BudgetExceededError, budget_state
 from ai.prompts import create_article_selection_prompt
+from utils.domain_health import domain_of
 
 class ArticleSelector:
     """Select relevant articles from a list of candidates."""
     
-    def __init__(self, ai_client=None):
+    def __init__(self, ai_client=None, domain_health=None):
         """
         Initialize the article selector.
         
         Args:
             ai_client: AI client for smart selection
+            domain_health: Optional DomainHealthStore used to prefer fetchable sources
         """
         self.ai_client = ai_client
+        self.domain_health = domain_health
+    
+    def filter_fetchable(self, potential_links):
+        """
+        Drop links to domains whose circuit is open and rank the rest by health.
+        
+        Args:
+            potential_links: List of potential article links
+            
+        Returns:
+            Links ordered from most to least fetchable (stable for ties)
+        """
+        if not self.domain_health:
+            return potential_links
+        
+        fetchable = [link for link in potential_links
+                     if not self.domain_health.is_open(domain_of(link["url"]))]
+        skipped = len(potential_links) - len(fetchable)
+        if skipped:
+            print(f"Skipping {skipped} link(s) to domains that are currently unreachable")
+        
+        return sorted(fetchable, key=lambda link: -self.domain_health.health_score(domain_of(link["url"])))
+    
+    def rank_candidates(self, potential_links, limit):
+        """
+        Guess the links AI selection will pick, without a model call.
+        
+        Keeps the newsletter's order, since headline stories come first, but
+        drops sponsored links and unreachable domains and lists one link per
+        domain before second links to a domain.
+        
+        Args:
+            potential_links: List of potential article links
+            limit: Maximum number of links to return
+            
+        Returns:
+            Up to ``limit`` URLs, most likely first
+        """
+        first, repeats = [], []
+        seen_urls = set()
+        seen_domains = set()
+        for link in potential_links:
+            url = link["url"]
+            # Same key as the article cache: tracking parameters differ, content does not
+            key = ArticleCache.key_for(url)
+            text = f"{link.get('text', '')} {link.get('context', '')}".lower()
+            if key in seen_urls or 'sponsor' in text:
+                continue
+            domain = domain_of(url)
+            if self.domain_health and self.domain_health.is_open(domain):
+                continue
+            seen_urls.add(key)
+            (repeats if domain in seen_domains else first).append(url)
+            seen_domains.add(domain)
+        return (first + repeats)[:limit]
     
     def select_simple(self, potential_links, max_articles=5):
         """
@@ -42,13 +102,17 @@ class ArticleSelector:
         
         return filtered
     
-    def select_with_ai(self, potential_links, newsletter_text):
+    def select_with_ai(self, potential_links, newsletter_text, timeout=None):
         """
         Use AI to select the most relevant articles.
         
+        Falls back to simple selection if the model call runs out of time or
+        the token budget is running low, keeping tokens for the summary.
+        
         Args:
             potential_links: List of potential article links
             newsletter_text: Text content of the newsletter
+            timeout: Optional time budget for the model call in seconds
             
         Returns:
             List of selected article URLs
@@ -60,6 +124,8 @@ class ArticleSelector:
             print("No links found in the newsletter.")
             return []
         
+        potential_links = self.filter_fetchable(potential_links)
+        
         # If we have very few links, just return all of them
         if len(potential_links) <= 5:
             print(f"Only {len(potential_links)} links found, returning all of them")
@@ -69,6 +135,10 @@ class ArticleSelector:
             print("No AI client provided for article selection.")
             return self.select_simple(potential_links)
         
+        if budget_state() != BUDGET_OK:
+            print("LLM token budget is running low; using simple selection.")
+            return self.select_simple(potential_links)
+        
         # Create the prompt for AI selection
         prompt = create_article_selection_prompt(
             potential_links, 
@@ -77,7 +147,14 @@ class ArticleSelector:
         )
         
         # Use the AI client to generate content
-        response = self.ai_client.generate_content(prompt)
+        try:
+            response = self.ai_client.generate_content(prompt, timeout=timeout, task="selection")
+        except AITimeoutError:
+            print("WARNING: AI selection timed out; using simple selection.")
+            return self.select_simple(potential_links)
+        except BudgetExceededError as e:
+            print(f"WARNING: {e}; using simple selection.")
+            return self.select_simple(potential_links)
         response_text = response.text.strip()
         
         # Extract the selected link numbers
@@ -106,10 +183,10 @@ class ArticleSelector:
         unique_links = []
         seen = set()
         for link in selected_links:
-            base_url = link.split('?')[0]
-            if base_url not in seen:
+            key = ArticleCache.key_for(link)
+            if key not in seen:
                 unique_links.append(link)
-                seen.add(base_url)
+                seen.add(key)
         
         print(f"AI selected {len(unique_links)} articles for analysis")
         return unique_links
@@ -0,0 +1 @@
+"""Offline benchmarks for the parsing, extraction and formatting hot paths."""
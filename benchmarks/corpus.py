@@ -0,0 +1,159 @@
+"""Benchmark corpus of TLDR issues and article pages.
+
+Saved pages dropped into ``benchmarks/corpus/newsletters/*.html`` and
+``benchmarks/corpus/articles/*.html`` are used as-is. When a directory is
+empty, a deterministic synthetic corpus with the same structure as real
+TLDR AI issues and typical article pages is generated instead, so the
+suite always runs offline.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+
+WORDS = (
+    "model inference training dataset benchmark agent reasoning open weights "
+    "latency throughput GPU cluster startup funding release research paper "
+    "OpenAI Anthropic Google Mistral Meta Nvidia transformer context window "
+    "fine-tuning evaluation safety alignment token pricing developer API"
+).split()
+
+
+@dataclass(frozen=True)
+class Page:
+    """A saved or generated HTML page."""
+
+    name: str
+    url: str
+    html: bytes
+
+
+def _sentence(rng: random.Random, min_words: int = 8, max_words: int = 20) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def generate_newsletter(rng: random.Random, issue_date: str, article_count: int = 16) -> Page:
+    """Generate a TLDR AI issue page with ``article_count`` linked stories."""
+    items = []
+    for i in range(article_count):
+        url = f"https://news-{i}.example.com/{issue_date}/story-{i}?utm_source=tldrai"
+        items.append(
+            f'<article class="mt-3"><a class="font-bold" href="{url}">'
+            f"<h3>{_sentence(rng, 4, 9)} ({rng.randint(2, 12)} minute read)</h3></a>"
+            f'<div class="newsletter-html">{_paragraph(rng, 3)}</div></article>'
+        )
+    social = (
+        '<a href="https://twitter.com/tldrnewsletter">Twitter</a>'
+        '<a href="https://tldr.tech/ai/subscribe">Subscribe</a>'
+    )
+    html = (
+        "<html><head><title>TLDR AI</title><script>var x = 1;</script></head><body>"
+        f"<header><nav>{social}</nav></header>"
+        f'<main><div class="max-w-3xl"><h1>TLDR AI {issue_date}</h1>'
+        f"<section><h2>Headlines &amp; Launches</h2>{''.join(items)}</section></div></main>"
+        f"<footer>{social}</footer></body></html>"
+    )
+    return Page(issue_date, f"https://tldr.tech/ai/{issue_date}", html.encode("utf-8"))
+
+
+def generate_article(rng: random.Random, index: int) -> Page:
+    """
+    Generate an article page with boilerplate, a body and a comment thread.
+    
+    Layouts rotate between a semantic ``<article>`` page, a page whose only
+    container is a ``div.page-content`` that also wraps related links and
+    comments, and a bare page with everything directly in ``<body>``.
+    """
+    body = "".join(f"<p>{_paragraph(rng, rng.randint(2, 5))}</p>" for _ in range(rng.randint(3, 14)))
+    related = "".join(
+        f'<li><a href="https://site-{index}.example.com/related/{j}">{_sentence(rng, 3, 6)}</a></li>'
+        for j in range(rng.randint(5, 25))
+    )
+    comments = "".join(
+        f'<div class="comment"><span class="author">user{j}</span><p>{_sentence(rng)}</p></div>'
+        for j in range(rng.randint(0, 40))
+    )
+    title = f"<h1>{_sentence(rng, 5, 10)}</h1>"
+    extras = (
+        f'<div class="related"><h3>Related</h3><ul>{related}</ul></div>'
+        f'<section class="comments">{comments}</section>'
+    )
+    layout = index % 3
+    if layout == 0:
+        main = f'<div class="page-content"><article>{title}{body}</article>{extras}</div>'
+    elif layout == 1:
+        main = f'<div class="page-content"><div class="post-body">{title}{body}</div>{extras}</div>'
+    else:
+        main = f"{title}<div>{body}</div>{extras}"
+
+    html = (
+        "<html><head><style>body { font: 14px sans-serif; }</style>"
+        f"<script>{'var tracking = {};' * 50}</script></head><body>"
+        '<div class="cookie-banner"><p>We use cookies to improve your experience on this website.</p>'
+        '<button>Accept</button></div>'
+        '<header><nav><a href="/">Home</a><a href="/about">About</a></nav></header>'
+        f"{main}"
+        "<footer><p>Copyright</p></footer></body></html>"
+    )
+    return Page(f"article-{index}", f"https://site-{index}.example.com/post", html.encode("utf-8"))
+
+
+def generate_summary(rng: random.Random, items: int = 5) -> str:
+    """Generate a briefing in the format the summary prompt asks Gemini for."""
+    parts = [f"<b>📰 AI News Briefing - 2025-06-{rng.randint(10, 28)}</b>"]
+    for _ in range(items):
+        parts.append(
+            f"<p><b>🔹 {_sentence(rng, 4, 8)}</b></p>\n\n"
+            f"<b>Что произошло:</b> <strong>{_paragraph(rng, 5)}</strong><br>\n\n"
+            f"<b>Почему важно:</b> <em>{_paragraph(rng, 4)}</em><br/>\n\n"
+            f"<b>Действия:</b> <div>{_paragraph(rng, 2)}</div>"
+        )
+    return "\n\n".join(parts)
+
+
+def generate_article_summary(rng: random.Random) -> str:
+    """Generate a short plain-text article summary, as the map prompt asks for."""
+    return _paragraph(rng, 4)
+
+
+def _load_saved(directory: Path, url_prefix: str) -> List[Page]:
+    pages = []
+    for path in sorted(directory.glob("*.html")):
+        pages.append(Page(path.stem, f"{url_prefix}{path.stem}", path.read_bytes()))
+    return pages
+
+
+def load_newsletters(count: int = 10, seed: int = 7) -> List[Page]:
+    """Return saved TLDR issues, or ``count`` generated ones."""
+    saved = _load_saved(CORPUS_DIR / "newsletters", "https://tldr.tech/ai/")
+    if saved:
+        return saved
+
+    rng = random.Random(seed)
+    return [generate_newsletter(rng, f"2025-06-{10 + i:02d}") for i in range(count)]
+
+
+def load_articles(count: int = 40, seed: int = 11) -> List[Page]:
+    """Return saved article pages, or ``count`` generated ones."""
+    saved = _load_saved(CORPUS_DIR / "articles", "https://saved.example.com/")
+    if saved:
+        return saved
+
+    rng = random.Random(seed)
+    return [generate_article(rng, i) for i in range(count)]
+
+
+def load_summaries(count: int = 20, seed: int = 13) -> List[str]:
+    """Return generated AI briefings for the formatting benchmarks."""
+    rng = random.Random(seed)
+    return [generate_summary(rng, rng.randint(4, 8)) for _ in range(count)]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compare the density-scoring extractor with the original container heuristic.
+
+For every article page in the corpus this reports extraction latency and the
+characters/estimated tokens each strategy would send to Gemini, both raw and
+after the ``ARTICLE_EXTRACT_MAX_CHARS`` cut.
+
+Usage:
+    python -m benchmarks.extraction
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+import config
+from articles.extractor import extract_from_html
+from benchmarks.corpus import load_articles
+from utils.text import estimate_tokens, truncate_text
+
+
+def extract_legacy(html, max_chars=None):
+    """The original extractor: first matching container, boilerplate included."""
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
+        element.decompose()
+
+    article = soup.find('article')
+    if not article:
+        for container in ['main', 'div[class*="content"]', 'div[class*="article"]', 'div[role="main"]']:
+            article = soup.select_one(container)
+            if article:
+                break
+    if not article:
+        article = soup.find('body')
+    if not article:
+        return None
+
+    text = article.get_text(separator='\n', strip=True)
+    if max_chars and len(text) > max_chars:
+        text = truncate_text(text, max_chars)
+    return text
+
+
+def run_strategy(func, pages, iterations=3):
+    """Return (median latency in ms, raw texts) for one strategy."""
+    latencies = []
+    texts = []
+    for iteration in range(iterations):
+        for page in pages:
+            start = time.perf_counter()
+            text = func(page.html)
+            latencies.append(time.perf_counter() - start)
+            if iteration == 0:
+                texts.append(text or "")
+    return statistics.median(latencies) * 1000, texts
+
+
+def main() -> int:
+    pages = load_articles()
+    limit = config.ARTICLE_EXTRACT_MAX_CHARS
+    total_mb = sum(len(page.html) for page in pages) / 1_000_000
+
+    rows = []
+    for name, func in (("container", extract_legacy), ("density", extract_from_html)):
+        median_ms, texts = run_strategy(func, pages)
+        raw_chars = sum(len(text) for text in texts)
+        sent_chars = sum(len(truncate_text(text, limit)) for text in texts)
+        rows.append((name, median_ms, raw_chars, estimate_tokens("x" * raw_chars),
+                     sent_chars, estimate_tokens("x" * sent_chars)))
+
+    print(f"{len(pages)} article pages, {total_mb:.2f} MB, cut at {limit} chars\n")
+    header = f"{'strategy':<11}{'p50 ms':>9}{'raw chars':>12}{'raw tokens':>12}{'sent chars':>12}{'sent tokens':>13}"
+    print(header)
+    print("-" * len(header))
+    for name, median_ms, raw_chars, raw_tokens, sent_chars, sent_tokens in rows:
+        print(f"{name:<11}{median_ms:>9.2f}{raw_chars:>12}{raw_tokens:>12}{sent_chars:>12}{sent_tokens:>13}")
+
+    before, after = rows
+    print(
+        f"\nRaw text reduced by {1 - after[2] / before[2]:.0%}, "
+        f"characters sent to Gemini by {1 - after[4] / before[4]:.0%}; "
+        f"extraction {after[1] / before[1]:.2f}x the container heuristic's time."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
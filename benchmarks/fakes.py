@@ -0,0 +1,143 @@
+"""Fake network and fake Gemini used by the offline benchmarks."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Dict, Iterator, List
+from unittest import mock
+
+import requests
+
+from benchmarks.corpus import Page, generate_article_summary, generate_summary
+from utils.text import estimate_tokens
+
+
+class FakeResponse:
+    """Minimal stand-in for ``requests.Response``."""
+
+    def __init__(self, url: str, status_code: int, content: bytes = b""):
+        self.url = url
+        self.status_code = status_code
+        # Named like requests' attribute, which a capped read replaces
+        self._content = content
+        self.headers = {"Content-Type": "text/html; charset=utf-8"}
+
+    @property
+    def content(self) -> bytes:
+        return self._content
+
+    def iter_content(self, chunk_size: int = 1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self) -> None:
+        pass
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for {self.url}", response=self)
+
+
+class FakeNetwork:
+    """
+    Serve newsletter pages by URL and article pages round-robin.
+    
+    Archive pages list the corpus issues of their edition; any other TLDR
+    URL that is not in the corpus answers 404, like a missing issue.
+    """
+
+    def __init__(self, newsletters: List[Page], articles: List[Page]):
+        self.pages: Dict[str, bytes] = {page.url: page.html for page in newsletters}
+        self.articles = articles
+        self.requests = 0
+        self._next_article = 0
+
+    def get(self, url, headers=None, timeout=None, allow_redirects=True, **kwargs):
+        self.requests += 1
+        if url in self.pages:
+            return FakeResponse(url, 200, self.pages[url])
+        if url.endswith("/archives"):
+            prefix = url[:-len("archives")]
+            links = "".join(
+                f'<a href="{page_url[len("https://tldr.tech"):]}">{page_url}</a>'
+                for page_url in self.pages if page_url.startswith(prefix)
+            )
+            return FakeResponse(url, 200, f"<html><body>{links}</body></html>".encode("utf-8"))
+        if "tldr.tech" in url:
+            return FakeResponse(url, 404)
+
+        page = self.articles[self._next_article % len(self.articles)]
+        self._next_article += 1
+        return FakeResponse(url, 200, page.html)
+
+
+@contextmanager
+def fake_network(newsletters: List[Page], articles: List[Page]) -> Iterator[FakeNetwork]:
+    """Route every ``utils.http`` request to a :class:`FakeNetwork`."""
+    network = FakeNetwork(newsletters, articles)
+    session = SimpleNamespace(get=network.get, head=network.get)
+    with mock.patch("utils.http._session", session):
+        yield network
+
+
+class FakeResult:
+    """Minimal stand-in for a Gemini response."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.usage_metadata = None
+
+
+class FakeAIClient:
+    """
+    Answer selection prompts with article numbers, article prompts with a short
+    summary and everything else with a briefing.
+
+    Optional latencies emulate a hosted model: a fixed cost per call plus a
+    cost per prompt and per generated token. Token counts are estimated.
+    """
+
+    def __init__(
+        self,
+        seed: int = 3,
+        call_latency: float = 0.0,
+        prompt_token_latency: float = 0.0,
+        output_token_latency: float = 0.0,
+    ):
+        self.rng = random.Random(seed)
+        self.call_latency = call_latency
+        self.prompt_token_latency = prompt_token_latency
+        self.output_token_latency = output_token_latency
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, **kwargs):
+        prompt = str(prompt)
+        with self._lock:
+            if "Selected:" in prompt:
+                text = "Selected: 1, 3, 5, 7, 9, 11"
+            elif "Summarise this article" in prompt:
+                text = generate_article_summary(self.rng)
+            else:
+                text = generate_summary(self.rng)
+            prompt_tokens = estimate_tokens(prompt)
+            output_tokens = estimate_tokens(text)
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
+
+        delay = (self.call_latency + prompt_tokens * self.prompt_token_latency
+                 + output_tokens * self.output_token_latency)
+        if delay:
+            time.sleep(delay)
+        return FakeResult(text)
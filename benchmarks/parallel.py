@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Measure HTML parsing throughput against the number of parse worker processes.
+
+Every newsletter and article page in the corpus is submitted from a thread
+pool, as concurrent fetches would during a backfill, and parsed through a
+``ParsePool`` with 1 (inline), 2, 4, ... workers up to the core count.
+
+Usage:
+    python -m benchmarks.parallel
+    python -m benchmarks.parallel --workers 1 2 4 8 --iterations 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from benchmarks.corpus import load_articles, load_newsletters
+from utils.parse_pool import ParsePool
+
+
+def default_worker_counts():
+    """Powers of two up to the core count, always including the core count."""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def run_pool(workers, newsletters, articles, iterations):
+    """Return pages/s for parsing the corpus ``iterations`` times with ``workers`` processes."""
+    pool = ParsePool(workers)
+    jobs = [(pool.parse_newsletter, page.html, page.url) for page in newsletters]
+    jobs += [(pool.extract_article, page.html, config.ARTICLE_EXTRACT_MAX_CHARS) for page in articles]
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1) * 2) as threads, \
+            contextlib.redirect_stdout(io.StringIO()):
+        # Warm-up starts the worker processes outside the timed section
+        list(threads.map(lambda job: job[0](*job[1:]), jobs))
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            list(threads.map(lambda job: job[0](*job[1:]), jobs))
+        elapsed = time.perf_counter() - start
+    pool.shutdown()
+    return len(jobs) * iterations / elapsed
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Parse throughput versus worker processes")
+    arg_parser.add_argument("--workers", type=int, nargs="*", help="worker counts to try")
+    arg_parser.add_argument("--iterations", type=int, default=3, help="passes over the corpus")
+    args = arg_parser.parse_args(argv)
+
+    newsletters = load_newsletters()
+    articles = load_articles()
+    counts = args.workers or default_worker_counts()
+    print(f"{len(newsletters)} newsletters + {len(articles)} articles, {os.cpu_count()} cores\n")
+
+    header = f"{'workers':>8}{'pages/s':>10}{'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    inline = None
+    for workers in counts:
+        pages_per_s = run_pool(workers, newsletters, articles, args.iterations)
+        inline = inline or pages_per_s
+        print(f"{workers:>8}{pages_per_s:>10.1f}{pages_per_s / inline:>8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Run the offline benchmark suite and compare it against the stored baseline.
+
+Usage:
+    python -m benchmarks.run                    # run and compare
+    python -m benchmarks.run --update-baseline  # record a new baseline
+    python -m benchmarks.run --only parser e2e  # run a subset
+"""
+
+from __future__ import annotations
+
+import os
+
+# Keep span logs out of the timings and the report
+os.environ.setdefault("METRICS_JSON_LOGS", "false")
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+import config
+import main as pipeline
+from articles.extractor import extract_article_content
+from benchmarks.corpus import load_articles, load_newsletters, load_summaries
+from benchmarks.fakes import FakeAIClient, fake_network
+from newsletter.parser import NewsletterParser
+from telegram_notifications.client import clean_html_for_telegram, split_message_smart
+from utils.content import sanitize_ai_content
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+
+
+@dataclass
+class Benchmark:
+    """A named hot path with its inputs and their sizes in bytes."""
+
+    name: str
+    func: Callable[[object], object]
+    inputs: Sequence[object]
+    sizes: Sequence[int]
+
+
+@dataclass
+class Result:
+    """Measurements of a single benchmark."""
+
+    name: str
+    pages_per_s: float
+    mb_per_s: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_kib: float
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "pages_per_s": round(self.pages_per_s, 2),
+            "mb_per_s": round(self.mb_per_s, 3),
+            "p50_ms": round(self.p50_ms, 3),
+            "p95_ms": round(self.p95_ms, 3),
+            "p99_ms": round(self.p99_ms, 3),
+            "peak_kib": round(self.peak_kib, 1),
+        }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``values`` using nearest-rank."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def measure(bench: Benchmark, iterations: int) -> Result:
+    """Time every input ``iterations`` times after a warm-up, then measure peak memory in a separate pass."""
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Warm-up pass so lazy imports and caches don't skew the first samples
+        for item in bench.inputs:
+            bench.func(item)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for item in bench.inputs:
+                call_start = time.perf_counter()
+                bench.func(item)
+                latencies.append(time.perf_counter() - call_start)
+        elapsed = time.perf_counter() - start
+
+        # tracemalloc slows allocation down, so it must not overlap the timings
+        tracemalloc.start()
+        for item in bench.inputs:
+            bench.func(item)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    total_bytes = sum(bench.sizes) * iterations
+    return Result(
+        name=bench.name,
+        pages_per_s=len(latencies) / elapsed,
+        mb_per_s=total_bytes / elapsed / 1_000_000,
+        p50_ms=percentile(latencies, 50) * 1000,
+        p95_ms=percentile(latencies, 95) * 1000,
+        p99_ms=percentile(latencies, 99) * 1000,
+        peak_kib=peak / 1024,
+    )
+
+
+def build_benchmarks() -> List[Benchmark]:
+    """Assemble the benchmark list from the corpus."""
+    newsletters = load_newsletters()
+    articles = load_articles()
+    summaries = load_summaries()
+    cleaned = [clean_html_for_telegram(text) for text in summaries]
+
+    def parse(page):
+        parser = NewsletterParser(page.html)
+        parser.extract_links()
+        return parser.get_newsletter_text()
+
+    def extract(page):
+        with fake_network([], [page]):
+            return extract_article_content(page.url, max_chars=config.ARTICLE_EXTRACT_MAX_CHARS)
+
+    def collect(page):
+        target_date = date.fromisoformat(page.url.rsplit("/", 1)[1])
+        with fake_network(newsletters, articles):
+            return pipeline.collect_newsletter_data(FakeAIClient(), target_date)
+
+    def encoded(texts):
+        return [len(text.encode("utf-8")) for text in texts]
+
+    return [
+        Benchmark("parser", parse, newsletters, [len(p.html) for p in newsletters]),
+        Benchmark("extractor", extract, articles, [len(p.html) for p in articles]),
+        Benchmark("clean_html", clean_html_for_telegram, summaries, encoded(summaries)),
+        Benchmark("splitter", lambda text: split_message_smart(text, 1000), cleaned, encoded(cleaned)),
+        Benchmark("sanitizer", sanitize_ai_content, summaries, encoded(summaries)),
+        Benchmark("e2e", collect, newsletters, [len(p.html) for p in newsletters]),
+    ]
+
+
+def compare(results: List[Result], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Return a message for every benchmark whose median latency regressed."""
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if not reference:
+            continue
+        limit = reference["p50_ms"] * tolerance
+        if result.p50_ms > limit:
+            regressions.append(
+                f"{result.name}: p50 {result.p50_ms:.3f} ms > {limit:.3f} ms "
+                f"(baseline {reference['p50_ms']:.3f} ms x {tolerance})"
+            )
+    return regressions
+
+
+def print_report(results: List[Result], baseline: Dict[str, Dict[str, float]]) -> None:
+    header = f"{'benchmark':<12}{'pages/s':>10}{'MB/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KiB':>10}{'vs base':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        reference = baseline.get(r.name)
+        delta = f"{r.p50_ms / reference['p50_ms']:.2f}x" if reference else "new"
+        print(
+            f"{r.name:<12}{r.pages_per_s:>10.1f}{r.mb_per_s:>9.2f}{r.p50_ms:>10.3f}"
+            f"{r.p95_ms:>10.3f}{r.p99_ms:>10.3f}{r.peak_kib:>10.1f}{delta:>9}"
+        )
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Offline hot-path benchmarks")
+    arg_parser.add_argument("--iterations", type=int, default=3, help="passes over the corpus")
+    arg_parser.add_argument("--tolerance", type=float, default=2.0, help="allowed p50 slowdown factor")
+    arg_parser.add_argument("--update-baseline", action="store_true", help="store results as the new baseline")
+    arg_parser.add_argument("--only", nargs="*", help="benchmark names to run")
+    args = arg_parser.parse_args(argv)
+
+    benchmarks = build_benchmarks()
+    if args.only:
+        benchmarks = [b for b in benchmarks if b.name in args.only]
+
+    baseline = json.loads(BASELINE_FILE.read_text(encoding="utf-8")) if BASELINE_FILE.exists() else {}
+    results = [measure(bench, args.iterations) for bench in benchmarks]
+    print_report(results, baseline)
+
+    if args.update_baseline:
+        baseline.update({r.name: r.to_dict() for r in results})
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\nBaseline written to {BASELINE_FILE}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nPERFORMANCE REGRESSION:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Measure CLI startup: the import time of ``main`` and an idle one-shot run.
+
+Each measurement runs a fresh interpreter with ``-X importtime`` and reads
+its report, so the numbers include everything a systemd timer run pays
+before it can decide there is nothing to do. The idle run uses a temporary
+run state that already covers today and also checks that none of the heavy
+SDKs were imported on the way.
+
+Results can be appended to ``benchmarks/startup_history.jsonl`` to track
+startup over time; each run is compared with the last recorded entry.
+
+Usage:
+    python -m benchmarks.startup                  # measure and compare with history
+    python -m benchmarks.startup --record         # also append to the history
+    python -m benchmarks.startup --runs 9 --top 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HISTORY_FILE = Path(__file__).parent / "startup_history.jsonl"
+
+# Packages an idle run must not import
+HEAVY_MODULES = ("google.generativeai", "telegram", "bs4", "requests", "jinja2", "flask")
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse a ``-X importtime`` report.
+
+    Returns:
+        Self and cumulative microseconds per imported module
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def run_python(args: List[str], cwd: Path, env: Optional[Dict[str, str]] = None) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """Run a fresh interpreter with ``-X importtime``; return its wall time in ms and its imports."""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited with {completed.returncode}:\n{completed.stderr[-2000:]}")
+    return elapsed_ms, parse_importtime(completed.stderr)
+
+
+def measure_import(runs: int) -> Tuple[float, Counter]:
+    """Return the median cumulative import time of ``main`` in ms and the median self time per package."""
+    totals = []
+    per_run = []
+    for _ in range(runs):
+        _, modules = run_python(["-c", "import main"], REPO_ROOT)
+        totals.append(modules["main"][1] / 1000)
+        packages: Counter = Counter()
+        for name, (self_us, _) in modules.items():
+            packages[name.split(".")[0]] += self_us / 1000
+        per_run.append(packages)
+
+    names = set().union(*per_run)
+    medians = Counter({name: statistics.median(run.get(name, 0.0) for run in per_run) for name in names})
+    return statistics.median(totals), medians
+
+
+def measure_idle(runs: int) -> Tuple[float, List[str]]:
+    """
+    Return the median wall time of an idle ``python main.py`` in ms and the heavy modules it imported.
+
+    Today is recorded as done, so the run only plans dates and exits.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        state = {"dates": {date.today().isoformat(): True}}
+        (tmp_dir / "run_state.json").write_text(json.dumps(state), encoding="utf-8")
+        env = dict(
+            os.environ,
+            NEWSLETTER_EDITIONS="ai",
+            RUN_STATE_FILE=str(tmp_dir / "run_state.json"),
+            TELEGRAM_ENABLED="false",
+            WEEKLY_DIGEST_ENABLED="false",
+            OUTBOX_FILE=str(tmp_dir / "outbox.db"),
+            METRICS_FILE=str(tmp_dir / "metrics.prom"),
+            DOMAIN_HEALTH_FILE=str(tmp_dir / "domain_health.json"),
+        )
+        timings = []
+        heavy = set()
+        for _ in range(runs):
+            elapsed_ms, modules = run_python([str(REPO_ROOT / "main.py")], tmp_dir, env)
+            timings.append(elapsed_ms)
+            heavy.update(
+                module for module in HEAVY_MODULES
+                if any(name == module or name.startswith(module + ".") for name in modules)
+            )
+    return statistics.median(timings), sorted(heavy)
+
+
+def measure_interpreter(runs: int) -> float:
+    """Return the median wall time of a bare interpreter in ms, the floor of any CLI run."""
+    return statistics.median(run_python(["-c", "pass"], REPO_ROOT)[0] for _ in range(runs))
+
+
+def git_commit() -> str:
+    """Return the short commit measured ("-dirty" with local changes), or an empty string outside git."""
+    try:
+        completed = subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=REPO_ROOT, capture_output=True, text=True,
+        )
+    except OSError:
+        return ""
+    return completed.stdout.strip()
+
+
+def read_history() -> List[Dict[str, object]]:
+    """Return the recorded startup measurements, oldest first."""
+    if not HISTORY_FILE.exists():
+        return []
+    entries = []
+    for line in HISTORY_FILE.read_text(encoding="utf-8").splitlines():
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return entries
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="CLI import time and idle run benchmark")
+    arg_parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    arg_parser.add_argument("--top", type=int, default=12, help="packages listed by import time")
+    arg_parser.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown against the last entry")
+    arg_parser.add_argument("--record", action="store_true", help=f"append the result to {HISTORY_FILE.name}")
+    args = arg_parser.parse_args(argv)
+
+    interpreter_ms = measure_interpreter(args.runs)
+    import_ms, packages = measure_import(args.runs)
+    idle_ms, heavy = measure_idle(args.runs)
+
+    print(f"Python {sys.version.split()[0]}, median of {args.runs} run(s)\n")
+    print(f"{'bare interpreter':<24}{interpreter_ms:>10.1f} ms")
+    print(f"{'import main':<24}{import_ms:>10.1f} ms")
+    print(f"{'idle main.py run':<24}{idle_ms:>10.1f} ms")
+    print("\nSlowest packages (self time, incl. interpreter startup):")
+    for name, self_ms in packages.most_common(args.top):
+        print(f"  {name:<28}{self_ms:>8.1f} ms")
+
+    failures = []
+    if heavy:
+        failures.append(f"idle run imported {', '.join(heavy)}")
+
+    history = read_history()
+    if history:
+        last = history[-1]
+        print(f"\nLast recorded ({last['date']}, {last.get('commit') or 'no commit'}): "
+              f"import {last['import_ms']:.1f} ms, idle {last['idle_ms']:.1f} ms")
+        for key, value in (("import_ms", import_ms), ("idle_ms", idle_ms)):
+            if value > last[key] * args.tolerance:
+                failures.append(f"{key} {value:.1f} exceeds {last[key]:.1f} x {args.tolerance}")
+
+    if args.record:
+        entry = {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "interpreter_ms": round(interpreter_ms, 1),
+            "import_ms": round(import_ms, 1),
+            "idle_ms": round(idle_ms, 1),
+            "top": {name: round(self_ms, 1) for name, self_ms in packages.most_common(args.top)},
+        }
+        with HISTORY_FILE.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry, sort_keys=True) + "\n")
+        print(f"\nRecorded in {HISTORY_FILE}.")
+
+    if failures:
+        print("\nStartup regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nNo startup regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Compare single-prompt and map-reduce summarization.
+
+Each corpus newsletter is collected once with a fake network, then
+summarised in three ways against a fake Gemini that charges a fixed cost per
+call plus a cost per prompt and per generated token:
+
+* ``single``        one large prompt (``SUMMARY_CONTENT_MAX_CHARS`` cut)
+* ``map_reduce``    article summaries in parallel, then a small reduce prompt
+* ``map_reduce*``   the same with a warm article summary cache
+
+Latencies are scaled down by ``--scale`` so the run stays short; the
+relative numbers are what matter.
+
+Usage:
+    python -m benchmarks.summarization
+    python -m benchmarks.summarization --scale 0.1 --count 3
+"""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("METRICS_JSON_LOGS", "false")
+
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from unittest import mock
+
+import config
+import main as pipeline
+from benchmarks.corpus import load_articles, load_newsletters
+from benchmarks.fakes import FakeAIClient, fake_network
+
+# Roughly a hosted model: 0.5 s per call, 20k prompt tokens/s, 100 output tokens/s
+CALL_LATENCY = 0.5
+PROMPT_TOKEN_LATENCY = 1 / 20_000
+OUTPUT_TOKEN_LATENCY = 1 / 100
+
+
+def collect(newsletters, articles):
+    """Run the collection stage once per newsletter."""
+    collected = []
+    with fake_network(newsletters, articles), contextlib.redirect_stdout(io.StringIO()):
+        for page in newsletters:
+            target_date = date.fromisoformat(page.url.rsplit("/", 1)[1])
+            collected.append(pipeline.collect_newsletter_data(FakeAIClient(), target_date))
+    return collected
+
+
+def run_mode(mode, collected, scale):
+    """Return (latencies, fake client) for summarising every newsletter in ``mode``."""
+    client = FakeAIClient(
+        call_latency=CALL_LATENCY * scale,
+        prompt_token_latency=PROMPT_TOKEN_LATENCY * scale,
+        output_token_latency=OUTPUT_TOKEN_LATENCY * scale,
+    )
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for newsletter_data in collected:
+            start = time.perf_counter()
+            pipeline.create_summary(newsletter_data, client, mode=mode)
+            latencies.append(time.perf_counter() - start)
+    return latencies, client
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Single-prompt vs map-reduce summarization")
+    arg_parser.add_argument("--scale", type=float, default=0.05, help="fake model latency multiplier")
+    arg_parser.add_argument("--count", type=int, default=5, help="newsletters to summarise")
+    args = arg_parser.parse_args(argv)
+
+    newsletters = load_newsletters()[:args.count]
+    collected = collect(newsletters, load_articles())
+    single_chars = sum(min(len(data['content']), config.SUMMARY_CONTENT_MAX_CHARS) for data in collected)
+    article_chars = sum(len(a['content']) for data in collected for a in data['articles'])
+
+    rows = []
+    with tempfile.TemporaryDirectory() as cache_dir, \
+            mock.patch.object(config, "ARTICLE_SUMMARY_CACHE_DIR", cache_dir):
+        for label, mode in (("single", "single"), ("map_reduce", "map_reduce"), ("map_reduce*", "map_reduce")):
+            latencies, client = run_mode(mode, collected, args.scale)
+            rows.append((label, statistics.median(latencies) * 1000, client))
+
+    count = len(collected)
+    print(f"{count} newsletters, model latency x{args.scale}, "
+          f"{config.SUMMARY_MAP_WORKERS} map workers\n")
+    header = f"{'mode':<13}{'p50 ms':>9}{'calls':>7}{'prompt tok':>12}{'output tok':>12}{'total tok':>11}"
+    print(header)
+    print("-" * len(header))
+    for label, median_ms, client in rows:
+        print(
+            f"{label:<13}{median_ms:>9.1f}{client.calls / count:>7.1f}"
+            f"{client.prompt_tokens / count:>12.0f}{client.output_tokens / count:>12.0f}"
+            f"{(client.prompt_tokens + client.output_tokens) / count:>11.0f}"
+        )
+    print("\nPer newsletter; * = warm article summary cache.")
+    print(f"Article text reaching the model: single {single_chars / count:.0f} chars "
+          f"(after the {config.SUMMARY_CONTENT_MAX_CHARS}-char cut), "
+          f"map-reduce {article_chars / count:.0f} chars.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,22 +9,108 @@ load_dotenv()
 # Use the most current version available
 GEMINI_MODEL = 'gemini-2.5-flash'
 
-# Alternative models if needed for specific purposes
-# GEMINI_LIGHT_MODEL = 'gemini-pro'  # Uncomment if needed
+# Lighter, faster model for short tasks such as article selection
+GEMINI_LIGHT_MODEL = os.getenv("GEMINI_LIGHT_MODEL", 'gemini-2.5-flash-lite')
 # GEMINI_VISION_MODEL = 'gemini-pro-vision'  # Uncomment if needed
 
+# Models per task type, tried in order: a call falls back to the next model
+# when the previous one is out of quota, unavailable or times out
+MODEL_ROUTES = {
+    "default": [GEMINI_MODEL, GEMINI_LIGHT_MODEL],
+    "summary": [GEMINI_MODEL, GEMINI_LIGHT_MODEL],
+    "article_summary": [GEMINI_LIGHT_MODEL, GEMINI_MODEL],
+    "selection": [GEMINI_LIGHT_MODEL, GEMINI_MODEL],
+    "qa": [GEMINI_LIGHT_MODEL, GEMINI_MODEL],
+    "history_summary": [GEMINI_LIGHT_MODEL, GEMINI_MODEL],
+    "digest": [GEMINI_MODEL, GEMINI_LIGHT_MODEL],
+}
+
+# USD per million (prompt, response) tokens, used to report cost per route
+MODEL_PRICES = {
+    'gemini-2.5-flash': (0.30, 2.50),
+    'gemini-2.5-flash-lite': (0.10, 0.40),
+}
+
+# LLM usage ledger (SQLite): tokens, latency, model and call site of every
+# call, rolled up with `python main.py --usage`; empty disables it
+LLM_USAGE_DB_FILE = os.getenv("LLM_USAGE_DB_FILE", "llm_usage.db")
+LLM_USAGE_RETENTION_DAYS = 90
+
+# Token budgets (prompt + response) per calendar day, shared by every process
+# using the ledger, and per run (CLI invocation, daemon cycle, web request);
+# 0 disables a budget
+LLM_DAILY_TOKEN_BUDGET = int(os.getenv("LLM_DAILY_TOKEN_BUDGET", "0"))
+LLM_RUN_TOKEN_BUDGET = int(os.getenv("LLM_RUN_TOKEN_BUDGET", "0"))
+# Below this many remaining tokens the pipeline degrades: simple article
+# selection and one summary prompt with content cut to fit
+LLM_TIGHT_BUDGET_TOKENS = 20000
+# Tokens kept back for the response when sizing a prompt against the budget
+LLM_RESPONSE_TOKEN_RESERVE = 2000
+# A briefing from less content than this is not worth the tokens
+LLM_MIN_SUMMARY_CONTENT_CHARS = 2000
+
 # API configuration
 API_KEY_ENV_VAR = "GEMINI_API_KEY"
 
+# TLDR editions to follow, e.g. "ai,tech,webdev"
+NEWSLETTER_EDITIONS = os.getenv("NEWSLETTER_EDITIONS", "ai").split(',')
+
+# Shared HTTP connection pool and Gemini request rate limit across editions
+HTTP_POOL_MAXSIZE = 20
+GEMINI_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+
+# Per-domain health tracking: adaptive timeouts, AIMD concurrency and a
+# circuit breaker that skips failing domains for a cooldown
+DOMAIN_HEALTH_FILE = os.getenv("DOMAIN_HEALTH_FILE", "domain_health.json")
+DOMAIN_MIN_TIMEOUT = 3
+DOMAIN_MAX_CONCURRENCY = 4
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_COOLDOWN_HOURS = 24
+
+# Time budgets (seconds). Extraction gets a share of what is left after
+# selection; articles still running when it expires are dropped.
+DATE_TIME_BUDGET_SECONDS = int(os.getenv("DATE_TIME_BUDGET_SECONDS", "300"))
+WEB_TIME_BUDGET_SECONDS = int(os.getenv("WEB_TIME_BUDGET_SECONDS", "120"))
+LAMBDA_SAFETY_MARGIN_SECONDS = 10
+SELECTION_BUDGET_SHARE = 0.2
+EXTRACTION_BUDGET_SHARE = 0.5
+ARTICLE_FETCH_WORKERS = 6
+
+# Articles fetched speculatively while AI selection runs (0 disables). This is
+# also the most fetches a date can waste on links selection then rejects.
+PREFETCH_ARTICLES = int(os.getenv("PREFETCH_ARTICLES", "5"))
+
+# Process pool for CPU-bound HTML parsing; 1 parses inline in the calling thread
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 1)))
+
 # Content limits
 NEWSLETTER_EXTRACT_MAX_CHARS = 5000
 ARTICLE_EXTRACT_MAX_CHARS = 3000
 SUMMARY_CONTENT_MAX_CHARS = 15000
 
+# Links to arXiv, GitHub, Hugging Face and YouTube are read through their
+# lightweight sources (see articles/adapters.py) instead of the HTML page.
+# A GitHub token raises the API rate limit from 60 to 5000 requests per hour.
+SITE_ADAPTERS_ENABLED = os.getenv("SITE_ADAPTERS_ENABLED", "True").lower() in ('true', '1', 't')
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
+
+# Retrieval-based Q&A: chunk size and number of chunks sent per question
+QA_CHUNK_MAX_CHARS = 1200
+QA_TOP_K_CHUNKS = 5
+
+# Multi-turn Q&A sessions: older turns are compacted into a summary once the
+# conversation history exceeds the token threshold
+QA_SESSION_DIR = os.getenv("QA_SESSION_DIR", "qa_sessions")
+QA_HISTORY_MAX_TOKENS = 3000
+QA_HISTORY_KEEP_TURNS = 2
+
 # Proxy configuration for Gemini API
 # Use a custom environment variable to avoid conflicts with system-wide proxies
 PROXY_ENV_VAR = "HTTPS_PROXY_GEMINI"
 
+# Optional Gemini REST endpoint override (e.g. the local stand-in used for load tests)
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+
 # --- Telegram Bot Configuration ---
 # To enable the Telegram bot, set TELEGRAM_ENABLED to True
 # and configure the bot token and user IDs.
@@ -41,5 +127,85 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 # It is recommended to set this as an environment variable.
 TELEGRAM_USER_IDS = os.getenv("TELEGRAM_USER_IDS", "").split(',')
 
+# Subscribers who sent /start to the bot (SQLite); they receive the briefing
+# alongside TELEGRAM_USER_IDS until they send /stop or block the bot
+SUBSCRIBER_DB_FILE = os.getenv("SUBSCRIBER_DB_FILE", "subscribers.db")
+# Long-polling timeout for bot updates (getUpdates) in daemon mode
+SUBSCRIBER_POLL_TIMEOUT_SECONDS = 30
+
+# Per-subscriber topic profiles (JSON: {"<user id>": {"topics": ["research"]}})
+SUBSCRIBER_PROFILES_FILE = os.getenv("SUBSCRIBER_PROFILES_FILE", "subscriber_profiles.json")
+
+# Generated summaries, cached per edition, date and profile
+SUMMARY_CACHE_DIR = os.getenv("SUMMARY_CACHE_DIR", "summaries")
+
+# Pre-rendered briefing pages served by the web and Lambda handlers (empty disables)
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "briefing_archive")
+# Pages missing from the archive are generated live only for the configured
+# editions and dates at most this many days old; anything else is a 404
+ARCHIVE_LIVE_DAYS = int(os.getenv("ARCHIVE_LIVE_DAYS", "14"))
+
+# Full-text index of past newsletters, articles and briefings (empty disables)
+SEARCH_INDEX_FILE = os.getenv("SEARCH_INDEX_FILE", "search_index.db")
+SEARCH_RESULT_LIMIT = 20
+
+# Summarization mode: "single" sends one large prompt, "map_reduce" summarises
+# each article in parallel and assembles the briefing from those notes
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "single")
+SUMMARY_MAP_WORKERS = 4
+SUMMARY_MAP_BUDGET_SHARE = 0.6
+ARTICLE_SUMMARY_CACHE_DIR = os.getenv("ARTICLE_SUMMARY_CACHE_DIR", "article_summaries")
+
+# Weekly digest built from the stored daily briefings (0 = Monday ... 4 = Friday)
+WEEKLY_DIGEST_ENABLED = os.getenv("WEEKLY_DIGEST_ENABLED", "False").lower() in ('true', '1', 't')
+WEEKLY_DIGEST_WEEKDAY = int(os.getenv("WEEKLY_DIGEST_WEEKDAY", "4"))
+DIGEST_STORY_CHARS = 240
+DIGEST_EXCERPT_CHARS = 300
+
+# Telegram Bot API base URL; override to point at a local stand-in
+TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL", "https://api.telegram.org/bot")
+
+# Durable per-recipient delivery outbox (SQLite); failed parts are retried
+# with exponential backoff until OUTBOX_MAX_ATTEMPTS
+OUTBOX_FILE = os.getenv("OUTBOX_FILE", "outbox.db")
+OUTBOX_RETRY_INTERVAL_SECONDS = 60
+OUTBOX_RETRY_BASE_SECONDS = 30
+OUTBOX_RETRY_MAX_SECONDS = 60 * 60
+OUTBOX_MAX_ATTEMPTS = 10
+OUTBOX_RETENTION_DAYS = 14
+
+# Broadcasts are sent by this many concurrent workers, paced together below
+# Telegram's limit of about 30 messages per second per bot
+TELEGRAM_SEND_WORKERS = int(os.getenv("TELEGRAM_SEND_WORKERS", "8"))
+TELEGRAM_MESSAGES_PER_SECOND = float(os.getenv("TELEGRAM_MESSAGES_PER_SECOND", "25"))
+
+# Observability: structured JSON span logs (opt-in, written to stderr so the
+# human-readable output stays readable) and a Prometheus text metrics file
+METRICS_JSON_LOGS = os.getenv("METRICS_JSON_LOGS", "False").lower() in ('true', '1', 't')
+METRICS_FILE = os.getenv("METRICS_FILE", "metrics.prom")
+
+# Profiling (--profile, or PROFILE_REQUESTS for web and Lambda requests)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_REQUESTS = os.getenv("PROFILE_REQUESTS", "False").lower() in ('true', '1', 't')
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "1"))
+
 # State tracking for daily TLDR dispatches
 RUN_STATE_FILE = os.getenv("RUN_STATE_FILE", "run_state.json")
+
+# Negative cache for dates without an issue (holidays, skipped days). Recent
+# dates may still be published later, so they expire sooner.
+MISSING_DATE_RECENT_TTL_HOURS = 3
+MISSING_DATE_PAST_TTL_HOURS = 24 * 14
+
+# Pause between dates during a backfill, in seconds
+BACKFILL_DELAY_SECONDS = float(os.getenv("BACKFILL_DELAY_SECONDS", "10"))
+
+# Daemon mode: poll for each issue in a window around its usual publish time
+# (UTC, "HH:MM"), backing off between polls while it has not appeared yet
+DAEMON_PUBLISH_TIME_UTC = os.getenv("DAEMON_PUBLISH_TIME_UTC", "10:30")
+DAEMON_WINDOW_BEFORE_MINUTES = 30
+DAEMON_WINDOW_AFTER_MINUTES = 6 * 60
+DAEMON_POLL_MIN_SECONDS = 60
+DAEMON_POLL_MAX_SECONDS = 15 * 60
+DAEMON_POLL_BACKOFF = 1.5
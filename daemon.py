@@ -0,0 +1,192 @@
+"""
+Long-running scheduler for the daily pipeline.
+
+Started with ``python main.py --daemon``. The AI client, HTTP connection pool,
+parse workers and a Telegram bot session stay warm between issues. Each
+weekday the daemon polls for the day's issue in a window around its usual
+publish time with cheap HEAD probes, backing off while it is not out yet,
+and runs the pipeline as soon as it appears. In the background it retries
+failed deliveries and long-polls the bot for ``/start`` and ``/stop``.
+
+State lives in the same run state files as one-shot runs, so a restart
+first catches up on any date that was missed and never resends one that was
+delivered. SIGTERM/SIGINT stop polling; a pipeline run in progress finishes
+before the process exits.
+"""
+
+import asyncio
+import random
+import signal
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+
+import config
+import main as pipeline
+from ai.client import AIClient
+from ai.usage import usage_run
+from articles.cache import ArticleCache
+from newsletter.fetcher import probe_issue
+from telegram_notifications.client import start_shared_bot, stop_shared_bot
+from telegram_notifications.outbox import DeliveryOutbox, retry_loop
+from telegram_notifications.updates import poll_loop
+from utils.http import domain_health
+from utils.metrics import incr, registry, span
+from utils.run_state import RunStateStore
+
+
+def publish_window(day: date):
+    """Return the (start, end) UTC datetimes in which ``day``'s issue is polled for."""
+    hours, minutes = (int(part) for part in config.DAEMON_PUBLISH_TIME_UTC.split(":"))
+    publish = datetime.combine(day, time(hours, minutes), tzinfo=timezone.utc)
+    return (
+        publish - timedelta(minutes=config.DAEMON_WINDOW_BEFORE_MINUTES),
+        publish + timedelta(minutes=config.DAEMON_WINDOW_AFTER_MINUTES),
+    )
+
+
+def next_poll_interval(interval: float, in_window: bool) -> float:
+    """Back off geometrically inside the window; poll at the slowest rate after it."""
+    if not in_window:
+        return config.DAEMON_POLL_MAX_SECONDS
+    return min(config.DAEMON_POLL_MAX_SECONDS, interval * config.DAEMON_POLL_BACKOFF)
+
+
+def seconds_until(moment: datetime) -> float:
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+
+def next_midnight() -> datetime:
+    """Return the next local midnight, when the daemon moves on to a new date."""
+    tomorrow = datetime.combine(date.today() + timedelta(days=1), time(0, 1))
+    return tomorrow.astimezone(timezone.utc)
+
+
+class Daemon:
+    """Poll for new issues and run the pipeline for them until stopped."""
+
+    def __init__(self, editions):
+        self.editions = editions
+        self.stop_event = asyncio.Event()
+        self.ai_client = None
+        self.caught_up_for = None
+
+    def stop(self):
+        """Ask the loop to exit after the current step."""
+        if not self.stop_event.is_set():
+            print("Shutdown requested; finishing the current step...")
+            self.stop_event.set()
+
+    async def run(self) -> int:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # Signal handlers are unavailable on some platforms/threads
+                pass
+
+        self.ai_client = AIClient()
+        background = []
+        if config.TELEGRAM_ENABLED and config.TELEGRAM_BOT_TOKEN:
+            await start_shared_bot(config.TELEGRAM_BOT_TOKEN)
+            # Redeliver failed parts and pick up /start and /stop while waiting for issues
+            background.append(asyncio.create_task(retry_loop(
+                DeliveryOutbox(Path(config.OUTBOX_FILE)), config.TELEGRAM_BOT_TOKEN, self.stop_event
+            )))
+            background.append(asyncio.create_task(poll_loop(config.TELEGRAM_BOT_TOKEN, self.stop_event)))
+        print("Daemon started: " + ", ".join(edition.name for edition in self.editions))
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    await self.run_day(date.today())
+                except Exception as exc:
+                    incr("daemon_errors_total", error=type(exc).__name__)
+                    print(f"ERROR in daemon cycle: {exc}; retrying in {config.DAEMON_POLL_MAX_SECONDS}s.")
+                    await self.sleep(config.DAEMON_POLL_MAX_SECONDS)
+        finally:
+            self.stop_event.set()
+            await asyncio.gather(*background, return_exceptions=True)
+            await stop_shared_bot()
+        print("Daemon stopped.")
+        return 0
+
+    async def run_day(self, today: date) -> None:
+        """Catch up on earlier dates, then poll for today's issue until it is sent or the day ends."""
+        article_cache = ArticleCache()
+        if self.caught_up_for != today:
+            # Recover whatever was missed while the daemon was down
+            with usage_run("daemon"):
+                await pipeline.run_pending_dates(
+                    self.editions, today - timedelta(days=1), self.ai_client, article_cache
+                )
+            self.caught_up_for = today
+            self.checkpoint()
+
+        if today.weekday() in pipeline.WEEKEND_DAYS:
+            await self.sleep(seconds_until(next_midnight()))
+            return
+
+        window_start, window_end = publish_window(today)
+        interval = config.DAEMON_POLL_MIN_SECONDS
+        while not self.stop_event.is_set() and date.today() == today:
+            pending = [
+                edition for edition in self.editions
+                if not RunStateStore(edition.run_state_path()).has_run_for(today)
+            ]
+            if not pending:
+                if config.WEEKLY_DIGEST_ENABLED and today.weekday() == config.WEEKLY_DIGEST_WEEKDAY:
+                    with usage_run("daemon"):
+                        await pipeline.run_weekly_digests(self.editions, today, self.ai_client)
+                print(f"All editions sent for {today.isoformat()}; waiting for the next day.")
+                await self.sleep(seconds_until(next_midnight()))
+                return
+
+            now = datetime.now(timezone.utc)
+            if now < window_start:
+                print(f"Next poll at {window_start.isoformat(timespec='minutes')} (publish window).")
+                await self.sleep(seconds_until(window_start))
+                continue
+
+            published = await self.poll(today, pending)
+            if published:
+                with usage_run("daemon"):
+                    await pipeline.run_pending_dates(published, today, self.ai_client, article_cache)
+                self.checkpoint()
+                if all(RunStateStore(edition.run_state_path()).has_run_for(today) for edition in published):
+                    continue
+                # A failed delivery is retried after the next backoff step
+            interval = next_poll_interval(interval, now <= window_end)
+            # Jitter keeps several daemons from polling in lockstep
+            await self.sleep(min(interval * random.uniform(0.9, 1.1), seconds_until(next_midnight())))
+
+    def checkpoint(self) -> None:
+        """Persist domain health and metrics so a crash loses little."""
+        domain_health.save()
+        registry.write_prometheus(Path(config.METRICS_FILE))
+
+    async def poll(self, today: date, editions):
+        """Return the editions whose issue for ``today`` is now published."""
+        published = []
+        for edition in editions:
+            with span("poll", edition=edition.slug, date=today.isoformat()) as poll_span:
+                available = await asyncio.to_thread(probe_issue, today, edition)
+                poll_span["published"] = available
+            incr("daemon_polls_total", edition=edition.slug, published=available)
+            if available:
+                print(f"{edition.name} issue for {today.isoformat()} is out.")
+                # A run before publication may have cached today as missing
+                RunStateStore(edition.run_state_path()).clear_missing(today)
+                published.append(edition)
+        return published
+
+    async def sleep(self, seconds: float) -> None:
+        """Sleep up to ``seconds``, waking early on shutdown."""
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=max(seconds, 1))
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_daemon(editions) -> int:
+    """Run the daemon for ``editions`` until SIGTERM/SIGINT."""
+    return await Daemon(editions).run()
@@ -3,17 +3,28 @@ AWS Lambda handler for AI News Briefing
 Processes API Gateway events and returns AI-generated news briefings.
 """
 
+import base64
+from datetime import date
+
 from dotenv import load_dotenv
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 import main
 from ai.client import AIClient
+from ai.usage import usage_run
+from archive.static import INDEX_PAGE
+from newsletter.editions import EDITIONS, get_edition
+from newsletter.fetcher import NewsletterNotFoundError
 from utils.content import sanitize_ai_content
+from utils.metrics import registry, span
+from utils.deadline import Deadline
+from utils.profiling import profiling
+import config
 
 # Load environment variables
 load_dotenv()
 
-# Set up Jinja2 template environment
-template_env = Environment(loader=FileSystemLoader('web/templates'))
+# Set up Jinja2 template environment, escaping like Flask does
+template_env = Environment(loader=FileSystemLoader('web/templates'), autoescape=select_autoescape(['html']))
 
 def lambda_handler(event, context):
     """
@@ -31,7 +42,21 @@ def lambda_handler(event, context):
         if path == '/' and http_method == 'GET':
             return handle_index()
         elif path == '/generate' and http_method == 'GET':
-            return handle_generate()
+            redirect = handle_latest_archived()
+            if redirect is not None:
+                return redirect
+            with profiling("lambda", config.PROFILE_REQUESTS), \
+                    span("handler", route="/generate", runtime="lambda"), usage_run("lambda"):
+                return handle_generate(context)
+        elif path == '/archive' and http_method == 'GET':
+            # Relative links on the index need the trailing slash
+            return redirect_response('archive/')
+        elif path.startswith('/archive/') and http_method == 'GET':
+            return handle_archive(event, context)
+        elif path == '/search' and http_method == 'GET':
+            return handle_search(event)
+        elif path == '/metrics' and http_method == 'GET':
+            return handle_metrics()
         else:
             return {
                 'statusCode': 404,
@@ -81,20 +106,34 @@ def handle_index():
             'isBase64Encoded': False
         }
 
-def handle_generate():
+def request_deadline(context=None):
+    """
+    Build the time budget for a generation request.
+    
+    Uses the remaining Lambda execution time minus a safety margin so the
+    handler can still render a response; falls back to the web budget when
+    no Lambda context is available.
+    """
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        remaining = context.get_remaining_time_in_millis() / 1000
+        return Deadline.after(max(remaining - config.LAMBDA_SAFETY_MARGIN_SECONDS, 1))
+    return Deadline.after(config.WEB_TIME_BUDGET_SECONDS)
+
+def handle_generate(context=None):
     """Handle the newsletter generation route."""
     try:
         print("Starting newsletter generation...")
         
         # Use existing main.py functionality with web-friendly AI client
         ai_client = AIClient(web_mode=True)
+        deadline = request_deadline(context)
         
         # Get newsletter data and create summary
         print("Collecting newsletter data...")
-        newsletter_data = main.collect_newsletter_data(ai_client)
+        newsletter_data = main.collect_latest_newsletter_data(ai_client, deadline=deadline)
         
         print("Creating summary...")
-        raw_summary = main.create_summary(newsletter_data, ai_client)
+        raw_summary = main.create_summary(newsletter_data, ai_client, deadline=deadline)
         
         # Clean and sanitize the AI-generated content
         print("Sanitizing AI content...")
@@ -107,6 +146,8 @@ def handle_generate():
         print(f"Newsletter URL: {newsletter_data.get('url', 'None')}")
         print(f"Article links count: {len(newsletter_data.get('article_links', []))}")
         
+        main.archive_briefing(newsletter_data, raw_summary)
+        
         # Render using proper template
         html_content = render_template(
             'result.html',
@@ -140,6 +181,150 @@ def handle_generate():
             'isBase64Encoded': False
         }
 
+def handle_latest_archived():
+    """Redirect /generate to the archived latest briefing, or return None to generate it live."""
+    archive = main.briefing_archive()
+    if archive is None:
+        return None
+    try:
+        page = main.latest_archived_page(archive)
+    except Exception as e:
+        print(f"WARNING: Could not look up the latest archived briefing: {str(e)}")
+        return None
+    if page is None:
+        return None
+    # The dated URL is the one browsers can cache
+    return redirect_response('archive/' + page[:-len('.html')])
+
+def handle_archive(event, context=None):
+    """Serve the archive index or an archived briefing; a missing recent date of a configured edition is generated live."""
+    parts = event.get('path', '').strip('/').split('/')
+    archive = main.briefing_archive()
+
+    if parts == ['archive']:
+        if archive is not None:
+            cached = archived_response(archive, INDEX_PAGE, event)
+            if cached is not None:
+                return cached
+        return html_response(200, render_template('archive_index.html', editions=[]))
+
+    if len(parts) != 3 or parts[1] not in EDITIONS:
+        return not_found_response(event)
+    edition, date_str = parts[1], parts[2]
+    try:
+        target_date = date.fromisoformat(date_str)
+    except ValueError:
+        return not_found_response(event)
+    if target_date > date.today():
+        return not_found_response(event)
+
+    if archive is not None:
+        cached = archived_response(archive, archive.page_name(edition, date_str), event)
+        if cached is not None:
+            return cached
+    if not main.can_generate_live(edition, target_date):
+        return not_found_response(event)
+
+    try:
+        print(f"Briefing for {date_str} is not archived; generating it live...")
+        with profiling("lambda", config.PROFILE_REQUESTS), \
+                span("handler", route="/archive", runtime="lambda"), usage_run("lambda"):
+            ai_client = AIClient(web_mode=True)
+            deadline = request_deadline(context)
+            newsletter_data = main.collect_newsletter_data(
+                ai_client, target_date, get_edition(edition), deadline=deadline
+            )
+            raw_summary = main.create_summary(newsletter_data, ai_client, deadline=deadline)
+        main.archive_briefing(newsletter_data, raw_summary)
+    except NewsletterNotFoundError as e:
+        return html_response(404, render_template('error.html', error=str(e)))
+    except Exception as e:
+        print(f"Error in handle_archive: {str(e)}")
+        return html_response(500, render_template('error.html', error=f"Error generating briefing: {str(e)}"))
+
+    return html_response(200, render_template(
+        'result.html',
+        summary=sanitize_ai_content(raw_summary),
+        date=newsletter_data.get('date', ''),
+        newsletter_url=newsletter_data.get('url', ''),
+        article_links=newsletter_data.get('article_links', []),
+        back_url='../'
+    ))
+
+def archived_response(archive, name, event):
+    """Answer from the archive with a 200 or 304, or return None if the page is missing."""
+    headers = {key.lower(): value for key, value in (event.get('headers') or {}).items()}
+    static = archive.respond(
+        name,
+        accept_encoding=headers.get('accept-encoding', ''),
+        if_none_match=headers.get('if-none-match', ''),
+    )
+    if static is None:
+        return None
+    # Compressed bodies are binary; API Gateway decodes them when isBase64Encoded is set
+    return {
+        'statusCode': static.status,
+        'headers': static.headers,
+        'body': base64.b64encode(static.body).decode('ascii') if static.encoding else static.body.decode('utf-8'),
+        'isBase64Encoded': bool(static.encoding)
+    }
+
+def html_response(status, html_content):
+    """Build an uncached HTML response."""
+    return {
+        'statusCode': status,
+        'headers': {
+            'Content-Type': 'text/html',
+            'Cache-Control': 'no-cache'
+        },
+        'body': html_content,
+        'isBase64Encoded': False
+    }
+
+def redirect_response(location):
+    """Build a temporary redirect to a path relative to the current one."""
+    return {
+        'statusCode': 302,
+        'headers': {
+            'Location': location,
+            'Cache-Control': 'no-cache'
+        },
+        'body': '',
+        'isBase64Encoded': False
+    }
+
+def not_found_response(event):
+    """Build the 404 page for an unknown path."""
+    return html_response(404, render_template(
+        'error.html', error=f"Not found: {event.get('httpMethod', 'GET')} {event.get('path', '/')}"
+    ))
+
+def handle_search(event):
+    """Search past newsletters, articles and briefings."""
+    params = event.get('queryStringParameters') or {}
+    query = (params.get('q') or '').strip()
+    since_str = (params.get('since') or '').strip()
+    try:
+        since = date.fromisoformat(since_str) if since_str else None
+    except ValueError:
+        return html_response(400, render_template('error.html', error=f"Invalid date: {since_str}"))
+
+    index = main.search_index()
+    hits = index.search(query, since=since, limit=config.SEARCH_RESULT_LIMIT) if index and query else []
+    return html_response(200, render_template('search.html', query=query, since=since_str, hits=hits))
+
+def handle_metrics():
+    """Expose pipeline metrics of this Lambda container in the Prometheus text format."""
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'text/plain; version=0.0.4',
+            'Cache-Control': 'no-cache'
+        },
+        'body': registry.render_prometheus(),
+        'isBase64Encoded': False
+    }
+
 def render_template(template_name, **kwargs):
     """
     Render a Jinja2 template with the given context.
@@ -0,0 +1 @@
+"""Local Gemini and Telegram stand-ins and a load driver for the full pipeline."""
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Load-test the pipeline against local Gemini and Telegram stand-ins.
+
+Scenarios:
+    backfill   - repeated ``main.main([])`` runs over a 7-day backfill
+    generate   - concurrent ``GET /generate`` requests to the Flask app
+    broadcast  - ``send_telegram_summary`` to many recipients
+
+Newsletter and article pages come from the offline benchmark corpus, so no
+real site, quota or user is touched.
+
+Usage:
+    python -m loadtest.driver --scenarios backfill generate broadcast \\
+        --gemini-latency lognormal:-1.2,0.5 --telegram-latency uniform:0.02,0.1 \\
+        --telegram-429-rate 0.01 --recipients 500 --record-dir loadtest_out
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List
+import random
+
+from loadtest.servers import GeminiStandIn, LatencyModel, StandInConfig, TelegramStandIn
+
+
+@dataclass
+class ScenarioResult:
+    """Client-side measurements of one scenario."""
+
+    name: str
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    wall_seconds: float = 0.0
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+
+def configure_environment(gemini: GeminiStandIn, telegram: TelegramStandIn) -> None:
+    """Point the pipeline at the stand-ins; must run before ``config`` is imported."""
+    os.environ.update({
+        "GEMINI_API_KEY": "stand-in-key",
+        "GEMINI_API_ENDPOINT": gemini.base_url,
+        "TELEGRAM_ENABLED": "true",
+        "TELEGRAM_BOT_TOKEN": "123456:stand-in",
+        "TELEGRAM_API_BASE_URL": f"{telegram.base_url}/bot",
+        "BACKFILL_DELAY_SECONDS": "0",
+        "METRICS_JSON_LOGS": "false",
+        # Every /generate request should exercise the live pipeline
+        "ARCHIVE_DIR": "",
+    })
+
+
+def build_pages(days: int = 8):
+    """Generate an issue for each of the last ``days`` days plus article pages."""
+    from benchmarks.corpus import generate_newsletter, load_articles
+
+    rng = random.Random(5)
+    today = date.today()
+    newsletters = [
+        generate_newsletter(rng, (today - timedelta(days=offset)).isoformat())
+        for offset in range(days)
+    ]
+    return newsletters, load_articles()
+
+
+def run_backfill(runs: int, recipients: List[str]) -> ScenarioResult:
+    import config
+    import main as pipeline
+
+    result = ScenarioResult("backfill")
+    config.TELEGRAM_USER_IDS = recipients
+    started = time.perf_counter()
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            config.RUN_STATE_FILE = str(Path(tmp) / "run_state.json")
+            config.METRICS_FILE = str(Path(tmp) / "metrics.prom")
+            config.OUTBOX_FILE = str(Path(tmp) / "outbox.db")
+            # Cached summaries would skip the Gemini stand-in on the next run
+            config.SUMMARY_CACHE_DIR = str(Path(tmp) / "summaries")
+            config.ARTICLE_SUMMARY_CACHE_DIR = str(Path(tmp) / "article_summaries")
+            # The store is created at import time, so its path is moved as well
+            config.DOMAIN_HEALTH_FILE = str(Path(tmp) / "domain_health.json")
+            pipeline.domain_health.path = Path(config.DOMAIN_HEALTH_FILE)
+            config.SUBSCRIBER_DB_FILE = str(Path(tmp) / "subscribers.db")
+            config.LLM_USAGE_DB_FILE = str(Path(tmp) / "llm_usage.db")
+            config.SEARCH_INDEX_FILE = str(Path(tmp) / "search_index.db")
+            start = time.perf_counter()
+            exit_code = asyncio.run(pipeline.main([]))
+            result.latencies.append(time.perf_counter() - start)
+            if exit_code != 0:
+                result.errors += 1
+    result.wall_seconds = time.perf_counter() - started
+    return result
+
+
+def run_generate(requests_total: int, concurrency: int) -> ScenarioResult:
+    from web import app
+
+    result = ScenarioResult("generate")
+    lock = threading.Lock()
+
+    def one_request(_):
+        client = app.test_client()
+        start = time.perf_counter()
+        response = client.get("/generate")
+        elapsed = time.perf_counter() - start
+        failed = response.status_code != 200 or b"Something went wrong" in response.data
+        with lock:
+            result.latencies.append(elapsed)
+            result.errors += int(failed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_request, range(requests_total)))
+    result.wall_seconds = time.perf_counter() - started
+    return result
+
+
+def run_broadcast(recipients: List[str]) -> ScenarioResult:
+    import config
+    import main as pipeline
+    from benchmarks.corpus import generate_summary
+    from telegram_notifications import outbox
+
+    result = ScenarioResult("broadcast")
+    config.TELEGRAM_USER_IDS = recipients
+    original_send = outbox.send_chunk
+
+    async def timed_send(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            await original_send(*args, **kwargs)
+        except Exception:
+            result.errors += 1
+            raise
+        finally:
+            result.latencies.append(time.perf_counter() - start)
+
+    summary = generate_summary(random.Random(9), items=8)
+    outbox.send_chunk = timed_send
+    started = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # A fresh outbox, so earlier runs' deliveries are not deduplicated
+            config.OUTBOX_FILE = str(Path(tmp) / "outbox.db")
+            # Cached summaries would skip the Gemini stand-in on the next run
+            config.SUMMARY_CACHE_DIR = str(Path(tmp) / "summaries")
+            # The store is created at import time, so its path is moved as well
+            config.DOMAIN_HEALTH_FILE = str(Path(tmp) / "domain_health.json")
+            pipeline.domain_health.path = Path(config.DOMAIN_HEALTH_FILE)
+            asyncio.run(pipeline.send_telegram_summary(summary, date.today().isoformat()))
+    except Exception as exc:
+        print(f"Broadcast aborted: {type(exc).__name__}: {exc}")
+    finally:
+        outbox.send_chunk = original_send
+    result.wall_seconds = time.perf_counter() - started
+    return result
+
+
+def print_report(results: List[ScenarioResult], servers: Dict[str, object]) -> None:
+    header = f"{'scenario':<11}{'ops':>7}{'errors':>8}{'wall s':>9}{'ops/s':>9}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'max s':>9}"
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        ops = len(r.latencies)
+        throughput = ops / r.wall_seconds if r.wall_seconds else 0.0
+        print(
+            f"{r.name:<11}{ops:>7}{r.errors:>8}{r.wall_seconds:>9.2f}{throughput:>9.2f}"
+            f"{r.percentile(50):>9.3f}{r.percentile(95):>9.3f}{r.percentile(99):>9.3f}"
+            f"{max(r.latencies, default=0.0):>9.3f}"
+        )
+
+    print()
+    for name, server in servers.items():
+        print(f"{name} stand-in: {server.stats['requests']} requests, {server.stats['throttled']} throttled (429)")
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Load-test the pipeline against local stand-ins")
+    arg_parser.add_argument("--scenarios", nargs="+", default=["backfill", "generate", "broadcast"],
+                            choices=["backfill", "generate", "broadcast"])
+    arg_parser.add_argument("--gemini-latency", default="lognormal:-1.5,0.5", help="latency distribution spec")
+    arg_parser.add_argument("--telegram-latency", default="uniform:0.01,0.05", help="latency distribution spec")
+    arg_parser.add_argument("--gemini-429-rate", type=float, default=0.0, help="probability of RESOURCE_EXHAUSTED")
+    arg_parser.add_argument("--telegram-429-rate", type=float, default=0.0, help="probability of RetryAfter")
+    arg_parser.add_argument("--retry-after", type=int, default=1, help="retry_after seconds in Telegram 429s")
+    arg_parser.add_argument("--backfill-runs", type=int, default=3)
+    arg_parser.add_argument("--requests", type=int, default=50, help="total /generate requests")
+    arg_parser.add_argument("--concurrency", type=int, default=10, help="parallel /generate clients")
+    arg_parser.add_argument("--recipients", type=int, default=200, help="Telegram recipients")
+    arg_parser.add_argument("--record-dir", type=Path, help="write recorded payloads as JSONL here")
+    args = arg_parser.parse_args(argv)
+
+    def record_file(name):
+        return args.record_dir / f"{name}.jsonl" if args.record_dir else None
+
+    gemini = GeminiStandIn(StandInConfig(
+        latency=LatencyModel.parse(args.gemini_latency),
+        error_rate=args.gemini_429_rate,
+        record_file=record_file("gemini"),
+    )).start()
+    telegram = TelegramStandIn(StandInConfig(
+        latency=LatencyModel.parse(args.telegram_latency),
+        error_rate=args.telegram_429_rate,
+        retry_after=args.retry_after,
+        record_file=record_file("telegram"),
+    )).start()
+    configure_environment(gemini, telegram)
+
+    from benchmarks.fakes import fake_network
+
+    recipients = [str(100000 + i) for i in range(args.recipients)]
+    newsletters, articles = build_pages()
+    results = []
+    try:
+        with fake_network(newsletters, articles):
+            for scenario in args.scenarios:
+                print(f"Running scenario: {scenario}")
+                if scenario == "backfill":
+                    results.append(run_backfill(args.backfill_runs, recipients))
+                elif scenario == "generate":
+                    results.append(run_generate(args.requests, args.concurrency))
+                else:
+                    results.append(run_broadcast(recipients))
+    finally:
+        gemini.stop()
+        telegram.stop()
+
+    print_report(results, {"Gemini": gemini, "Telegram": telegram})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""Stand-in HTTP servers for the Gemini generate API and the Telegram Bot API.
+
+Only the subset of each API the pipeline uses is implemented:
+
+- Gemini: ``POST /v1beta/models/<model>:generateContent``
+- Telegram: ``getMe``, ``getUpdates`` and ``sendMessage`` under ``/bot<token>/``
+
+Both servers add latency drawn from a configurable distribution, can inject
+429 responses (``RESOURCE_EXHAUSTED`` for Gemini, ``retry_after`` for
+Telegram) and record every payload they receive.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.corpus import generate_summary
+
+
+@dataclass
+class LatencyModel:
+    """
+    Latency distribution in seconds.
+    
+    Specs: ``fixed:0.2``, ``uniform:0.1,0.5``, ``exp:0.3`` (mean) or
+    ``lognormal:-1.5,0.6`` (mu, sigma of the underlying normal).
+    """
+
+    kind: str = "fixed"
+    params: tuple = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, raw = spec.partition(":")
+        params = tuple(float(value) for value in raw.split(",")) if raw else (0.0,)
+        if kind not in ("fixed", "uniform", "exp", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "exp":
+            return rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+        if self.kind == "lognormal":
+            return rng.lognormvariate(*self.params)
+        return self.params[0]
+
+
+@dataclass
+class StandInConfig:
+    """Behaviour shared by both stand-ins."""
+
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    error_rate: float = 0.0
+    retry_after: int = 1
+    record_file: Optional[Path] = None
+    seed: int = 42
+
+
+class StandInServer(ABC):
+    """Threaded HTTP server running in the background with request recording."""
+
+    def __init__(self, settings: StandInConfig, host: str = "127.0.0.1", port: int = 0):
+        self.settings = settings
+        self.records: List[Dict] = []
+        self.stats: Dict[str, int] = {"requests": 0, "throttled": 0}
+        self._lock = threading.Lock()
+        self._rng = random.Random(settings.seed)
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self.settings.record_file:
+            self.settings.record_file.parent.mkdir(parents=True, exist_ok=True)
+            with self.settings.record_file.open("w", encoding="utf-8") as fh:
+                for record in self.records:
+                    fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    @abstractmethod
+    def handle(self, method: str, path: str, payload: Dict):
+        """Return ``(status, body)`` for a request."""
+
+    @abstractmethod
+    def throttled_response(self):
+        """Return the ``(status, body)`` of an injected 429."""
+
+    # Internal helpers -------------------------------------------------
+    def _dispatch(self, method: str, path: str, payload: Dict):
+        with self._lock:
+            delay = self.settings.latency.sample(self._rng)
+            throttle = self._rng.random() < self.settings.error_rate
+            self.stats["requests"] += 1
+            if throttle:
+                self.stats["throttled"] += 1
+            self.records.append({
+                "ts": round(time.time(), 3),
+                "method": method,
+                "path": path,
+                "payload": payload,
+                "throttled": throttle,
+            })
+
+        time.sleep(max(0.0, delay))
+        if throttle:
+            return self.throttled_response()
+        return self.handle(method, path, payload)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                payload = _decode_payload(raw, self.headers.get("Content-Type", ""))
+                status, body = server._dispatch(self.command, self.path, payload)
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _serve
+            do_POST = _serve
+
+            def log_message(self, format, *args):
+                # Keep load-test output readable
+                return
+
+        return Handler
+
+
+def _decode_payload(raw: bytes, content_type: str) -> Dict:
+    if not raw:
+        return {}
+    if "json" in content_type:
+        return json.loads(raw)
+    if "x-www-form-urlencoded" in content_type:
+        from urllib.parse import parse_qsl
+
+        return dict(parse_qsl(raw.decode("utf-8")))
+    return {"raw": raw.decode("utf-8", errors="replace")}
+
+
+class GeminiStandIn(StandInServer):
+    """Speaks the ``generateContent`` REST call used by ``AIClient``."""
+
+    def handle(self, method, path, payload):
+        if method != "POST" or ":generateContent" not in path:
+            return 404, {"error": {"code": 404, "message": f"Unknown path {path}", "status": "NOT_FOUND"}}
+
+        prompt = json.dumps(payload.get("contents", []), ensure_ascii=False)
+        with self._lock:
+            if "Selected:" in prompt:
+                text = "Selected: 1, 3, 5, 7, 9, 11"
+            else:
+                text = generate_summary(self._rng)
+
+        return 200, {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {
+                "promptTokenCount": len(prompt) // 4,
+                "candidatesTokenCount": len(text) // 4,
+                "totalTokenCount": (len(prompt) + len(text)) // 4,
+            },
+        }
+
+    def throttled_response(self):
+        return 429, {"error": {
+            "code": 429,
+            "message": "Resource has been exhausted (e.g. check quota).",
+            "status": "RESOURCE_EXHAUSTED",
+        }}
+
+
+class TelegramStandIn(StandInServer):
+    """Speaks ``getMe``, ``getUpdates`` and ``sendMessage`` as used by the pipeline."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._message_id = 0
+
+    def handle(self, method, path, payload):
+        api_method = path.rstrip("/").rsplit("/", 1)[-1]
+        if api_method == "getMe":
+            return 200, {"ok": True, "result": {
+                "id": 1, "is_bot": True, "first_name": "Stand-in", "username": "standin_bot",
+            }}
+        if api_method == "getUpdates":
+            # No subscriber ever writes to the stand-in bot
+            return 200, {"ok": True, "result": []}
+        if api_method == "sendMessage":
+            with self._lock:
+                self._message_id += 1
+                message_id = self._message_id
+            return 200, {"ok": True, "result": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": int(payload.get("chat_id", 0)), "type": "private"},
+                "text": payload.get("text", ""),
+            }}
+        return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+
+    def throttled_response(self):
+        retry_after = self.settings.retry_after
+        return 429, {
+            "ok": False,
+            "error_code": 429,
+            "description": f"Too Many Requests: retry after {retry_after}",
+            "parameters": {"retry_after": retry_after},
+        }
@@ -6,54 +6,233 @@ June 2025 - Refactored Version
 
 import sys
 import textwrap
+import argparse
 import asyncio
+import contextvars
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import date, timedelta
 from pathlib import Path
 
 # Import modules from the refactored structure
-from ai.client import AIClient
-from newsletter.fetcher import get_newsletter_url_for, fetch_newsletter
-from newsletter.parser import NewsletterParser
+from ai.client import AIClient, AITimeoutError
+from ai.usage import (
+    BUDGET_EXHAUSTED,
+    BUDGET_TIGHT,
+    BudgetExceededError,
+    budget_state,
+    fit_chars,
+    format_report,
+    ledger,
+    usage_label,
+    usage_run,
+)
+from newsletter.editions import Edition, configured_editions, get_edition
+from newsletter.fetcher import (
+    NewsletterNotFoundError,
+    NewsletterUnavailableError,
+    discover_issue_dates,
+    fetch_newsletter_for,
+    probe_issue,
+)
 from articles.selector import ArticleSelector
 from articles.extractor import extract_article_content
-from ai.prompts import create_summary_prompt, create_qa_prompt
-from telegram_notifications.client import send_message
+from articles.cache import ArticleCache
+from articles.prefetch import ArticlePrefetcher
+from ai.prompts import (
+    create_article_summary_prompt,
+    create_qa_prompt,
+    create_reduce_summary_prompt,
+    create_summary_prompt,
+    create_weekly_digest_prompt,
+)
+from newsletter.digest import (
+    ARTICLES_ARTEFACT,
+    article_excerpts,
+    format_material,
+    week_dates,
+    week_key,
+    week_material,
+)
+from archive.static import StaticArchive, latest_page
+from search.index import SearchIndex
+from telegram_notifications.client import prepare_chunks
+from telegram_notifications.outbox import DeliveryOutbox, deliver, retry_due
+from telegram_notifications.updates import sync_subscribers
 from utils.run_state import RunStateStore
+from utils.summary_cache import ArticleSummaryCache, SummaryCache
+from subscribers.profiles import DEFAULT_PROFILE, SubscriberProfile, group_by_profile, load_profiles
+from subscribers.store import SubscriberStore, recipient_ids
+from utils.content import sanitize_ai_content
+from utils.text import estimate_tokens
+from utils.metrics import registry, span
+from utils.http import domain_health
+from utils.deadline import Deadline, DeadlineExceededError, timeout_from
+from utils.parse_pool import parse_pool
+from utils.profiling import profile_section, profiling
 import config
 
 WEEKEND_DAYS = {5, 6}  # 5 = Saturday, 6 = Sunday
 
-def collect_newsletter_data(ai_client, target_date: date):
+def fetch_article(url, timeout, article_cache: ArticleCache = None):
+    """
+    Fetch and extract one article, through the run-wide cache if given.
+    
+    Args:
+        url: Article URL
+        timeout: Request timeout in seconds
+        article_cache: Run-wide cache that deduplicates article fetches across editions
+        
+    Returns:
+        Extracted content, or None if extraction failed
+    """
+    def extract(link):
+        return extract_article_content(
+            link, 
+            timeout=timeout,
+            max_chars=config.ARTICLE_EXTRACT_MAX_CHARS,
+            html_extractor=parse_pool.extract_article
+        )
+
+    if article_cache is not None:
+        return article_cache.get_or_extract(url, extract)
+    return extract(url)
+
+def extract_articles(
+    links,
+    deadline: Deadline = None,
+    article_cache: ArticleCache = None,
+    prefetcher: ArticlePrefetcher = None,
+):
+    """
+    Extract articles concurrently within a share of the time budget.
+    
+    Articles still queued when the extraction budget expires are cancelled;
+    running ones are abandoned (their request timeout is capped by the same
+    budget) and reported as dropped.
+    
+    Args:
+        links: Article URLs in selection order
+        deadline: Overall deadline of the date being processed
+        article_cache: Run-wide cache that deduplicates article fetches across editions
+        prefetcher: Speculative fetches started during selection, taken over
+            instead of fetching those articles again
+        
+    Returns:
+        Tuple of (articles, dropped) where dropped lists url and reason
+    """
+    if not links:
+        return [], []
+
+    extraction_deadline = deadline.slice(config.EXTRACTION_BUDGET_SHARE) if deadline else None
+
+    def fetch(index, link):
+        print(f"Reading article {index+1}/{len(links)}: {link}")
+        prefetched = prefetcher.take(link) if prefetcher is not None else None
+        with span("extract", url=link, prefetched=prefetched is not None) as extract_span:
+            if prefetched is not None:
+                content = prefetched.result()
+            else:
+                content = fetch_article(link, timeout_from(extraction_deadline, 15), article_cache)
+            extract_span["chars"] = len(content or "")
+        return content
+
+    executor = ThreadPoolExecutor(max_workers=config.ARTICLE_FETCH_WORKERS)
+    futures = [
+        executor.submit(contextvars.copy_context().run, fetch, i, link)
+        for i, link in enumerate(links)
+    ]
+    done, _ = wait(futures, timeout=extraction_deadline.remaining() if extraction_deadline else None)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    articles = []
+    dropped = []
+    for link, future in zip(links, futures):
+        if future not in done:
+            dropped.append({'url': link, 'reason': 'deadline'})
+            continue
+        try:
+            content = future.result()
+        except Exception as e:
+            print(f"Error extracting content from {link}: {e}")
+            content = None
+        if content:
+            articles.append({'url': link, 'content': content})
+        else:
+            dropped.append({'url': link, 'reason': 'failed'})
+    return articles, dropped
+
+def start_prefetch(selector: ArticleSelector, potential_links, deadline: Deadline = None, article_cache: ArticleCache = None):
+    """
+    Start fetching the likeliest articles while AI selection runs.
+    
+    Args:
+        selector: Selector that ranks the candidates
+        potential_links: Links found in the newsletter
+        deadline: Overall deadline of the date being processed
+        article_cache: Run-wide cache that deduplicates article fetches across editions
+        
+    Returns:
+        The running prefetcher, or None if prefetching is disabled
+    """
+    if config.PREFETCH_ARTICLES <= 0 or not potential_links:
+        return None
+    candidates = selector.rank_candidates(potential_links, config.PREFETCH_ARTICLES)
+    if not candidates:
+        return None
+
+    prefetcher = ArticlePrefetcher(
+        lambda url: fetch_article(url, timeout_from(deadline, 15), article_cache),
+        max_workers=min(config.ARTICLE_FETCH_WORKERS, len(candidates)),
+    )
+    prefetcher.start(candidates)
+    return prefetcher
+
+def collect_newsletter_data(
+    ai_client,
+    target_date: date,
+    edition: Edition = None,
+    article_cache: ArticleCache = None,
+    deadline: Deadline = None,
+):
     """
     Collect newsletter and article data.
     
     Args:
         ai_client: The AI client for article selection
         target_date: Date for which the newsletter must be retrieved
+        edition: TLDR edition to collect (TLDR AI by default)
+        article_cache: Run-wide cache that deduplicates article fetches across editions
+        deadline: Optional time budget; stragglers are dropped when it runs short
         
     Returns:
         Dictionary with newsletter data
         
     Raises:
-        RuntimeError: If newsletter can't be found or fetched
+        NewsletterNotFoundError: If no issue exists for the date
+        NewsletterUnavailableError: If the issue could not be checked
+        RuntimeError: If newsletter can't be parsed or doesn't match the date
     """
-    # Get newsletter URL
-    newsletter_url = get_newsletter_url_for(target_date)
-    if not newsletter_url:
+    edition = edition or get_edition()
+
+    # Probe and download the issue in one round-trip
+    with span("fetch", date=target_date.isoformat(), edition=edition.slug) as fetch_span:
+        fetched = fetch_newsletter_for(target_date, edition, timeout=timeout_from(deadline, 10))
+        fetch_span["bytes"] = len(fetched[1]) if fetched else 0
+    if not fetched:
         # Explicitly fail if the exact date is unavailable
-        raise RuntimeError(
-            f"No newsletter found for {target_date.isoformat()}."
+        raise NewsletterNotFoundError(
+            f"No {edition.name} newsletter found for {target_date.isoformat()}."
         )
-        
-    # Get newsletter content
-    html_content = fetch_newsletter(newsletter_url)
-    if not html_content:
-        raise RuntimeError(f"Failed to fetch newsletter from {newsletter_url}")
+    newsletter_url, html_content = fetched
     
     # Parse newsletter
-    parser = NewsletterParser(html_content)
-    newsletter_text = parser.get_newsletter_text()
-    date_str = parser.extract_date(newsletter_url)
+    with span("parse") as parse_span:
+        parsed = parse_pool.parse_newsletter(html_content, newsletter_url)
+        newsletter_text = parsed.text
+        date_str = parsed.date
+        potential_links = parsed.links
+        parse_span["links"] = len(potential_links)
     expected_date = target_date.isoformat()
     if date_str != expected_date:
         raise RuntimeError(
@@ -61,27 +240,36 @@ def collect_newsletter_data(ai_client, target_date: date):
             f"expected {expected_date}, got {date_str or 'unknown'}."
         )
     
-    # Extract potential links
-    potential_links = parser.extract_links()
     print(f"Found {len(potential_links)} links in newsletter")
     
     # Select best links
-    selector = ArticleSelector(ai_client)
-    relevant_links = selector.select_with_ai(potential_links, newsletter_text)
+    if deadline:
+        deadline.check("article selection")
+    selection_timeout = deadline.slice(config.SELECTION_BUDGET_SHARE).timeout(60) if deadline else None
+    with span("select") as select_span:
+        selector = ArticleSelector(ai_client, domain_health)
+        prefetcher = start_prefetch(selector, potential_links, deadline, article_cache)
+        relevant_links = []
+        try:
+            relevant_links = selector.select_with_ai(potential_links, newsletter_text, timeout=selection_timeout)
+        finally:
+            if prefetcher is not None:
+                prefetcher.resolve(relevant_links)
+        select_span["selected"] = len(relevant_links)
     print(f"Selected {len(relevant_links)} best articles")
+    if prefetcher is not None:
+        print(prefetcher.summary())
     
-    # Get content from each article
+    # Get content from the selected articles within the extraction budget
+    articles, dropped = extract_articles(relevant_links, deadline, article_cache, prefetcher)
+    if dropped:
+        print(f"Dropped {len(dropped)} article(s): " + ", ".join(
+            f"{item['url']} ({item['reason']})" for item in dropped
+        ))
     article_contents = []
-    for i, link in enumerate(relevant_links):
-        print(f"Reading article {i+1}/{len(relevant_links)}: {link}")
-        content = extract_article_content(
-            link, 
-            timeout=15,
-            max_chars=config.ARTICLE_EXTRACT_MAX_CHARS
-        )
-        if content:
-            article_title = f"ARTICLE {i+1}: {link}"
-            article_contents.append(f"\n\n{article_title}\n{'-' * len(article_title)}\n{content}")
+    for i, article in enumerate(articles):
+        article_title = f"ARTICLE {i+1}: {article['url']}"
+        article_contents.append(f"\n\n{article_title}\n{'-' * len(article_title)}\n{article['content']}")
     
     # Put it all together
     all_content = f"{newsletter_text}\n\n{'=' * 40}\nARTICLE CONTENTS\n{'=' * 40}\n"
@@ -89,18 +277,170 @@ def collect_newsletter_data(ai_client, target_date: date):
     
     return {
         'date': date_str,
+        'edition': edition.slug,
+        'edition_name': edition.name,
+        'briefing_title': edition.briefing_title,
         'url': newsletter_url,
         'content': all_content,
+        'newsletter_text': newsletter_text,
+        'articles': articles,
+        'dropped_articles': dropped,
         'article_links': relevant_links
     }
 
-def create_summary(newsletter_data, ai_client):
+def collect_latest_newsletter_data(ai_client, lookback_days=7, deadline: Deadline = None):
+    """
+    Collect data for the most recent weekday newsletter.
+    
+    Args:
+        ai_client: The AI client for article selection
+        lookback_days: How many days back to look for an issue
+        deadline: Optional time budget for the whole request
+        
+    Returns:
+        Dictionary with newsletter data
+        
+    Raises:
+        RuntimeError: If no newsletter is available in the lookback window
+    """
+    today = date.today()
+    candidates = [
+        today - timedelta(days=offset)
+        for offset in range(lookback_days + 1)
+        if (today - timedelta(days=offset)).weekday() not in WEEKEND_DAYS
+    ]
+
+    # One archive request instead of probing every candidate date
+    available = discover_issue_dates()
+    if available is not None:
+        candidates = [d for d in candidates if d in available or d == today]
+
+    for target_date in candidates:
+        try:
+            return collect_newsletter_data(ai_client, target_date, deadline=deadline)
+        except RuntimeError as exc:
+            print(f"INFO: {exc}")
+
+    raise RuntimeError(f"No newsletter found in the last {lookback_days} days.")
+
+def briefing_archive():
+    """Return the static briefing archive, or ``None`` if ``ARCHIVE_DIR`` is empty."""
+    if not config.ARCHIVE_DIR:
+        return None
+    return StaticArchive(Path(config.ARCHIVE_DIR))
+
+def archive_briefing(newsletter_data, summary) -> bool:
+    """
+    Render a briefing into the static archive.
+    
+    A briefing missing articles cut off by the time budget is not archived:
+    the archive would keep serving it, while a request with more time can
+    still produce the full one. Articles that failed for good (403s,
+    paywalls, empty pages) do not block it. A failure only costs the static
+    copy, so it is reported, not raised.
+    
+    Returns:
+        True if the page was written
+    """
+    archive = briefing_archive()
+    if archive is None:
+        return False
+    cut_off = [
+        item for item in newsletter_data.get("dropped_articles", []) if item["reason"] == "deadline"
+    ]
+    if cut_off:
+        print(
+            f"Not archiving the {newsletter_data['date']} briefing: "
+            f"{len(cut_off)} article(s) ran out of time."
+        )
+        return False
+    try:
+        archive.publish_briefing(
+            newsletter_data.get("edition", "ai"),
+            newsletter_data["date"],
+            sanitize_ai_content(summary),
+            newsletter_data.get("url", ""),
+            newsletter_data.get("article_links", []),
+        )
+    except OSError as e:
+        print(f"WARNING: Could not archive the {newsletter_data['date']} briefing: {e}")
+        return False
+    return True
+
+def search_index():
+    """Return the full-text search index, or ``None`` if ``SEARCH_INDEX_FILE`` is empty."""
+    if not config.SEARCH_INDEX_FILE:
+        return None
+    return SearchIndex(Path(config.SEARCH_INDEX_FILE))
+
+def index_for_search(newsletter_data, summary) -> None:
+    """Add a processed date's newsletter, articles and briefing to the search index."""
+    index = search_index()
+    if index is None:
+        return
+    try:
+        with span("index", date=newsletter_data["date"]) as index_span:
+            index_span["documents"] = index.index_date(
+                newsletter_data.get("edition", "ai"),
+                newsletter_data["date"],
+                newsletter_url=newsletter_data.get("url", ""),
+                newsletter_text=newsletter_data.get("newsletter_text", ""),
+                articles=newsletter_data.get("articles", []),
+                summary=summary,
+            )
+    except (sqlite3.Error, OSError) as e:
+        # Search is a convenience; the date itself still succeeds
+        print(f"WARNING: Could not index the {newsletter_data['date']} issue for search: {e}")
+
+def format_search_results(hits) -> str:
+    """Render search hits for the terminal."""
+    if not hits:
+        return "No matches."
+    lines = []
+    for hit in hits:
+        lines.append(f"{hit.date}  {hit.edition:<8} {hit.kind:<10} {hit.title}")
+        if hit.url:
+            lines.append(f"    {hit.url}")
+        lines.append(f"    {hit.snippet_text()}")
+    return "\n".join(lines)
+
+def can_generate_live(edition_slug: str, target_date: date) -> bool:
+    """
+    Return True if a briefing missing from the archive may be generated on request.
+
+    Only configured editions and dates within ``ARCHIVE_LIVE_DAYS`` qualify,
+    so arbitrary URLs cannot start model runs for any edition and date.
+    """
+    if edition_slug not in {edition.slug for edition in configured_editions()}:
+        return False
+    return date.today() - timedelta(days=config.ARCHIVE_LIVE_DAYS) <= target_date <= date.today()
+
+def latest_archived_page(archive: StaticArchive, edition: Edition = None):
+    """
+    Return the archived page of the briefing live generation would produce now.
+    
+    Returns:
+        Archive-relative page name, or None if it has to be generated live
+    """
+    edition = edition or get_edition()
+    return latest_page(archive, edition.slug, date.today(), lambda day: probe_issue(day, edition, timeout=5))
+
+def create_summary(
+    newsletter_data,
+    ai_client,
+    profile: SubscriberProfile = DEFAULT_PROFILE,
+    deadline: Deadline = None,
+    mode: str = None,
+):
     """
     Create AI summary of newsletter content.
     
     Args:
         newsletter_data: Dictionary with newsletter content
         ai_client: The AI client for summarization
+        profile: Subscriber topic profile the summary is written for
+        deadline: Optional time budget for the model calls
+        mode: "single" or "map_reduce" (defaults to config.SUMMARY_MODE)
         
     Returns:
         Summary text string
@@ -108,24 +448,128 @@ def create_summary(newsletter_data, ai_client):
     Raises:
         RuntimeError: If summary creation fails
     """
-    print(f"Creating summary for {newsletter_data['date']}...")
+    mode = mode or config.SUMMARY_MODE
+    if deadline:
+        deadline.check("summarization")
+    budget = budget_state()
+    if budget == BUDGET_EXHAUSTED:
+        raise BudgetExceededError(f"LLM token budget exhausted; no summary for {newsletter_data['date']}.")
+    if budget == BUDGET_TIGHT and mode == "map_reduce":
+        # One prompt costs fewer tokens than a call per article plus the reduce step
+        print("LLM token budget is running low; using a single summary prompt.")
+        mode = "single"
+    print(f"Creating summary for {newsletter_data['date']} (profile: {profile.key}, mode: {mode})...")
     
-    prompt = create_summary_prompt(
-        newsletter_data, 
-        newsletter_data['date']
-    )
+    if mode == "map_reduce":
+        article_summaries = summarize_articles(newsletter_data, ai_client, deadline)
+        if deadline:
+            deadline.check("briefing assembly")
+        prompt = create_reduce_summary_prompt(
+            newsletter_data,
+            article_summaries,
+            newsletter_data['date'],
+            topics=profile.topic_descriptions()
+        )
+    else:
+        topics = profile.topic_descriptions()
+        overhead = len(create_summary_prompt(newsletter_data, newsletter_data['date'], topics, max_chars=0))
+        max_chars = fit_chars(config.SUMMARY_CONTENT_MAX_CHARS, overhead)
+        if max_chars < config.LLM_MIN_SUMMARY_CONTENT_CHARS:
+            raise BudgetExceededError(f"LLM token budget too low for a summary of {newsletter_data['date']}.")
+        if max_chars < min(config.SUMMARY_CONTENT_MAX_CHARS, len(newsletter_data['content'])):
+            print(f"LLM token budget is running low; summarising the first {max_chars} characters.")
+        prompt = create_summary_prompt(
+            newsletter_data, 
+            newsletter_data['date'],
+            topics=topics,
+            max_chars=max_chars
+        )
     
-    response = ai_client.generate_content(prompt)
+    if deadline:
+        deadline.check("summary")
+    with span("summarize", date=newsletter_data['date'], profile=profile.key, mode=mode):
+        response = ai_client.generate_content(
+            prompt, timeout=timeout_from(deadline, 120), task="summary"
+        )
     return response.text
 
-def run_qa_mode(newsletter_data, ai_client):
+def summarize_articles(newsletter_data, ai_client, deadline: Deadline = None):
+    """
+    Summarise every extracted article in parallel (map step of map-reduce mode).
+    
+    Summaries are cached by article URL and content hash, so other profiles,
+    editions linking the same article and re-runs reuse them. Articles whose
+    summary fails or times out are left out of the briefing and recorded in
+    ``dropped_articles``.
+    
+    Args:
+        newsletter_data: Dictionary with the extracted articles
+        ai_client: The AI client for summarization
+        deadline: Optional time budget; the map step gets a share of it
+        
+    Returns:
+        List of dictionaries with url and summary, in article order
+    """
+    articles = newsletter_data.get('articles', [])
+    if not articles:
+        return []
+
+    cache = ArticleSummaryCache(Path(config.ARTICLE_SUMMARY_CACHE_DIR))
+    map_deadline = deadline.slice(config.SUMMARY_MAP_BUDGET_SHARE) if deadline else None
+
+    def summarize(article):
+        cached = cache.get(article['url'], article['content'])
+        if cached is not None:
+            return cached
+        if map_deadline:
+            map_deadline.check("article summary")
+        prompt = create_article_summary_prompt(article['url'], article['content'])
+        with span("summarize_article", url=article['url']):
+            response = ai_client.generate_content(
+                prompt, timeout=timeout_from(map_deadline, 60), task="article_summary"
+            )
+        cache.put(article['url'], article['content'], response.text)
+        return response.text
+
+    with ThreadPoolExecutor(max_workers=config.SUMMARY_MAP_WORKERS) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, summarize, article)
+            for article in articles
+        ]
+
+    summaries = []
+    dropped = newsletter_data.setdefault('dropped_articles', [])
+    for article, future in zip(articles, futures):
+        try:
+            summary = future.result()
+        except Exception as e:
+            print(f"Skipping summary of {article['url']}: {e}")
+            if all(item['url'] != article['url'] for item in dropped):
+                timed_out = isinstance(e, (AITimeoutError, DeadlineExceededError))
+                dropped.append({'url': article['url'], 'reason': 'deadline' if timed_out else 'failed'})
+            continue
+        if summary:
+            summaries.append({'url': article['url'], 'summary': summary})
+    return summaries
+
+def run_qa_mode(newsletter_data, ai_client, session_path=None):
     """
     Run interactive Q&A session about the newsletter.
     
+    The conversation is kept across questions and saved after every turn,
+    so it can be resumed later from ``session_path`` alone.
+    
     Args:
-        newsletter_data: Dictionary with newsletter content
+        newsletter_data: Dictionary with newsletter content (None to resume)
         ai_client: The AI client for Q&A
+        session_path: File to persist the session to; defaults to one per date
     """
+    if session_path is None and newsletter_data is not None:
+        session_path = Path(config.QA_SESSION_DIR) / f"{newsletter_data['date']}.json"
+
+    session = ai_client.start_session(newsletter_data, session_path)
+    print(f"Indexed {len(session.index.chunks)} content chunks for Q&A.")
+
     print("\nQ&A mode - type 'quit', 'exit', or 'q' to stop.")
     print("\nPress Enter to start Q&A mode...")
     input()
@@ -142,108 +586,327 @@ def run_qa_mode(newsletter_data, ai_client):
                 continue
             
             print("Thinking...")
-            prompt = create_qa_prompt(
-                question, 
-                newsletter_data['content'], 
-                newsletter_data['date']
-            )
+            answer, sent_tokens = session.ask(question)
             
-            response = ai_client.generate_content(prompt)
+            # Compare against the full-context prompt we used to send
+            if newsletter_data is not None:
+                full_tokens = estimate_tokens(create_qa_prompt(
+                    question,
+                    newsletter_data['content'],
+                    newsletter_data['date']
+                ))
+                saved = full_tokens - sent_tokens
+                print(
+                    f"Prompt: ~{sent_tokens} tokens instead of ~{full_tokens} "
+                    f"(saved ~{saved}, {saved / full_tokens:.0%})"
+                )
                 
             # Format output nicely
-            wrapped_text = textwrap.fill(response.text, width=80)
+            wrapped_text = textwrap.fill(answer, width=80)
             print(f"\nANSWER:\n{wrapped_text}")
             
         except Exception as e:
             print(f"\nERROR: {e}")
             print("Might be API limits or connection issues.")
 
-async def send_telegram_summary(summary, date_str):
+def telegram_recipients():
+    """Return the configured Telegram user IDs plus everyone subscribed via /start."""
+    return recipient_ids(SubscriberStore(Path(config.SUBSCRIBER_DB_FILE)), config.TELEGRAM_USER_IDS)
+
+def queue_telegram_summary(summary, batch, user_ids=None, completes=None):
     """
-    Sends the summary to Telegram users if enabled.
+    Queue the summary for Telegram users in the delivery outbox.
 
     Args:
         summary: The summary text to send.
-        date_str: ISO date string of the newsletter.
+        batch: Identifies the message, e.g. "ai/2025-06-10/default".
+        user_ids: Recipients; defaults to ``telegram_recipients()``.
+        completes: Run state date to mark once every queued copy is delivered.
+
+    Returns:
+        Delivery keys, or None if Telegram is disabled or not configured.
     """
     if not config.TELEGRAM_ENABLED:
         print("Telegram notifications disabled; skipping send.")
-        return False
+        return None
 
-    if not config.TELEGRAM_BOT_TOKEN or not config.TELEGRAM_USER_IDS:
-        print("Telegram is enabled, but token or user IDs are missing.")
-        return False
+    if user_ids is None:
+        user_ids = telegram_recipients()
 
-    # Format the message - summary already contains HTML formatting
-    message = summary
-
-    # Create a list of tasks for sending messages
-    tasks = []
-    for user_id in config.TELEGRAM_USER_IDS:
-        if user_id:  # Ensure user_id is not an empty string
-            tasks.append(
-                send_message(
-                    user_id=int(user_id),
-                    message_text=message,
-                    bot_token=config.TELEGRAM_BOT_TOKEN
-                )
-            )
+    if not config.TELEGRAM_BOT_TOKEN or not user_ids:
+        print("Telegram is enabled, but token or user IDs are missing.")
+        return None
 
-    if not tasks:
+    recipients = [int(user_id) for user_id in user_ids if user_id]  # Skip empty entries
+    if not recipients:
         print("No valid Telegram user IDs configured; skipping send.")
-        return False
+        return None
 
-    print(f"Sending summary for {date_str} to {len(tasks)} Telegram user(s)...")
-    await asyncio.gather(*tasks)
-    print("Summary sent successfully via Telegram.")
-    return True
+    outbox = DeliveryOutbox(Path(config.OUTBOX_FILE))
+    return outbox.enqueue(batch, recipients, prepare_chunks(summary), completes)
+
+async def deliver_queued(keys, label):
+    """
+    Deliver queued outbox entries; failed parts stay queued for retry.
+
+    Returns:
+        True if every delivery completed
+    """
+    outbox = DeliveryOutbox(Path(config.OUTBOX_FILE))
+    print(f"Sending {label} to {len(keys)} Telegram recipient(s)...")
+    with span("send", label=label, recipients=len(keys)):
+        sent = await deliver(outbox, keys, config.TELEGRAM_BOT_TOKEN)
+    if sent:
+        print("Summary sent successfully via Telegram.")
+    else:
+        print("Some Telegram deliveries failed; only their missing parts will be retried.")
+    return sent
+
+async def send_telegram_summary(summary, date_str, user_ids=None, batch=None, completes=None):
+    """
+    Sends the summary to Telegram users if enabled, through the delivery outbox.
+
+    Args:
+        summary: The summary text to send.
+        date_str: ISO date string of the newsletter.
+        user_ids: Recipients; defaults to ``telegram_recipients()``.
+        batch: Outbox batch name (defaults to ``date_str``).
+        completes: Run state date to mark once every copy is delivered.
+
+    Returns:
+        True if every recipient received the whole message
+    """
+    keys = queue_telegram_summary(summary, batch or date_str, user_ids, completes)
+    if not keys:
+        return False
+    return await deliver_queued(keys, date_str)
 
 async def process_and_send_for_date(
     target_date: date,
     ai_client: AIClient,
     state_store: RunStateStore,
+    edition: Edition = None,
+    article_cache: ArticleCache = None,
 ) -> bool:
-    """Process newsletter workflow for a single date."""
-    print(f"\n=== Обработка новостей за {target_date.isoformat()} началась ===")
+    """Process newsletter workflow for a single date and edition."""
+    edition = edition or get_edition()
+    label = f"{edition.name} {target_date.isoformat()}"
+    print(f"\n=== Обработка новостей {label} началась ===")
+    deadline = Deadline.after(config.DATE_TIME_BUDGET_SECONDS)
     try:
-        newsletter_data = collect_newsletter_data(ai_client, target_date)
-        summary = create_summary(newsletter_data, ai_client)
-
-        # print("\n" + "=" * 80)
-        # print(f"AI BRIEFING - TLDR NEWSLETTER {newsletter_data['date']}")
-        # print("=" * 80)
-        # print(summary)
-        # print("\n" + "=" * 80)
+        with span("date", date=target_date.isoformat(), edition=edition.slug), \
+                usage_label(f"{edition.slug}/{target_date.isoformat()}"), \
+                profile_section(f"{edition.slug}-{target_date.isoformat()}"):
+            # Blocking work runs in a thread so several editions proceed concurrently
+            newsletter_data = await asyncio.to_thread(
+                collect_newsletter_data, ai_client, target_date, edition, article_cache, deadline
+            )
+            sent = await summarize_and_send_per_profile(newsletter_data, ai_client, deadline)
 
-        sent = await send_telegram_summary(summary, newsletter_data["date"])
         if sent:
             state_store.mark_run(target_date)
-            print(f"Статус: рассылка за {target_date.isoformat()} завершена.")
+            print(f"Статус: рассылка {label} завершена.")
             return True
 
         print(
             "Telegram delivery did not complete; state not recorded. "
-            f"Пропустите дату {target_date.isoformat()} вручную при необходимости."
+            f"Пропустите {label} вручную при необходимости."
         )
         return False
 
+    except NewsletterNotFoundError as exc:
+        print(f"INFO: {exc}")
+        state_store.mark_missing(target_date, missing_date_ttl(target_date))
+        print(f"Выпуска {label} нет; дата временно помечена как отсутствующая.")
+        return False
+
+    except NewsletterUnavailableError as exc:
+        # Only a confirmed miss goes into the negative cache; this date is retried
+        print(f"WARNING: {exc}")
+        print(f"Источник {label} недоступен. Состояние не обновлено.")
+        return False
+
+    except BudgetExceededError as exc:
+        print(f"WARNING: {exc}")
+        print(f"Рассылка {label} отложена до пополнения бюджета токенов. Состояние не обновлено.")
+        return False
+
     except RuntimeError as exc:
         print(f"INFO: {exc}")
         print(
-            f"Новостей за {target_date.isoformat()} нет или источник недоступен. "
+            f"Новостей {label} нет или источник недоступен. "
             "Состояние не обновлено."
         )
         return False
 
-async def main():
+def missing_date_ttl(target_date: date) -> timedelta:
+    """Return how long a date without an issue stays in the negative cache."""
+    if target_date >= date.today() - timedelta(days=1):
+        return timedelta(hours=config.MISSING_DATE_RECENT_TTL_HOURS)
+    return timedelta(hours=config.MISSING_DATE_PAST_TTL_HOURS)
+
+def filter_available_dates(edition: Edition, state_store: RunStateStore, candidates: list[date]) -> list[date]:
     """
-    Main asynchronous function that runs everything.
+    Drop dates that are known or discovered to have no issue.
+    
+    Uses the negative cache first and then one archive request per edition.
+    Dates missing from the archive are added to the negative cache. If the
+    archive is unavailable, the remaining dates are probed individually.
+    """
+    remaining = [d for d in candidates if not state_store.is_known_missing(d)]
+    skipped = len(candidates) - len(remaining)
+    if skipped:
+        print(f"{edition.name}: {skipped} date(s) skipped via negative cache.")
+    if not remaining:
+        return []
+
+    with span("discover", edition=edition.slug):
+        available = discover_issue_dates(edition)
+    if available is None:
+        return remaining
 
+    # The archive can lag behind today's issue, so today is always probed
+    today = date.today()
+    existing = []
+    for target_date in remaining:
+        if target_date in available or target_date >= today:
+            existing.append(target_date)
+        else:
+            state_store.mark_missing(target_date, missing_date_ttl(target_date))
+    return existing
+
+async def summarize_and_send_per_profile(newsletter_data, ai_client, deadline: Deadline = None) -> bool:
+    """
+    Generate one summary per distinct subscriber profile and send it to that group.
+    
+    Summaries are cached per edition, date and profile, so reruns and newly
+    added subscribers with an existing profile cost no extra LLM calls.
+    
     Returns:
-        Exit code (0 for success, 1 for failure)
+        True if every group was delivered successfully
+    """
+    recipients = telegram_recipients() if config.TELEGRAM_ENABLED else []
+    groups = group_by_profile(recipients, load_profiles(Path(config.SUBSCRIBER_PROFILES_FILE)))
+    if not groups:
+        # Still produce the default briefing even when nobody receives it
+        groups = {DEFAULT_PROFILE: []}
+
+    cache = SummaryCache(Path(config.SUMMARY_CACHE_DIR))
+    edition = newsletter_data.get("edition", "ai")
+    date_str = newsletter_data["date"]
+    # Compact article records let the weekly digest run without refetching
+    cache.put_json(edition, date_str, ARTICLES_ARTEFACT, article_excerpts(newsletter_data.get("articles", [])))
+    if len(groups) > 1:
+        print(f"{len(groups)} subscriber profile(s) for {sum(len(ids) for ids in groups.values())} recipient(s).")
+
+    summaries = {}
+    for profile in groups:
+        summary = cache.get(edition, date_str, profile.key)
+        if summary is None:
+            summary = await asyncio.to_thread(create_summary, newsletter_data, ai_client, profile, deadline)
+            cache.put(edition, date_str, profile.key, summary)
+        else:
+            print(f"Using cached summary for {date_str} (profile: {profile.key}).")
+        summaries[profile] = summary
+
+    if DEFAULT_PROFILE in summaries:
+        archive_briefing(newsletter_data, summaries[DEFAULT_PROFILE])
+    index_for_search(newsletter_data, summaries.get(DEFAULT_PROFILE, ""))
+
+    # Queue every group before sending so the date is only completed once all are delivered
+    completes = {"state": str(get_edition(edition).run_state_path()), "date": date_str}
+    keys = []
+    for profile, user_ids in groups.items():
+        queued = queue_telegram_summary(summaries[profile], f"{edition}/{date_str}/{profile.key}", user_ids, completes)
+        if queued is None:
+            return False
+        keys.extend(queued)
+    return await deliver_queued(keys, f"{edition} {date_str}")
+
+def create_weekly_digest(ai_client, week_end: date, edition: Edition = None):
+    """
+    Create the weekly digest from the stored daily briefings.
+    
+    Only persisted artefacts are read: each day's briefings are reduced once
+    to a short, cached story list, stories are deduplicated across days and a
+    single small prompt assembles the digest. Nothing is fetched.
+    
+    Args:
+        ai_client: The AI client for summarization
+        week_end: Last day of the week to cover (usually Friday)
+        edition: TLDR edition (TLDR AI by default)
+        
+    Returns:
+        Digest text string
+        
+    Raises:
+        RuntimeError: If no daily briefings are stored for the week
+    """
+    edition = edition or get_edition()
+    cache = SummaryCache(Path(config.SUMMARY_CACHE_DIR))
+    key = week_key(week_end)
+    cached = cache.get(edition.slug, key, week_end.isoformat())
+    if cached is not None:
+        print(f"Using cached weekly digest {key} ({edition.name}).")
+        return cached
+
+    with span("digest_material", edition=edition.slug) as material_span:
+        grouped = week_material(cache, edition.slug, week_end)
+        material_span["stories"] = sum(len(stories) for stories in grouped.values())
+    if not grouped:
+        raise RuntimeError(f"No stored {edition.name} briefings for the week ending {week_end.isoformat()}.")
+
+    week_label = f"{week_dates(week_end)[0].isoformat()} – {week_end.isoformat()}"
+    prompt = create_weekly_digest_prompt(
+        format_material(grouped), week_label, edition.name, edition.briefing_title
+    )
+    print(
+        f"Creating weekly digest {key} ({edition.name}) from {len(grouped)} day(s), "
+        f"~{estimate_tokens(prompt)} prompt tokens..."
+    )
+    with span("digest", edition=edition.slug, week=key):
+        response = ai_client.generate_content(prompt, task="digest")
+    cache.put(edition.slug, key, week_end.isoformat(), response.text)
+    return response.text
+
+async def send_weekly_digest(ai_client, week_end: date, edition: Edition = None) -> bool:
+    """
+    Create and send the weekly digest once per edition and week.
+    
+    Returns:
+        True if the digest was sent (or had been sent already)
+    """
+    edition = edition or get_edition()
+    state_store = RunStateStore(edition.digest_state_path())
+    if state_store.has_run_for(week_end):
+        print(f"Weekly digest {week_key(week_end)} ({edition.name}) already sent.")
+        return True
+
+    try:
+        with usage_label(f"{edition.slug}/{week_key(week_end)}"):
+            digest = await asyncio.to_thread(create_weekly_digest, ai_client, week_end, edition)
+    except RuntimeError as exc:
+        print(f"INFO: {exc}")
+        return False
+
+    return await send_telegram_summary(
+        digest,
+        week_key(week_end),
+        batch=f"{edition.slug}/digest/{week_end.isoformat()}",
+        completes={"state": str(edition.digest_state_path()), "date": week_end.isoformat()},
+    )
+
+def plan_dates(state_store: RunStateStore, end_date: date) -> list[date]:
+    """
+    Return the weekdays still to be processed for one run state store.
+    
+    Args:
+        state_store: Run state of a single edition
+        end_date: Last date to consider (usually today)
+        
+    Returns:
+        Sorted list of dates after the last recorded run
     """
-    state_store = RunStateStore(Path(config.RUN_STATE_FILE))
-    end_date = date.today()
     last_run_date = state_store.get_last_run_date()
 
     if last_run_date is None:
@@ -251,33 +914,243 @@ async def main():
     else:
         start_date = last_run_date + timedelta(days=1)
 
-    if start_date > end_date:
-        print(
-            "Актуальных дат для обработки нет. Последняя рассылка уже отправлена."
-        )
-        return 0
-
     dates_to_process = []
     current_date = start_date
     while current_date <= end_date:
         if current_date.weekday() not in WEEKEND_DAYS:
             dates_to_process.append(current_date)
         current_date += timedelta(days=1)
+    return dates_to_process
+
+def has_work(editions, end_date: date) -> bool:
+    """
+    Return True if a one-shot run has anything to do.
+    
+    Only local state is read (run state and negative cache of each edition,
+    the digest schedule and the outbox), so an idle run decides to stop
+    before any SDK is imported or any request is made.
+    """
+    if config.WEEKLY_DIGEST_ENABLED and end_date.weekday() == config.WEEKLY_DIGEST_WEEKDAY:
+        # Once this week's digest is sent the day is idle again
+        if any(not RunStateStore(edition.digest_state_path()).has_run_for(end_date) for edition in editions):
+            return True
+    outbox_path = Path(config.OUTBOX_FILE)
+    if config.TELEGRAM_ENABLED and outbox_path.exists() and DeliveryOutbox(outbox_path).due():
+        return True
+    for edition in editions:
+        state_store = RunStateStore(edition.run_state_path())
+        if any(not state_store.is_known_missing(d) for d in plan_dates(state_store, end_date)):
+            return True
+    return False
+
+def digest_ready_editions(editions, week_end: date) -> list:
+    """
+    Return the editions whose digest for ``week_end`` can be built.
+
+    The issue of ``week_end`` itself must have been sent or confirmed
+    missing first, otherwise the digest would go out without the last day
+    of the week (the daemon waits for the day's issues the same way).
+    """
+    ready = []
+    for edition in editions:
+        state_store = RunStateStore(edition.run_state_path())
+        if state_store.has_run_for(week_end) or state_store.is_known_missing(week_end):
+            ready.append(edition)
+        else:
+            print(
+                f"Weekly digest {week_key(week_end)} ({edition.name}) waits for the "
+                f"{week_end.isoformat()} issue."
+            )
+    return ready
+
+async def run_weekly_digests(editions, week_end: date, ai_client=None) -> int:
+    """
+    Send the weekly digest of every edition.
+    
+    Returns:
+        Exit code (0 if every digest was sent, 1 otherwise)
+    """
+    ai_client = ai_client or AIClient()
+    results = [await send_weekly_digest(ai_client, week_end, edition) for edition in editions]
+    return 0 if all(results) else 1
+
+async def run_pending_dates(editions, end_date: date, ai_client=None, article_cache=None) -> bool:
+    """
+    Process every pending date of ``editions`` up to ``end_date``.
+
+    All editions share one AI client (and its rate limiter), the HTTP
+    connection pool and an article cache; each keeps its own run state.
+
+    Args:
+        editions: Editions to process
+        end_date: Last date to consider
+        ai_client: Client to reuse (created on demand when there is work)
+        article_cache: Article cache to reuse across calls
+
+    Returns:
+        True if there were dates to process
+    """
+    state_stores = {edition.slug: RunStateStore(edition.run_state_path()) for edition in editions}
+    pending = {
+        edition.slug: set(filter_available_dates(
+            edition,
+            state_stores[edition.slug],
+            plan_dates(state_stores[edition.slug], end_date),
+        ))
+        for edition in editions
+    }
+    dates_to_process = sorted(set().union(*pending.values()))
 
     if not dates_to_process:
         print(
-            "Нет новых рабочих дней для обработки. Все рассылки актуальны."
+            "Актуальных дат для обработки нет. Последняя рассылка уже отправлена."
         )
-        return 0
+        return False
 
     print("Даты к обработке:", ", ".join(d.isoformat() for d in dates_to_process))
+    if len(editions) > 1:
+        print("Выпуски:", ", ".join(edition.name for edition in editions))
+
+    ai_client = ai_client or AIClient()
+    article_cache = article_cache if article_cache is not None else ArticleCache()
+    for index, target_date in enumerate(dates_to_process):
+        await asyncio.gather(*(
+            process_and_send_for_date(
+                target_date,
+                ai_client,
+                state_stores[edition.slug],
+                edition,
+                article_cache,
+            )
+            for edition in editions
+            if target_date in pending[edition.slug]
+        ))
+        if index < len(dates_to_process) - 1:
+            await asyncio.sleep(config.BACKFILL_DELAY_SECONDS)
+
+    if article_cache.hits:
+        print(f"Article cache: {article_cache.hits} duplicate fetch(es) avoided across editions.")
+    return True
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Summarise TLDR newsletters and send them to Telegram.")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep running and poll for each new issue around its publish time",
+    )
+    parser.add_argument(
+        "--weekly-digest",
+        action="store_true",
+        help="only build and send the weekly digest from stored daily briefings",
+    )
+    parser.add_argument(
+        "--week-end",
+        type=date.fromisoformat,
+        help="last day of the digest week, YYYY-MM-DD (default: today)",
+    )
+    parser.add_argument(
+        "--usage",
+        type=int,
+        nargs="?",
+        const=7,
+        metavar="DAYS",
+        help="only print LLM token usage and cost of the last DAYS days (default: 7)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="sample stacks and trace memory per stage; reports go to PROFILE_DIR",
+    )
+    parser.add_argument(
+        "--search",
+        metavar="QUERY",
+        help="only search past newsletters, articles and briefings",
+    )
+    parser.add_argument(
+        "--since",
+        type=date.fromisoformat,
+        help="with --search, only dates on or after YYYY-MM-DD",
+    )
+    parser.add_argument(
+        "--sync-subscribers",
+        action="store_true",
+        help="only apply pending /start and /stop bot messages to the subscriber store",
+    )
+    return parser.parse_args(argv)
+
+async def main(argv=None):
+    """
+    Main asynchronous function that runs everything.
+
+    Processes pending dates of all configured editions once; on the
+    configured weekday the weekly digest follows the daily run. With
+    ``--daemon`` it keeps running instead (see ``daemon.run_daemon``).
+
+    Args:
+        argv: Command-line arguments (defaults to ``sys.argv[1:]``)
+
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    args = parse_args(argv)
+    end_date = date.today()
+    editions = configured_editions()
+
+    if args.usage is not None:
+        store = ledger()
+        if store is None:
+            print("The LLM usage ledger is disabled (LLM_USAGE_DB_FILE is empty).")
+            return 1
+        print(format_report(store, end_date - timedelta(days=max(args.usage, 1) - 1)))
+        return 0
+
+    if args.search is not None:
+        index = search_index()
+        if index is None:
+            print("The search index is disabled (SEARCH_INDEX_FILE is empty).")
+            return 1
+        print(format_search_results(index.search(args.search, since=args.since, limit=config.SEARCH_RESULT_LIMIT)))
+        return 0
+
+    one_shot = not (args.daemon or args.weekly_digest or args.sync_subscribers)
+    if one_shot and not has_work(editions, end_date):
+        # The common timer-driven case: skip subscriber sync, SDK imports and metrics
+        print("Актуальных дат для обработки нет. Последняя рассылка уже отправлена.")
+        return 0
 
     try:
-        ai_client = AIClient()
-        for index, target_date in enumerate(dates_to_process):
-            await process_and_send_for_date(target_date, ai_client, state_store)
-            if index < len(dates_to_process) - 1:
-                await asyncio.sleep(10)
+        if args.daemon:
+            from daemon import run_daemon
+            return await run_daemon(editions)
+
+        if config.TELEGRAM_ENABLED and config.TELEGRAM_BOT_TOKEN:
+            try:
+                await sync_subscribers(config.TELEGRAM_BOT_TOKEN)
+            except Exception as exc:
+                # Known subscribers still get today's briefing
+                print(f"WARNING: Could not fetch subscriber updates: {exc}")
+            if args.sync_subscribers:
+                return 0
+            # Finish deliveries that failed in earlier runs before planning new work
+            await retry_due(DeliveryOutbox(Path(config.OUTBOX_FILE)), config.TELEGRAM_BOT_TOKEN)
+        elif args.sync_subscribers:
+            print("Telegram is not enabled and configured; no subscriber updates to fetch.")
+            return 1
+
+        if args.profile:
+            # Worker processes are invisible to the sampler
+            parse_pool.set_inline(True)
+        with usage_run("cli"), profiling("cli", args.profile):
+            if args.weekly_digest:
+                return await run_weekly_digests(editions, args.week_end or end_date)
+
+            await run_pending_dates(editions, end_date)
+            if config.WEEKLY_DIGEST_ENABLED and end_date.weekday() == config.WEEKLY_DIGEST_WEEKDAY:
+                ready = digest_ready_editions(editions, end_date)
+                if ready:
+                    await run_weekly_digests(ready, end_date)
         return 0
 
     except Exception as exc:
@@ -285,6 +1158,11 @@ async def main():
         print("The program encountered an error and cannot continue.")
         return 1
 
+    finally:
+        parse_pool.shutdown()
+        domain_health.save()
+        registry.write_prometheus(Path(config.METRICS_FILE))
+
 if __name__ == "__main__":
     # Run the main async function
     sys.exit(asyncio.run(main()))
@@ -0,0 +1,206 @@
+"""Weekly digest material built from stored daily artefacts."""
+
+from __future__ import annotations
+
+import html
+import re
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlsplit, urlunsplit
+
+import config
+from subscribers.profiles import DEFAULT_PROFILE
+from utils.summary_cache import SummaryCache
+
+# Each news item of a daily briefing starts with a bold "🔹" headline
+STORY_PATTERN = re.compile(r"<b>\s*🔹\s*(.+?)</b>(.*?)(?=<b>\s*🔹|\Z)", re.S)
+WHAT_HAPPENED_PATTERN = re.compile(r"Что произошло:\s*</b>(.*?)(?=<b>|\Z)", re.S)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+WORD_PATTERN = re.compile(r"\w+", re.U)
+
+# Headlines whose word sets overlap this much (Jaccard) are the same story
+DUPLICATE_SIMILARITY = 0.6
+
+# Material and artefact names under SummaryCache's date directories
+STORIES_ARTEFACT = "stories"
+ARTICLES_ARTEFACT = "articles"
+
+
+@dataclass(frozen=True)
+class Story:
+    """One news item of the week with the days it was reported on."""
+
+    headline: str
+    detail: str
+    day: str
+    follow_ups: tuple = ()
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"headline": self.headline, "detail": self.detail, "day": self.day}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "Story":
+        return cls(headline=str(data["headline"]), detail=str(data.get("detail", "")), day=str(data["day"]))
+
+
+def week_dates(week_end: date) -> List[date]:
+    """Return the weekdays of the week ending on ``week_end``."""
+    monday = week_end - timedelta(days=week_end.weekday())
+    days = [monday + timedelta(days=offset) for offset in range(5)]
+    return [day for day in days if day <= week_end]
+
+
+def week_key(week_end: date) -> str:
+    """Return the cache key for the digest of the week containing ``week_end``."""
+    year, week, _ = week_end.isocalendar()
+    return f"week-{year}-W{week:02d}"
+
+
+def article_excerpts(articles: Sequence[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Return the compact per-article record stored for the weekly digest."""
+    limit = config.DIGEST_EXCERPT_CHARS
+    return [
+        {"url": article["url"], "excerpt": _first_sentences(article["content"], limit)}
+        for article in articles
+    ]
+
+
+def stories_from_summary(summary: str, day: str) -> List[Story]:
+    """Split a daily briefing into stories with a one-line detail each."""
+    stories = []
+    for headline, body in STORY_PATTERN.findall(summary):
+        what = WHAT_HAPPENED_PATTERN.search(body)
+        detail = _plain(what.group(1) if what else body)
+        stories.append(Story(
+            headline=_plain(headline),
+            detail=_first_sentences(detail, config.DIGEST_STORY_CHARS),
+            day=day,
+        ))
+    return stories
+
+
+def day_stories(cache: SummaryCache, edition: str, day: str) -> Optional[List[Story]]:
+    """
+    Return the stories of one day, deriving and caching them on first use.
+
+    Stories come from the stored briefings of every profile (the default one
+    first); a day without briefings falls back to its article excerpts, which
+    are not cached so a briefing stored later still takes over.
+
+    Returns:
+        List of stories, or None if nothing was stored for the day
+    """
+    stored = cache.get_json(edition, day, STORIES_ARTEFACT)
+    if stored is not None:
+        return [Story.from_dict(item) for item in stored]
+
+    profiles = cache.profiles(edition, day)
+    profiles.sort(key=lambda key: key != DEFAULT_PROFILE.key)
+    stories = []
+    for profile_key in profiles:
+        stories.extend(stories_from_summary(cache.get(edition, day, profile_key) or "", day))
+    if stories:
+        stories = merge_stories(stories)
+        cache.put_json(edition, day, STORIES_ARTEFACT, [story.to_dict() for story in stories])
+        return stories
+
+    excerpts = cache.get_json(edition, day, ARTICLES_ARTEFACT)
+    if not excerpts:
+        return None
+    return [
+        Story(headline=_canonical_url(item["url"]), detail=item.get("excerpt", ""), day=day)
+        for item in excerpts
+    ]
+
+
+def merge_stories(stories: Sequence[Story]) -> List[Story]:
+    """
+    Deduplicate stories, keeping the first report and noting later days.
+
+    Two stories match when their headlines share at least
+    ``DUPLICATE_SIMILARITY`` of their words, or are the same article URL.
+    """
+    merged: List[Story] = []
+    word_sets: List[set] = []
+    for story in stories:
+        words = _words(story.headline)
+        for index, existing_words in enumerate(word_sets):
+            if _similarity(words, existing_words) >= DUPLICATE_SIMILARITY:
+                existing = merged[index]
+                if story.day != existing.day and story.day not in existing.follow_ups:
+                    merged[index] = replace(existing, follow_ups=existing.follow_ups + (story.day,))
+                break
+        else:
+            merged.append(story)
+            word_sets.append(words)
+    return merged
+
+
+def week_material(cache: SummaryCache, edition: str, week_end: date) -> Dict[str, List[Story]]:
+    """
+    Return the deduplicated stories of the week, grouped by first reported day.
+
+    Days already processed reuse their stored story list, so adding Friday
+    only derives Friday's stories; nothing is fetched from the network.
+    """
+    all_stories = []
+    for day in week_dates(week_end):
+        stories = day_stories(cache, edition, day.isoformat())
+        if stories:
+            all_stories.extend(stories)
+
+    grouped: Dict[str, List[Story]] = {}
+    for story in merge_stories(all_stories):
+        grouped.setdefault(story.day, []).append(story)
+    return grouped
+
+
+def format_material(grouped: Dict[str, List[Story]]) -> str:
+    """Render grouped stories as the compact text sent to the model."""
+    lines = []
+    for day in sorted(grouped):
+        lines.append(day)
+        for story in grouped[day]:
+            line = f"- {story.headline}"
+            if story.detail:
+                line += f" — {story.detail}"
+            if story.follow_ups:
+                line += f" (also covered {', '.join(story.follow_ups)})"
+            lines.append(line)
+        lines.append("")
+    return "\n".join(lines).strip()
+
+
+# Internal helpers ---------------------------------------------------------
+
+def _plain(text: str) -> str:
+    return " ".join(html.unescape(TAG_PATTERN.sub(" ", text)).split())
+
+
+def _first_sentences(text: str, limit: int) -> str:
+    """Return whole leading sentences of ``text`` up to ``limit`` characters."""
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+    return cut[:end + 1] if end > 0 else cut.rsplit(" ", 1)[0] + "…"
+
+
+def _words(text: str) -> set:
+    # URL headlines (excerpt fallback) only match the identical URL
+    if text.startswith("http"):
+        return {text}
+    return {word for word in WORD_PATTERN.findall(text.lower()) if len(word) > 2}
+
+
+def _similarity(first: set, second: set) -> float:
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def _canonical_url(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path.rstrip("/"), "", ""))
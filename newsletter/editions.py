@@ -0,0 +1,81 @@
+"""Registry of TLDR newsletter editions."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, List
+
+import config
+
+DEFAULT_EDITION = "ai"
+
+
+@dataclass(frozen=True)
+class Edition:
+    """A TLDR newsletter edition published under ``https://tldr.tech/<slug>/``."""
+
+    slug: str
+    name: str
+    briefing_title: str
+
+    def url_for(self, target_date: date) -> str:
+        """Return the issue URL for ``target_date``."""
+        return f"https://tldr.tech/{self.slug}/{target_date.strftime('%Y-%m-%d')}"
+
+    def archive_url(self) -> str:
+        """Return the archive page listing all published issues."""
+        return f"https://tldr.tech/{self.slug}/archives"
+
+    def run_state_path(self) -> Path:
+        """Return the run state file for this edition.
+
+        The AI edition keeps using ``RUN_STATE_FILE`` so existing state carries over.
+        """
+        base = Path(config.RUN_STATE_FILE)
+        if self.slug == DEFAULT_EDITION:
+            return base
+        return base.with_name(f"{base.stem}.{self.slug}{base.suffix}")
+
+    def digest_state_path(self) -> Path:
+        """Return the file recording which weekly digests were sent."""
+        path = self.run_state_path()
+        return path.with_name(f"{path.stem}.digest{path.suffix}")
+
+
+EDITIONS: Dict[str, Edition] = {
+    edition.slug: edition
+    for edition in (
+        Edition("ai", "TLDR AI", "AI News Briefing"),
+        Edition("tech", "TLDR", "Tech News Briefing"),
+        Edition("webdev", "TLDR Web Dev", "Web Dev News Briefing"),
+        Edition("infosec", "TLDR InfoSec", "InfoSec News Briefing"),
+        Edition("devops", "TLDR DevOps", "DevOps News Briefing"),
+        Edition("data", "TLDR Data", "Data News Briefing"),
+        Edition("founders", "TLDR Founders", "Founders News Briefing"),
+        Edition("product", "TLDR Product", "Product News Briefing"),
+        Edition("design", "TLDR Design", "Design News Briefing"),
+        Edition("marketing", "TLDR Marketing", "Marketing News Briefing"),
+        Edition("crypto", "TLDR Crypto", "Crypto News Briefing"),
+    )
+}
+
+
+def get_edition(slug: str = DEFAULT_EDITION) -> Edition:
+    """
+    Look up an edition by slug.
+    
+    Raises:
+        ValueError: If the edition is unknown
+    """
+    try:
+        return EDITIONS[slug.strip().lower()]
+    except KeyError:
+        known = ", ".join(sorted(EDITIONS))
+        raise ValueError(f"Unknown TLDR edition '{slug}'. Known editions: {known}") from None
+
+
+def configured_editions() -> List[Edition]:
+    """Return the editions enabled via ``NEWSLETTER_EDITIONS``."""
+    return [get_edition(slug) for slug in config.NEWSLETTER_EDITIONS if slug.strip()]
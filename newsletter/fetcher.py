@@ -1,25 +1,133 @@
-"""Functions for fetching newsletters from TLDR website."""
+"""
+Functions for fetching newsletters from TLDR website.
+
+Issue and archive requests bypass the per-domain circuit breaker: skipping
+them would make every date look missing until the cooldown ends.
+"""
 
 from __future__ import annotations
 
+import re
 from datetime import date
-from typing import Optional
+from typing import Optional, Set, Tuple
 
+from newsletter.editions import Edition, get_edition
 from utils.http import make_request
 
 
-def get_newsletter_url_for(target_date: date) -> Optional[str]:
-    """Return the TLDR AI newsletter URL for ``target_date`` if it exists."""
+# Answers that confirm an issue does not exist; anything else is inconclusive
+MISSING_STATUSES = (404, 410)
+
+
+class NewsletterNotFoundError(RuntimeError):
+    """Raised when no issue is published for the requested date."""
+
+
+class NewsletterUnavailableError(RuntimeError):
+    """Raised when the issue could not be checked (network error, 5xx, skipped request)."""
+
+
+def discover_issue_dates(edition: Optional[Edition] = None) -> Optional[Set[date]]:
+    """
+    Return every issue date listed on the edition's archive page.
+
+    One request replaces a probe per candidate date. Returns ``None`` when
+    the archive is unavailable or lists nothing, so callers can fall back
+    to probing.
+    """
+
+    edition = edition or get_edition()
+    response = make_request(edition.archive_url(), timeout=10, use_circuit=False)
+    if not response:
+        return None
+
+    pattern = rf"/{re.escape(edition.slug)}/(\d{{4}}-\d{{2}}-\d{{2}})"
+    found = set()
+    for date_str in re.findall(pattern, response.text):
+        try:
+            found.add(date.fromisoformat(date_str))
+        except ValueError:
+            continue
+
+    if not found:
+        print(f"WARNING: No issues found on the {edition.name} archive page.")
+        return None
+
+    print(f"Discovered {len(found)} {edition.name} issue(s) on the archive page.")
+    return found
+
+
+def fetch_newsletter_for(
+    target_date: date,
+    edition: Optional[Edition] = None,
+    timeout: float = 10,
+) -> Optional[Tuple[str, bytes]]:
+    """
+    Probe and download the issue for ``target_date`` in a single request.
+
+    Returns:
+        Tuple of (URL, raw HTML) if the issue exists, None if the site
+        confirmed it does not (a redirect or 404)
+
+    Raises:
+        NewsletterUnavailableError: If the request failed, so whether the
+            issue exists is unknown
+    """
+
+    edition = edition or get_edition()
+    date_str = target_date.strftime("%Y-%m-%d")
+    url = edition.url_for(target_date)
+
+    # Missing issues redirect elsewhere, so redirects are not followed
+    response = make_request(
+        url, timeout=timeout, allow_redirects=False, accept_statuses=MISSING_STATUSES, use_circuit=False,
+    )
+    if response is None:
+        raise NewsletterUnavailableError(f"Could not check the {edition.name} newsletter for {date_str}.")
+    if response.status_code == 200:
+        if not response.content:
+            raise NewsletterUnavailableError(f"The {edition.name} newsletter for {date_str} came back empty.")
+        print(f"Found {edition.name} newsletter for {date_str}.")
+        return url, response.content
+
+    print(f"No {edition.name} newsletter available for {date_str}.")
+    return None
+
+
+def probe_issue(target_date: date, edition: Optional[Edition] = None, timeout: float = 10) -> bool:
+    """
+    Cheaply check whether the issue for ``target_date`` is published yet.
+
+    A HEAD request without following redirects transfers no body: published
+    issues answer 200, unpublished ones redirect. If the HEAD request fails
+    (some servers reject it) the check is repeated as a GET that does not
+    follow the redirect.
+
+    Returns:
+        True if the issue is available
+    """
+
+    edition = edition or get_edition()
+    url = edition.url_for(target_date)
+    response = make_request(url, timeout=timeout, allow_redirects=False, method="HEAD", use_circuit=False)
+    if response is None:
+        response = make_request(url, timeout=timeout, allow_redirects=False, use_circuit=False)
+    return bool(response) and response.status_code == 200
+
+
+def get_newsletter_url_for(target_date: date, edition: Optional[Edition] = None) -> Optional[str]:
+    """Return the newsletter URL of ``edition`` (TLDR AI by default) for ``target_date`` if it exists."""
 
+    edition = edition or get_edition()
     date_str = target_date.strftime("%Y-%m-%d")
-    url = f"https://tldr.tech/ai/{date_str}"
+    url = edition.url_for(target_date)
 
     response = make_request(url, allow_redirects=False)
     if response and response.status_code == 200:
-        print(f"Found newsletter for {date_str}.")
+        print(f"Found {edition.name} newsletter for {date_str}.")
         return url
 
-    print(f"No newsletter available for {date_str}.")
+    print(f"No {edition.name} newsletter available for {date_str}.")
     return None
 
 def fetch_newsletter(url):
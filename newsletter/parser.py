@@ -1,7 +1,6 @@
 """Parser for TLDR newsletter content."""
 
 import re
-from bs4 import BeautifulSoup
 from config import NEWSLETTER_EXTRACT_MAX_CHARS
 from utils.text import truncate_text
 
@@ -15,6 +14,8 @@ class NewsletterParser:
         Args:
             html_content: Raw HTML content of the newsletter
         """
+        from bs4 import BeautifulSoup
+
         self.soup = BeautifulSoup(html_content, 'html.parser')
         self.content_text = None
         self._parse_content()
@@ -58,7 +59,7 @@ class NewsletterParser:
                     'facebook.com' not in href and 
                     'linkedin.com' not in href and
                     'subscribe' not in href.lower() and
-                    'utm_source=tldrai' in href):  # This suggests it's an article
+                    'utm_source=tldr' in href):  # This suggests it's an article (tldrai, tldrwebdev, ...)
                     
                     # Get text around link for context
                     surrounding_text = ""
@@ -93,5 +94,5 @@ class NewsletterParser:
         Returns:
             Date string in YYYY-MM-DD format or "Unknown date"
         """
-        match = re.search(r'/ai/(\d{4}-\d{2}-\d{2})$', url)
+        match = re.search(r'/[a-z0-9-]+/(\d{4}-\d{2}-\d{2})$', url)
         return match.group(1) if match else "Unknown date"
@@ -0,0 +1 @@
+"""Search package for the full-text index of past issues."""
@@ -0,0 +1,246 @@
+"""
+Full-text search over past newsletters, articles and briefings.
+
+Each processed date adds its newsletter text, extracted articles and default
+briefing to a SQLite FTS5 index. Documents are keyed by edition, date, kind
+and URL and carry a content hash, so re-running a date rewrites only what
+changed and costs one small transaction. Results are ranked with BM25, with
+titles weighted above bodies.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import html
+import re
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from utils.sqlite import connect
+
+KIND_NEWSLETTER = "newsletter"
+KIND_ARTICLE = "article"
+KIND_SUMMARY = "summary"
+KINDS = (KIND_NEWSLETTER, KIND_ARTICLE, KIND_SUMMARY)
+
+# BM25 weights of the title and body columns
+TITLE_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+
+# Words of context around the matches in a result snippet
+SNIPPET_WORDS = 16
+
+# Snippet markers around matched terms; control characters never occur in the text
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+
+TITLE_MAX_CHARS = 120
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    doc_key TEXT NOT NULL UNIQUE,
+    edition TEXT NOT NULL,
+    date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_date ON documents (edition, date);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, body, tokenize = 'porter unicode61 remove_diacritics 2'
+);
+"""
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+WORD_PATTERN = re.compile(r"\w+\*?", re.UNICODE)
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """One ranked search result."""
+
+    edition: str
+    date: str
+    kind: str
+    url: str
+    title: str
+    snippet: str
+    score: float
+
+    def snippet_text(self) -> str:
+        """Return the snippet with matches in square brackets."""
+        text = " ".join(self.snippet.split())
+        return text.replace(MATCH_START, "[").replace(MATCH_END, "]")
+
+    def snippet_html(self) -> str:
+        """Return the escaped snippet with matches wrapped in ``<mark>``."""
+        escaped = html.escape(self.snippet)
+        return escaped.replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>")
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """SQLite FTS5 index of every processed date."""
+
+    path: Path
+
+    def index_date(
+        self,
+        edition: str,
+        date_str: str,
+        newsletter_url: str = "",
+        newsletter_text: str = "",
+        articles: Sequence[Dict[str, str]] = (),
+        summary: str = "",
+    ) -> int:
+        """
+        Add or refresh the documents of one date.
+
+        Args:
+            edition: Edition slug
+            date_str: ISO date of the issue
+            newsletter_url: URL of the issue
+            newsletter_text: Parsed newsletter text
+            articles: Extracted articles with "url" and "content"
+            summary: Briefing of the default profile (HTML is stripped)
+
+        Returns:
+            Number of documents written; unchanged documents are skipped
+        """
+        documents = []
+        if newsletter_text:
+            documents.append((KIND_NEWSLETTER, newsletter_url, f"{edition} {date_str}", newsletter_text))
+        for article in articles:
+            if article.get("content"):
+                documents.append((KIND_ARTICLE, article["url"], _title_of(article["content"]), article["content"]))
+        if summary:
+            documents.append((KIND_SUMMARY, newsletter_url, f"Briefing {date_str}", _plain(summary)))
+
+        written = 0
+        keys = set()
+        with connect(self.path, SCHEMA) as conn:
+            for kind, url, title, body in documents:
+                doc_key = f"{edition}/{date_str}/{kind}/{url}"
+                keys.add(doc_key)
+                content_hash = hashlib.sha256(f"{title}\0{body}".encode("utf-8")).hexdigest()[:32]
+                row = conn.execute("SELECT id, hash FROM documents WHERE doc_key = ?", (doc_key,)).fetchone()
+                if row is not None and row[1] == content_hash:
+                    continue
+                if row is not None:
+                    conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (row[0],))
+                    conn.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+                cursor = conn.execute(
+                    "INSERT INTO documents (doc_key, edition, date, kind, url, title, hash) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (doc_key, edition, date_str, kind, url, title, content_hash),
+                )
+                conn.execute(
+                    "INSERT INTO documents_fts (rowid, title, body) VALUES (?, ?, ?)",
+                    (cursor.lastrowid, title, body),
+                )
+                written += 1
+
+            # Documents of a re-run date that are no longer part of it (e.g. articles
+            # dropped by a new selection) go, for the kinds this call supplied
+            kinds = {kind for kind, _, _, _ in documents}
+            stale = [
+                doc_id
+                for doc_id, doc_key, kind in conn.execute(
+                    "SELECT id, doc_key, kind FROM documents WHERE edition = ? AND date = ?", (edition, date_str)
+                )
+                if kind in kinds and doc_key not in keys
+            ]
+            for doc_id in stale:
+                conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+                conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+        return written
+
+    def search(
+        self,
+        query: str,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        edition: Optional[str] = None,
+        kind: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[SearchHit]:
+        """
+        Return the best matches for ``query``, most relevant first.
+
+        Every word must occur; a trailing ``*`` matches a prefix.
+
+        Args:
+            query: Search words
+            since: Only dates on or after this day
+            until: Only dates on or before this day
+            edition: Only this edition slug
+            kind: Only "newsletter", "article" or "summary" documents
+            limit: Maximum number of results
+        """
+        match = fts_query(query)
+        if not match or not self.path.exists():
+            return []
+
+        filters = ["documents_fts MATCH ?"]
+        params: List[object] = [match]
+        for clause, value in (
+            ("d.date >= ?", since.isoformat() if since else None),
+            ("d.date <= ?", until.isoformat() if until else None),
+            ("d.edition = ?", edition),
+            ("d.kind = ?", kind),
+        ):
+            if value:
+                filters.append(clause)
+                params.append(value)
+        params.append(limit)
+
+        with connect(self.path, SCHEMA) as conn:
+            rows = conn.execute(
+                "SELECT d.edition, d.date, d.kind, d.url, d.title, "
+                f"snippet(documents_fts, 1, ?, ?, ' … ', {SNIPPET_WORDS}), "
+                f"bm25(documents_fts, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score "
+                "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+                f"WHERE {' AND '.join(filters)} ORDER BY score LIMIT ?",
+                [MATCH_START, MATCH_END] + params,
+            ).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def count(self) -> int:
+        """Return the number of indexed documents."""
+        if not self.path.exists():
+            return 0
+        with connect(self.path, SCHEMA) as conn:
+            return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into a safe FTS5 query.
+
+    Each word is quoted, so punctuation and FTS5 operators in the input are
+    searched literally instead of raising a syntax error.
+    """
+    terms = []
+    for word in WORD_PATTERN.findall(text or ""):
+        prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+# Internal helpers -----------------------------------------------------------
+
+def _plain(text: str) -> str:
+    return " ".join(html.unescape(TAG_PATTERN.sub(" ", text)).split())
+
+
+def _title_of(content: str) -> str:
+    for line in content.splitlines():
+        line = line.strip()
+        if line:
+            return line[:TITLE_MAX_CHARS]
+    return ""
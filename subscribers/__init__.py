@@ -0,0 +1 @@
+"""Subscribers package for recipient profiles and grouping."""
@@ -0,0 +1,103 @@
+"""Per-subscriber topic profiles and grouping of equivalent profiles."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List
+
+# Topics a subscriber can restrict their briefing to
+TOPICS: Dict[str, str] = {
+    "research": "research papers, new models, benchmarks and scientific findings",
+    "infra": "AI infrastructure: chips, GPUs, cloud, data centers, training and inference systems",
+    "products": "product launches, new features and developer tools",
+    "business": "funding, acquisitions, partnerships and company strategy",
+    "policy": "regulation, safety, ethics and legal developments",
+    "open-source": "open-weight models and open-source projects",
+}
+
+
+@dataclass(frozen=True)
+class SubscriberProfile:
+    """Normalised topic selection; equal profiles share one summary."""
+
+    topics: FrozenSet[str] = frozenset()
+
+    @property
+    def key(self) -> str:
+        """Stable identifier used for grouping and caching."""
+        return "+".join(sorted(self.topics)) if self.topics else "all"
+
+    def topic_descriptions(self) -> List[str]:
+        """Return the prompt descriptions of the selected topics."""
+        return [TOPICS[topic] for topic in sorted(self.topics)]
+
+
+DEFAULT_PROFILE = SubscriberProfile()
+
+
+def make_profile(topics: Iterable[str]) -> SubscriberProfile:
+    """
+    Build a profile from raw topic names.
+    
+    Unknown topics are reported and ignored; selecting every topic is the
+    same as the default profile.
+    """
+    selected = set()
+    for topic in topics:
+        name = str(topic).strip().lower()
+        if not name:
+            continue
+        if name not in TOPICS:
+            print(f"WARNING: Unknown subscriber topic '{name}' ignored.")
+            continue
+        selected.add(name)
+
+    if selected == set(TOPICS):
+        return DEFAULT_PROFILE
+    return SubscriberProfile(frozenset(selected))
+
+
+def load_profiles(path: Path) -> Dict[str, SubscriberProfile]:
+    """
+    Load subscriber profiles from a JSON file.
+    
+    Format: ``{"<telegram user id>": {"topics": ["research", "infra"]}}``.
+    A missing or unreadable file means everyone gets the default profile;
+    a malformed entry is reported and that subscriber gets the default profile.
+    """
+    if not path.exists():
+        return {}
+
+    try:
+        with path.open("r", encoding="utf-8") as fh:
+            raw = json.load(fh)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"WARNING: Could not read subscriber profiles from {path}: {e}")
+        return {}
+
+    if not isinstance(raw, dict):
+        print(f"WARNING: Subscriber profiles in {path} must be a JSON object; using the default profile.")
+        return {}
+
+    profiles = {}
+    for user_id, entry in raw.items():
+        topics = entry.get("topics", []) if isinstance(entry, dict) else None
+        if not isinstance(topics, list):
+            print(f"WARNING: Invalid profile for subscriber {user_id} in {path}; using the default profile.")
+            continue
+        profiles[str(user_id).strip()] = make_profile(topics)
+    return profiles
+
+
+def group_by_profile(user_ids: Iterable[str], profiles: Dict[str, SubscriberProfile]) -> Dict[SubscriberProfile, List[str]]:
+    """Group recipients so each distinct profile needs only one summary."""
+    groups: Dict[SubscriberProfile, List[str]] = {}
+    for user_id in user_ids:
+        user_id = str(user_id).strip()
+        if not user_id:
+            continue
+        profile = profiles.get(user_id, DEFAULT_PROFILE)
+        groups.setdefault(profile, []).append(user_id)
+    return groups
@@ -0,0 +1,121 @@
+"""SQLite store of Telegram subscribers, kept current from bot updates."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+from utils.sqlite import connect
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscribers (
+    user_id INTEGER PRIMARY KEY,
+    active INTEGER NOT NULL,
+    updated TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bot_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+UPDATE_OFFSET_KEY = "update_offset"
+
+
+@dataclass(frozen=True)
+class SubscriberStore:
+    """Subscribers added by ``/start`` and deactivated by ``/stop``."""
+
+    path: Path
+
+    def subscribe(self, user_id: int) -> bool:
+        """Activate ``user_id``; return True if they were not subscribed yet."""
+        return self._set_active(user_id, True)
+
+    def unsubscribe(self, user_id: int) -> bool:
+        """Deactivate ``user_id``; return True if they were subscribed."""
+        return self._set_active(user_id, False)
+
+    def active_ids(self) -> array:
+        """
+        Return the active subscriber IDs as a sorted array of 64-bit ints.
+
+        An array stores 8 bytes per ID instead of a Python int object each,
+        so even a large audience is cheap to load at send time.
+        """
+        ids = array("q")
+        if not self.path.exists():
+            return ids
+        with connect(self.path, SCHEMA) as conn:
+            for (user_id,) in conn.execute("SELECT user_id FROM subscribers WHERE active = 1 ORDER BY user_id"):
+                ids.append(user_id)
+        return ids
+
+    def count(self) -> int:
+        """Return the number of active subscribers."""
+        if not self.path.exists():
+            return 0
+        with connect(self.path, SCHEMA) as conn:
+            return conn.execute("SELECT COUNT(*) FROM subscribers WHERE active = 1").fetchone()[0]
+
+    def update_offset(self) -> Optional[int]:
+        """Return the next Telegram update ID to fetch, or ``None`` before the first poll."""
+        if not self.path.exists():
+            return None
+        with connect(self.path, SCHEMA) as conn:
+            row = conn.execute("SELECT value FROM bot_state WHERE key = ?", (UPDATE_OFFSET_KEY,)).fetchone()
+        return int(row[0]) if row else None
+
+    def set_update_offset(self, offset: int) -> None:
+        """Remember that updates before ``offset`` have been handled."""
+        with connect(self.path, SCHEMA) as conn:
+            conn.execute(
+                "INSERT INTO bot_state (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (UPDATE_OFFSET_KEY, str(offset)),
+            )
+
+    # Internal helpers -------------------------------------------------
+    def _set_active(self, user_id: int, active: bool) -> bool:
+        with connect(self.path, SCHEMA) as conn:
+            row = conn.execute("SELECT active FROM subscribers WHERE user_id = ?", (user_id,)).fetchone()
+            if row is not None and bool(row[0]) == active:
+                return False
+            if row is None and not active:
+                return False
+            conn.execute(
+                "INSERT INTO subscribers (user_id, active, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET active = excluded.active, updated = excluded.updated",
+                (user_id, int(active), datetime.now().isoformat(timespec="seconds")),
+            )
+        return True
+
+
+def recipient_ids(store: SubscriberStore, static_ids: Iterable[str] = ()) -> array:
+    """
+    Return the sorted, de-duplicated IDs of everyone to send to.
+
+    Args:
+        store: Subscribers collected from bot updates
+        static_ids: IDs configured in ``TELEGRAM_USER_IDS``, always included
+
+    Returns:
+        Sorted array of Telegram user IDs
+    """
+    ids = store.active_ids()
+    extra = []
+    for user_id in static_ids:
+        user_id = str(user_id).strip()
+        if not user_id:
+            continue
+        value = int(user_id)
+        index = bisect_left(ids, value)
+        if index == len(ids) or ids[index] != value:
+            extra.append(value)
+    if extra:
+        ids = array("q", sorted(set(ids).union(extra)))
+    return ids
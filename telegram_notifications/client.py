@@ -1,13 +1,23 @@
 import asyncio
+import html
 import re
+from contextlib import asynccontextmanager
 
-from telegram.constants import ParseMode
-
-import telegram
+from config import TELEGRAM_API_BASE_URL, TELEGRAM_SEND_WORKERS
+from utils.metrics import incr
 
 # Telegram message length limit
 MAX_MESSAGE_LENGTH = 4096
 
+# Pause between the parts of a split message, to avoid rate limits
+CHUNK_DELAY_SECONDS = 0.5
+
+# Connections per bot session: one per delivery worker (concurrent recipients)
+BOT_POOL_SIZE = max(1, TELEGRAM_SEND_WORKERS)
+
+# Initialized once and reused by send_message while the daemon runs
+_shared_bot = None
+
 
 def clean_html_for_telegram(text: str) -> str:
     """
@@ -157,6 +167,94 @@ def split_message_smart(text: str, max_length: int = MAX_MESSAGE_LENGTH) -> list
     return chunks
 
 
+async def start_shared_bot(bot_token: str):
+    """
+    Open a long-lived bot session that ``send_message`` reuses.
+
+    One-shot runs open a session per message; the daemon keeps this one
+    warm instead of reconnecting (and calling getMe) for every recipient.
+    """
+    global _shared_bot
+    if _shared_bot is not None:
+        return
+    import telegram
+
+    request = telegram.request.HTTPXRequest(connection_pool_size=BOT_POOL_SIZE)
+    bot = telegram.Bot(token=bot_token, request=request, base_url=TELEGRAM_API_BASE_URL)
+    await bot.initialize()
+    _shared_bot = bot
+
+
+async def stop_shared_bot():
+    """Close the session opened by ``start_shared_bot``, if any."""
+    global _shared_bot
+    bot, _shared_bot = _shared_bot, None
+    if bot is not None:
+        await bot.shutdown()
+
+
+@asynccontextmanager
+async def bot_session(bot_token: str):
+    """Yield the shared bot for ``bot_token`` if one is open, else a short-lived one."""
+    if _shared_bot is not None and _shared_bot.token == bot_token:
+        yield _shared_bot
+        return
+    # Imported on first use, so runs with nothing to send skip the SDK
+    import telegram
+
+    request = telegram.request.HTTPXRequest(connection_pool_size=BOT_POOL_SIZE)
+    async with telegram.Bot(token=bot_token, request=request, base_url=TELEGRAM_API_BASE_URL) as bot:
+        yield bot
+
+
+def prepare_chunks(message_text: str) -> list[str]:
+    """
+    Clean a message and split it into the parts that are actually sent.
+
+    Parts of a split message carry a "Часть i из n" footer.
+    """
+    # Clean HTML to only include supported tags
+    cleaned_text = clean_html_for_telegram(message_text)
+
+    # Split message if it's too long
+    message_chunks = split_message_smart(cleaned_text)
+    if len(message_chunks) == 1:
+        return message_chunks
+
+    # Add part indicator if message was split
+    return [
+        chunk + f"\n\n<i>Часть {i + 1} из {len(message_chunks)}</i>"
+        for i, chunk in enumerate(message_chunks)
+    ]
+
+
+def plain_text_parts(chunk: str) -> list[str]:
+    """
+    Turn a prepared HTML part into plain-text parts.
+
+    Used when Telegram rejects a part's markup: the tags are dropped, entities
+    decoded and the text split again to fit the message limit.
+    """
+    text = html.unescape(re.sub(r'<[^>]+>', '', chunk))
+    return split_message_smart(text)
+
+
+async def send_chunk(bot, user_id: int, text: str, as_html: bool = True):
+    """Send one prepared part with an open bot session."""
+    from telegram.constants import ParseMode
+
+    try:
+        await bot.send_message(
+            chat_id=user_id,
+            text=text,
+            parse_mode=ParseMode.HTML if as_html else None
+        )
+    except Exception as e:
+        incr("telegram_errors_total", error=type(e).__name__)
+        raise
+    incr("telegram_messages_sent_total")
+
+
 async def send_message(user_id: int, message_text: str, bot_token: str):
     """
     Sends a message to a Telegram user.
@@ -167,31 +265,15 @@ async def send_message(user_id: int, message_text: str, bot_token: str):
         message_text: The message to send (can be longer than Telegram's limit).
         bot_token: The Telegram bot token.
     """
-    # Clean HTML to only include supported tags
-    cleaned_text = clean_html_for_telegram(message_text)
+    message_chunks = prepare_chunks(message_text)
 
-    # Split message if it's too long
-    message_chunks = split_message_smart(cleaned_text)
-
-    request = telegram.request.HTTPXRequest()
-    async with telegram.Bot(token=bot_token, request=request) as bot:
+    async with bot_session(bot_token) as bot:
         for i, chunk in enumerate(message_chunks):
-            # Add part indicator if message was split
-            if len(message_chunks) > 1:
-                part_info = f"\n\n<i>Часть {i + 1} из {len(message_chunks)}</i>"
-                chunk_with_info = chunk + part_info
-            else:
-                chunk_with_info = chunk
-
-            await bot.send_message(
-                chat_id=user_id,
-                text=chunk_with_info,
-                parse_mode=ParseMode.HTML
-            )
+            await send_chunk(bot, user_id, chunk)
 
             # Small delay between messages to avoid rate limits
             if i < len(message_chunks) - 1:
-                await asyncio.sleep(0.5)
+                await asyncio.sleep(CHUNK_DELAY_SECONDS)
 
 if __name__ == '__main__':
     # Example usage (for testing purposes)
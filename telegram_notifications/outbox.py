@@ -0,0 +1,384 @@
+"""
+Durable outbox for Telegram deliveries.
+
+Every message is stored once, already split into the parts that are sent,
+with one delivery row per recipient; each part is recorded as soon as
+Telegram accepts it. A failed send therefore only retries the parts that
+recipient has not received yet, and re-enqueueing the same message is a
+no-op, so nobody gets it twice.
+
+Deliveries are sent by ``TELEGRAM_SEND_WORKERS`` workers sharing one bot
+session and one rate limit (``TELEGRAM_MESSAGES_PER_SECOND``), which keeps
+large broadcasts inside Telegram's limits; a 429 pauses every worker for
+the requested time.
+
+A part Telegram rejects for its content (bad markup, too long) is resent
+once as plain text; if that is rejected as well, the delivery is marked
+rejected and reported, since retrying the same content cannot succeed.
+
+Deliveries may name a run state file and date to complete: once every
+delivery sharing them is sent, rejected or abandoned (the recipient blocked
+the bot or the chat is gone), that date is marked as done. A delivery that
+runs out of attempts for any other reason is marked failed and keeps its
+date from completing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import config
+from subscribers.store import SubscriberStore
+from telegram_notifications.client import CHUNK_DELAY_SECONDS, bot_session, plain_text_parts, send_chunk
+from utils.metrics import incr
+from utils.rate_limit import AsyncRateLimiter
+from utils.run_state import RunStateStore
+from utils.sqlite import connect
+
+STATUS_PENDING = "pending"
+STATUS_SENT = "sent"
+# Permanent failures (bot blocked, chat gone) are not retried
+STATUS_ABANDONED = "abandoned"
+# Content Telegram refuses even as plain text: not retried, reported
+STATUS_REJECTED = "rejected"
+# Out of attempts for another reason: not retried, and the run is not done
+STATUS_FAILED = "failed"
+
+# A part throttled this many times in a row counts as a failed attempt
+MAX_THROTTLED_SENDS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    batch TEXT PRIMARY KEY,
+    chunks TEXT NOT NULL,
+    completes_state TEXT,
+    completes_date TEXT,
+    created TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    key TEXT PRIMARY KEY,
+    batch TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    sent INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt TEXT NOT NULL,
+    last_error TEXT,
+    created TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS deliveries_due ON deliveries (status, next_attempt);
+CREATE INDEX IF NOT EXISTS deliveries_batch ON deliveries (batch);
+"""
+
+# Deliveries currently being sent in this process, so the retry loop and a
+# pipeline run never send the same delivery concurrently
+_in_flight = set()
+
+
+def delivery_key(batch: str, user_id: int) -> str:
+    """Return the idempotency key of one recipient's copy of a message."""
+    return f"{batch}:{user_id}"
+
+
+@dataclass(frozen=True)
+class DeliveryOutbox:
+    """SQLite store of per-recipient, per-part delivery status."""
+
+    path: Path
+
+    def enqueue(
+        self,
+        batch: str,
+        user_ids: Iterable[int],
+        chunks: List[str],
+        completes: Optional[Dict[str, str]] = None,
+    ) -> List[str]:
+        """
+        Queue ``chunks`` for every recipient and return the delivery keys.
+
+        Args:
+            batch: Identifies the message, e.g. "ai/2025-06-10/default"
+            user_ids: Telegram recipients
+            chunks: Message parts as returned by ``prepare_chunks``
+            completes: Optional {"state": run state path, "date": ISO date}
+                marked as run once all deliveries sharing it are done
+
+        Returns:
+            Keys of the deliveries; already queued ones are left untouched
+        """
+        now = _now()
+        rows = [
+            (delivery_key(batch, user_id), batch, int(user_id), STATUS_PENDING, now, now)
+            for user_id in user_ids
+        ]
+        completes = completes or {}
+        with connect(self.path, SCHEMA) as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO messages (batch, chunks, completes_state, completes_date, created) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (batch, json.dumps(chunks, ensure_ascii=False), completes.get("state"), completes.get("date"), now),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO deliveries (key, batch, user_id, status, next_attempt, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._prune(conn)
+        return [row[0] for row in rows]
+
+    def get(self, key: str) -> Optional[Dict[str, object]]:
+        """Return the delivery record for ``key``, or ``None``."""
+        with connect(self.path, SCHEMA) as conn:
+            row = conn.execute(
+                "SELECT d.batch, d.user_id, m.chunks, d.sent, d.status, d.attempts, d.next_attempt, "
+                "d.last_error, m.completes_state, m.completes_date "
+                "FROM deliveries d JOIN messages m ON m.batch = d.batch WHERE d.key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        batch, user_id, chunks, sent, status, attempts, next_attempt, last_error, state, day = row
+        return {
+            "batch": batch,
+            "user_id": user_id,
+            "chunks": json.loads(chunks),
+            "sent": sent,
+            "status": status,
+            "attempts": attempts,
+            "next_attempt": next_attempt,
+            "last_error": last_error,
+            "completes": {"state": state, "date": day} if state else None,
+        }
+
+    def due(self) -> List[str]:
+        """Return the keys of pending deliveries whose retry time has come."""
+        with connect(self.path, SCHEMA) as conn:
+            rows = conn.execute(
+                "SELECT key FROM deliveries WHERE status = ? AND next_attempt <= ? ORDER BY next_attempt",
+                (STATUS_PENDING, _now()),
+            ).fetchall()
+        return [key for (key,) in rows]
+
+    def mark_chunk_sent(self, key: str, index: int) -> None:
+        """Record that part ``index`` (and every part before it) reached the recipient."""
+        with connect(self.path, SCHEMA) as conn:
+            conn.execute(
+                "UPDATE deliveries SET sent = MAX(sent, ?), "
+                "status = CASE WHEN ? >= (SELECT json_array_length(chunks) FROM messages m "
+                "WHERE m.batch = deliveries.batch) THEN ? ELSE status END, "
+                "last_error = NULL WHERE key = ?",
+                (index + 1, index + 1, STATUS_SENT, key),
+            )
+
+    def mark_failed(self, key: str, error: Exception, final_status: Optional[str] = None) -> None:
+        """
+        Record a failed attempt and schedule the next one with exponential backoff.
+
+        ``final_status`` (abandoned or rejected) ends the delivery instead.
+        """
+        with connect(self.path, SCHEMA) as conn:
+            row = conn.execute("SELECT attempts FROM deliveries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            attempts = row[0] + 1
+            status = STATUS_PENDING
+            next_attempt = _now()
+            if final_status:
+                status = final_status
+            elif attempts >= config.OUTBOX_MAX_ATTEMPTS:
+                status = STATUS_FAILED
+            else:
+                delay = min(
+                    config.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+                    config.OUTBOX_RETRY_MAX_SECONDS,
+                )
+                next_attempt = (datetime.now() + timedelta(seconds=delay)).isoformat(timespec="seconds")
+            conn.execute(
+                "UPDATE deliveries SET attempts = ?, status = ?, next_attempt = ?, last_error = ? WHERE key = ?",
+                (attempts, status, next_attempt, f"{type(error).__name__}: {error}", key),
+            )
+
+    def is_done(self, completes: Dict[str, str]) -> bool:
+        """Return True if every delivery sharing ``completes`` is sent or abandoned."""
+        with connect(self.path, SCHEMA) as conn:
+            total, unfinished = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(d.status IN (?, ?)), 0) FROM deliveries d "
+                "JOIN messages m ON m.batch = d.batch "
+                "WHERE m.completes_state = ? AND m.completes_date = ?",
+                (STATUS_PENDING, STATUS_FAILED, completes["state"], completes["date"]),
+            ).fetchone()
+        return total > 0 and unfinished == 0
+
+    # Internal helpers -------------------------------------------------
+    def _prune(self, conn) -> None:
+        cutoff = (datetime.now() - timedelta(days=config.OUTBOX_RETENTION_DAYS)).isoformat(timespec="seconds")
+        conn.execute("DELETE FROM deliveries WHERE status != ? AND created < ?", (STATUS_PENDING, cutoff))
+        conn.execute(
+            "DELETE FROM messages WHERE created < ? AND batch NOT IN (SELECT DISTINCT batch FROM deliveries)",
+            (cutoff,),
+        )
+
+
+async def deliver(outbox: DeliveryOutbox, keys: List[str], bot_token: str) -> bool:
+    """
+    Send the parts each delivery has not received yet.
+
+    The keys are shared by ``TELEGRAM_SEND_WORKERS`` workers over one bot
+    session, paced together by ``TELEGRAM_MESSAGES_PER_SECOND``.
+
+    Returns:
+        True if every delivery is now sent or abandoned
+    """
+    queue = asyncio.Queue()
+    for key in keys:
+        queue.put_nowait(key)
+    limiter = AsyncRateLimiter(config.TELEGRAM_MESSAGES_PER_SECOND)
+    results = []
+
+    async with bot_session(bot_token) as bot:
+        async def worker():
+            while not queue.empty():
+                key = queue.get_nowait()
+                results.append(await _deliver_one(outbox, key, bot, limiter))
+
+        workers = max(1, min(config.TELEGRAM_SEND_WORKERS, len(keys)))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+    _complete_runs(outbox, keys)
+    return all(results)
+
+
+async def retry_due(outbox: DeliveryOutbox, bot_token: str) -> bool:
+    """Redeliver the failed parts of deliveries whose backoff has expired."""
+    if not outbox.path.exists():
+        return True
+    keys = outbox.due()
+    if not keys:
+        return True
+    print(f"Retrying {len(keys)} queued Telegram delivery(ies) from the outbox...")
+    incr("outbox_retries_total", len(keys))
+    return await deliver(outbox, keys, bot_token)
+
+
+async def retry_loop(outbox: DeliveryOutbox, bot_token: str, stop_event: asyncio.Event) -> None:
+    """Run ``retry_due`` every ``OUTBOX_RETRY_INTERVAL_SECONDS`` until ``stop_event`` is set."""
+    while not stop_event.is_set():
+        try:
+            await retry_due(outbox, bot_token)
+        except Exception as e:
+            print(f"ERROR in outbox retry: {e}")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=config.OUTBOX_RETRY_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+# Internal helpers -----------------------------------------------------------
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+async def _deliver_one(outbox: DeliveryOutbox, key: str, bot, limiter: AsyncRateLimiter) -> bool:
+    from telegram.error import BadRequest, Forbidden
+
+    if key in _in_flight:
+        return False
+    _in_flight.add(key)
+    try:
+        record = outbox.get(key)
+        if record is None or record["status"] != STATUS_PENDING:
+            return record is None or record["status"] != STATUS_FAILED
+
+        user_id = record["user_id"]
+        chunks = record["chunks"]
+        try:
+            for index in range(record["sent"], len(chunks)):
+                if index > record["sent"]:
+                    await asyncio.sleep(CHUNK_DELAY_SECONDS)
+                try:
+                    await _send_paced(bot, user_id, chunks[index], limiter)
+                except BadRequest as e:
+                    if _is_chat_gone(e):
+                        raise
+                    print(f"WARNING: Telegram rejected part {index + 1} for user {user_id} ({e}); "
+                          "resending it as plain text.")
+                    for part in plain_text_parts(chunks[index]):
+                        await _send_paced(bot, user_id, part, limiter, as_html=False)
+                outbox.mark_chunk_sent(key, index)
+        except (Forbidden, BadRequest) as e:
+            if not _is_chat_gone(e):
+                # The same content would be rejected again, so the delivery ends here
+                print(f"ERROR: Telegram rejected the message for user {user_id} even as plain text; "
+                      f"it was not delivered: {e}")
+                outbox.mark_failed(key, e, final_status=STATUS_REJECTED)
+                incr("outbox_rejected_total")
+                return True
+            print(f"Giving up on Telegram user {user_id}: {e}")
+            outbox.mark_failed(key, e, final_status=STATUS_ABANDONED)
+            incr("outbox_abandoned_total")
+            if isinstance(e, Forbidden):
+                _unsubscribe_blocked(user_id)
+            return True
+        except Exception as e:
+            print(f"Delivery to Telegram user {user_id} failed, will retry: {e}")
+            outbox.mark_failed(key, e)
+            return False
+        return True
+    finally:
+        _in_flight.discard(key)
+
+
+async def _send_paced(bot, user_id: int, text: str, limiter: AsyncRateLimiter, as_html: bool = True) -> None:
+    """Send one part within the shared rate limit, honouring Retry-After."""
+    from telegram.error import RetryAfter
+
+    for attempt in range(MAX_THROTTLED_SENDS):
+        await limiter.acquire()
+        try:
+            await send_chunk(bot, user_id, text, as_html)
+            return
+        except RetryAfter as e:
+            if attempt == MAX_THROTTLED_SENDS - 1:
+                raise
+            retry_after = e.retry_after
+            if isinstance(retry_after, timedelta):
+                retry_after = retry_after.total_seconds()
+            # Telegram's limit is per bot, so every worker waits
+            limiter.pause(retry_after)
+            incr("telegram_throttled_total")
+
+
+def _is_chat_gone(error: Exception) -> bool:
+    """Return True for errors no retry can fix: the bot is blocked or the chat no longer exists."""
+    from telegram.error import Forbidden
+
+    return isinstance(error, Forbidden) or "chat not found" in str(error).lower()
+
+
+def _unsubscribe_blocked(user_id: int) -> None:
+    """Stop sending to a subscriber who blocked the bot."""
+    path = Path(config.SUBSCRIBER_DB_FILE)
+    if path.exists() and SubscriberStore(path).unsubscribe(user_id):
+        print(f"Unsubscribed Telegram user {user_id}, who blocked the bot.")
+
+
+def _complete_runs(outbox: DeliveryOutbox, keys: List[str]) -> None:
+    """Mark run state dates whose deliveries are all finished."""
+    batches = sorted({key.rsplit(":", 1)[0] for key in keys})
+    targets = set()
+    with connect(outbox.path, SCHEMA) as conn:
+        for batch in batches:
+            row = conn.execute(
+                "SELECT completes_state, completes_date FROM messages WHERE batch = ?", (batch,)
+            ).fetchone()
+            if row and row[0]:
+                targets.add(row)
+    for state, day in sorted(targets):
+        if outbox.is_done({"state": state, "date": day}):
+            RunStateStore(Path(state)).mark_run(date.fromisoformat(day))
@@ -0,0 +1,135 @@
+"""
+Subscriber management from bot updates.
+
+``/start`` subscribes the sender, ``/stop`` unsubscribes them. Updates are
+fetched with long-polling (``getUpdates``); the offset of the last handled
+update is kept in the subscriber store, so each update is applied once even
+across restarts.
+"""
+
+import asyncio
+from pathlib import Path
+
+import config
+from subscribers.store import SubscriberStore
+from utils.metrics import incr
+
+WELCOME_TEXT = (
+    "Вы подписались на ежедневную сводку AI-новостей. "
+    "Отправьте /stop, чтобы отписаться."
+)
+GOODBYE_TEXT = "Вы отписались от рассылки. Отправьте /start, чтобы подписаться снова."
+
+# Pause after a failed poll before trying again
+POLL_ERROR_DELAY_SECONDS = 30
+
+
+def command_of(text: str) -> str:
+    """Return the bot command of a message, e.g. "/start" for "/start@my_bot ref"."""
+    if not text or not text.startswith("/"):
+        return ""
+    return text.split()[0].split("@")[0].lower()
+
+
+async def handle_update(store: SubscriberStore, bot, update) -> None:
+    """Apply one ``/start`` or ``/stop`` message to the store and confirm it."""
+    from telegram.error import TelegramError
+
+    message = update.message
+    if message is None or message.chat.type != "private":
+        return
+
+    command = command_of(message.text or "")
+    user_id = message.chat.id
+    if command == "/start":
+        if store.subscribe(user_id):
+            print(f"New Telegram subscriber {user_id}.")
+            incr("subscribers_changed_total", change="subscribe")
+        reply = WELCOME_TEXT
+    elif command == "/stop":
+        if store.unsubscribe(user_id):
+            print(f"Telegram subscriber {user_id} left.")
+            incr("subscribers_changed_total", change="unsubscribe")
+        reply = GOODBYE_TEXT
+    else:
+        return
+
+    try:
+        await bot.send_message(chat_id=user_id, text=reply)
+    except TelegramError as e:
+        # The subscription change stands even if the confirmation is lost
+        print(f"WARNING: Could not confirm {command} to {user_id}: {e}")
+
+
+async def sync_updates(store: SubscriberStore, bot, timeout: int = 0) -> int:
+    """
+    Fetch and apply one batch of updates.
+
+    Args:
+        store: Subscriber store, which also holds the update offset
+        bot: Initialised bot
+        timeout: Long-polling timeout in seconds (0 returns immediately)
+
+    Returns:
+        Number of updates handled
+    """
+    updates = await bot.get_updates(
+        offset=store.update_offset(), timeout=timeout, allowed_updates=["message"]
+    )
+    for update in updates:
+        try:
+            await handle_update(store, bot, update)
+        except Exception as e:
+            print(f"ERROR handling Telegram update {update.update_id}: {e}")
+    if updates:
+        store.set_update_offset(updates[-1].update_id + 1)
+    return len(updates)
+
+
+async def sync_subscribers(bot_token: str) -> int:
+    """Apply every pending ``/start``/``/stop`` update once; used before one-shot sends."""
+    store = SubscriberStore(Path(config.SUBSCRIBER_DB_FILE))
+    handled = 0
+    async with _polling_bot(bot_token) as bot:
+        while True:
+            count = await sync_updates(store, bot)
+            handled += count
+            if not count:
+                break
+    if handled:
+        print(f"Handled {handled} subscriber update(s); {store.count()} active subscriber(s).")
+    return handled
+
+
+async def poll_loop(bot_token: str, stop_event: asyncio.Event) -> None:
+    """Long-poll for subscriber updates until ``stop_event`` is set."""
+    store = SubscriberStore(Path(config.SUBSCRIBER_DB_FILE))
+    # A bot of its own, so the held getUpdates request never blocks a delivery
+    async with _polling_bot(bot_token) as bot:
+        while not stop_event.is_set():
+            poll = asyncio.create_task(sync_updates(store, bot, config.SUBSCRIBER_POLL_TIMEOUT_SECONDS))
+            stop = asyncio.create_task(stop_event.wait())
+            done, _ = await asyncio.wait({poll, stop}, return_when=asyncio.FIRST_COMPLETED)
+            if poll not in done:
+                # Shutting down: an update fetched now would be fetched again next start
+                poll.cancel()
+                await asyncio.gather(poll, return_exceptions=True)
+                break
+            stop.cancel()
+            try:
+                poll.result()
+            except Exception as e:
+                print(f"ERROR polling Telegram updates: {e}")
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=POLL_ERROR_DELAY_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+
+# Internal helpers -----------------------------------------------------------
+
+def _polling_bot(bot_token: str):
+    import telegram
+
+    request = telegram.request.HTTPXRequest()
+    return telegram.Bot(token=bot_token, request=request, base_url=config.TELEGRAM_API_BASE_URL)
@@ -0,0 +1,60 @@
+"""Time budgets propagated through the pipeline."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+class DeadlineExceededError(RuntimeError):
+    """Raised when there is no time left for a required step."""
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """An absolute point in time (monotonic clock) by which work must finish."""
+
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        """Return a deadline ``seconds`` from now."""
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """Return the seconds left, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, default: float, floor: float = 1.0) -> float:
+        """Return ``default`` capped by the remaining budget (at least ``floor``)."""
+        return max(floor, min(default, self.remaining()))
+
+    def slice(self, share: float, reserve: float = 0.0) -> "Deadline":
+        """
+        Return a child deadline covering ``share`` of the remaining budget.
+        
+        Args:
+            share: Fraction of the remaining time (0-1) given to the child
+            reserve: Seconds kept back for later steps before taking the share
+        """
+        usable = max(0.0, self.remaining() - reserve)
+        return Deadline(time.monotonic() + usable * share)
+
+    def check(self, step: str) -> None:
+        """
+        Raise if the deadline has passed before ``step`` could start.
+        
+        Raises:
+            DeadlineExceededError: If no time is left
+        """
+        if self.expired():
+            raise DeadlineExceededError(f"Time budget exhausted before {step}.")
+
+
+def timeout_from(deadline: Optional[Deadline], default: float) -> float:
+    """Return the timeout for a call, honouring ``deadline`` when one is set."""
+    return deadline.timeout(default) if deadline else default
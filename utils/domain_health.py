@@ -0,0 +1,175 @@
+"""Persistent per-domain latency/health statistics with circuit breaking."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List
+from urllib.parse import urlparse
+
+from config import (
+    CIRCUIT_COOLDOWN_HOURS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    DOMAIN_MAX_CONCURRENCY,
+    DOMAIN_MIN_TIMEOUT,
+)
+from utils.files import write_atomic
+
+# Number of recent requests kept per domain
+WINDOW = 50
+# Samples needed before the adaptive timeout replaces the default
+MIN_SAMPLES = 5
+
+
+def domain_of(url: str) -> str:
+    """Return the host of ``url`` without a leading ``www.``."""
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+@dataclass
+class DomainStats:
+    """Rolling statistics and breaker state of a single domain."""
+
+    latencies: List[float] = field(default_factory=list)
+    outcomes: List[bool] = field(default_factory=list)
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    concurrency: int = 1
+
+    def percentile(self, pct: float) -> float:
+        ordered = sorted(self.latencies)
+        rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class DomainHealthStore:
+    """
+    Track request outcomes per domain and act on them.
+    
+    - Timeouts adapt to each domain's observed p95 latency.
+    - Per-domain concurrency follows AIMD: +1 after a success, halved after
+      a failure.
+    - After ``CIRCUIT_FAILURE_THRESHOLD`` consecutive failures the circuit
+      opens and the domain is skipped for ``CIRCUIT_COOLDOWN_HOURS``; the
+      first request after the cooldown is a trial that closes or reopens it.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._stats: Dict[str, DomainStats] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._loaded = False
+
+    # Queries ----------------------------------------------------------
+    def is_open(self, domain: str) -> bool:
+        """Return True if requests to ``domain`` should currently be skipped."""
+        with self._lock:
+            stats = self._get(domain)
+            return stats.open_until > time.time()
+
+    def timeout_for(self, domain: str, default: float) -> float:
+        """Return a request timeout tuned to the domain's latency history."""
+        with self._lock:
+            stats = self._get(domain)
+            if len(stats.latencies) < MIN_SAMPLES:
+                return default
+            return max(DOMAIN_MIN_TIMEOUT, min(default, stats.percentile(95) * 3))
+
+    def health_score(self, domain: str) -> float:
+        """Return 0.0 (unfetchable) to 1.0 (healthy) for ranking sources."""
+        with self._lock:
+            stats = self._get(domain)
+            if stats.open_until > time.time():
+                return 0.0
+            return 1.0 - stats.error_rate
+
+    def summary(self, domain: str) -> Dict[str, float]:
+        """Return a printable snapshot of the domain's statistics."""
+        with self._lock:
+            stats = self._get(domain)
+            return {
+                "p50": stats.percentile(50) if stats.latencies else 0.0,
+                "p95": stats.percentile(95) if stats.latencies else 0.0,
+                "error_rate": stats.error_rate,
+                "concurrency": stats.concurrency,
+                "open": stats.open_until > time.time(),
+            }
+
+    # Updates ----------------------------------------------------------
+    @contextmanager
+    def slot(self, domain: str) -> Iterator[None]:
+        """Wait for a free request slot within the domain's concurrency limit."""
+        with self._changed:
+            while self._in_flight.get(domain, 0) >= self._get(domain).concurrency:
+                self._changed.wait()
+            self._in_flight[domain] = self._in_flight.get(domain, 0) + 1
+        try:
+            yield
+        finally:
+            with self._changed:
+                self._in_flight[domain] -= 1
+                self._changed.notify_all()
+
+    def record(self, domain: str, latency: float, ok: bool) -> None:
+        """Record the outcome of one request to ``domain``."""
+        with self._changed:
+            stats = self._get(domain)
+            stats.latencies = (stats.latencies + [round(latency, 3)])[-WINDOW:]
+            stats.outcomes = (stats.outcomes + [ok])[-WINDOW:]
+
+            if ok:
+                stats.consecutive_failures = 0
+                stats.open_until = 0.0
+                stats.concurrency = min(DOMAIN_MAX_CONCURRENCY, stats.concurrency + 1)
+            else:
+                stats.consecutive_failures += 1
+                stats.concurrency = max(1, stats.concurrency // 2)
+                if stats.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+                    stats.open_until = time.time() + CIRCUIT_COOLDOWN_HOURS * 3600
+                    print(f"Circuit opened for {domain} after {stats.consecutive_failures} failures.")
+            self._changed.notify_all()
+
+    # Persistence ------------------------------------------------------
+    def save(self) -> None:
+        """Persist the statistics so the next run starts informed."""
+        with self._lock:
+            if not self._loaded:
+                return
+            state = {domain: stats.__dict__ for domain, stats in self._stats.items()}
+
+        write_atomic(self.path, json.dumps(state, indent=2))
+
+    # Internal helpers -------------------------------------------------
+    def _get(self, domain: str) -> DomainStats:
+        # Caller must hold the lock
+        if not self._loaded:
+            self._load()
+        stats = self._stats.get(domain)
+        if stats is None:
+            stats = self._stats[domain] = DomainStats()
+        return stats
+
+    def _load(self) -> None:
+        self._loaded = True
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as fh:
+                raw = json.load(fh)
+            self._stats = {domain: DomainStats(**values) for domain, values in raw.items()}
+        except (json.JSONDecodeError, OSError, TypeError):
+            # Corrupted or unreadable state – start from scratch.
+            self._stats = {}
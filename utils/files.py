@@ -0,0 +1,36 @@
+"""File helpers shared by the caches and state stores."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Union
+
+
+def write_atomic(path: Path, data: Union[str, bytes]) -> None:
+    """
+    Replace ``path`` with ``data`` in one step.
+
+    The data goes to a uniquely named temporary file next to ``path`` that is
+    then renamed over it, so readers never see a half-written file and
+    concurrent writers of the same path never write into each other's file.
+
+    Args:
+        path: File to write; missing parent directories are created
+        data: Text (written as UTF-8) or bytes
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
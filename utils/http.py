@@ -1,6 +1,12 @@
 """HTTP utility functions for making requests."""
 
-import requests
+import threading
+import time
+from pathlib import Path
+
+from config import DOMAIN_HEALTH_FILE, HTTP_POOL_MAXSIZE
+from utils.domain_health import DomainHealthStore, domain_of
+from utils.metrics import incr, registry
 
 DEFAULT_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -8,7 +14,27 @@ DEFAULT_HEADERS = {
     'Accept-Language': 'en-US,en;q=0.5',
 }
 
-def make_request(url, timeout=10, allow_redirects=True, headers=None):
+# One connection pool shared by every fetch in the process (all editions),
+# created on first use so runs without fetches never import requests
+_session = None
+_session_lock = threading.Lock()
+
+# Shared per-domain statistics; main() persists them after each run
+domain_health = DomainHealthStore(Path(DOMAIN_HEALTH_FILE))
+
+# Responses that mean the domain won't serve us (404 is a healthy answer)
+UNHEALTHY_STATUS_CODES = {403, 429}
+
+def make_request(
+    url,
+    timeout=10,
+    allow_redirects=True,
+    headers=None,
+    method="GET",
+    accept_statuses=(),
+    use_circuit=True,
+    max_bytes=None,
+):
     """
     Make HTTP request with consistent error handling.
     
@@ -17,20 +43,81 @@ def make_request(url, timeout=10, allow_redirects=True, headers=None):
         timeout: Request timeout in seconds
         allow_redirects: Whether to follow redirects
         headers: Optional custom headers
+        method: "GET" or "HEAD"
+        accept_statuses: Error statuses returned as a response instead of
+            None, e.g. 404 when "not found" is a meaningful answer
+        use_circuit: Skip the request while the domain's circuit is open;
+            False for requests that must always be tried (newsletter issues)
+        max_bytes: Download at most this many bytes of the body; the rest
+            is never read and ``response.content`` holds the prefix
         
     Returns:
         Response content if successful, None otherwise
     """
+    domain = domain_of(url)
+    if use_circuit and domain_health.is_open(domain):
+        incr("http_skipped_total", reason="circuit_open")
+        print(f"Skipping {url}: circuit open for {domain}")
+        return None
+
+    timeout = domain_health.timeout_for(domain, timeout)
+    healthy = False
+    start = time.perf_counter()
     try:
         request_headers = headers or DEFAULT_HEADERS
-        response = requests.get(
-            url, 
-            headers=request_headers, 
-            timeout=timeout, 
-            allow_redirects=allow_redirects
-        )
-        response.raise_for_status()
+        with domain_health.slot(domain):
+            session = _get_session()
+            send = session.head if method == "HEAD" else session.get
+            response = send(
+                url, 
+                headers=request_headers, 
+                timeout=timeout, 
+                allow_redirects=allow_redirects,
+                stream=max_bytes is not None,
+            )
+            if max_bytes is not None:
+                _read_capped(response, max_bytes)
+        healthy = response.status_code < 500 and response.status_code not in UNHEALTHY_STATUS_CODES
+        incr("http_requests_total", status=response.status_code)
+        incr("http_response_bytes_total", len(response.content))
+        if response.status_code not in accept_statuses:
+            response.raise_for_status()
         return response
     except Exception as e:
+        incr("http_errors_total", error=type(e).__name__)
         print(f"Error requesting {url}: {e}")
         return None
+    finally:
+        elapsed = time.perf_counter() - start
+        domain_health.record(domain, elapsed, healthy)
+        registry.observe("http_request_duration_seconds", elapsed)
+
+def _read_capped(response, max_bytes):
+    """Read at most ``max_bytes`` of a streamed body and release the connection."""
+    body = bytearray()
+    try:
+        for piece in response.iter_content(chunk_size=min(max_bytes, 64 * 1024)):
+            body += piece
+            if len(body) >= max_bytes:
+                break
+    finally:
+        response.close()
+    # What ``response.content`` returns from now on
+    response._content = bytes(body[:max_bytes])
+    response._content_consumed = True
+
+def _get_session():
+    global _session
+    if _session is not None:
+        return _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_MAXSIZE, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
@@ -0,0 +1,171 @@
+"""Lightweight spans, counters and Prometheus-text export for the pipeline."""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import METRICS_JSON_LOGS
+from utils.files import write_atomic
+
+# Histogram buckets in seconds, from a fast HTTP probe up to a long LLM call
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_current_span: ContextVar[Optional[str]] = ContextVar("current_span", default=None)
+
+# Called with (stage, entering) around every span, e.g. by ``utils.profiling``
+_span_listeners: List[Callable[[str, bool], None]] = []
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    """Thread-safe in-process store of counters and latency histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, List[float]]] = {}
+
+    def incr(self, name: str, value: float = 1, **labels) -> None:
+        """Add ``value`` to the counter ``name``."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Record a latency observation in the histogram ``name``."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            # Bucket counts followed by sum and count
+            values = series.setdefault(key, [0.0] * (len(LATENCY_BUCKETS) + 2))
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    values[i] += 1
+            values[-2] += seconds
+            values[-1] += 1
+
+    def reset(self) -> None:
+        """Drop all recorded values."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, values in sorted(series.items()):
+                    for bound, count in zip(LATENCY_BUCKETS, values):
+                        le = 'le="%g"' % bound
+                        lines.append(f"{name}_bucket{_format_labels(key, le)} {count:g}")
+                    le = 'le="+Inf"'
+                    lines.append(f"{name}_bucket{_format_labels(key, le)} {values[-1]:g}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {values[-2]:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {values[-1]:g}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        """Atomically write the Prometheus text file to ``path``."""
+        write_atomic(path, self.render_prometheus())
+
+
+# Shared registry used by the whole process
+registry = MetricsRegistry()
+
+
+def log_event(event: str, **fields) -> None:
+    """Emit one structured JSON log line on stderr, keeping stdout for the CLI's own output."""
+    if not METRICS_JSON_LOGS:
+        return
+
+    record = {"ts": round(time.time(), 3), "event": event}
+    record.update(fields)
+    print(json.dumps(record, ensure_ascii=False, default=str), file=sys.stderr)
+
+
+def incr(name: str, value: float = 1, **labels) -> None:
+    """Add ``value`` to a counter in the shared registry."""
+    registry.incr(name, value, **labels)
+
+
+def add_span_listener(listener: Callable[[str, bool], None]) -> None:
+    """Call ``listener(stage, entering)`` when any span starts or ends."""
+    _span_listeners.append(listener)
+
+
+def remove_span_listener(listener: Callable[[str, bool], None]) -> None:
+    """Stop calling a listener added with ``add_span_listener``."""
+    if listener in _span_listeners:
+        _span_listeners.remove(listener)
+
+
+@contextmanager
+def span(stage: str, **fields) -> Iterator[Dict[str, object]]:
+    """
+    Time a pipeline stage.
+    
+    Records ``stage_duration_seconds`` and ``stage_errors_total`` and emits a
+    JSON log line when the stage ends. The yielded dict can be used to attach
+    extra fields (counts, sizes) to that log line.
+    
+    Args:
+        stage: Stage name, e.g. "fetch" or "summarize"
+        fields: Extra fields for the log line
+    """
+    parent = _current_span.get()
+    token = _current_span.set(stage)
+    attributes: Dict[str, object] = dict(fields)
+    status = "ok"
+    for listener in tuple(_span_listeners):
+        listener(stage, True)
+    start = time.perf_counter()
+    try:
+        yield attributes
+    except BaseException as exc:
+        status = "error"
+        attributes["error"] = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        for listener in tuple(_span_listeners):
+            listener(stage, False)
+        _current_span.reset(token)
+        registry.observe("stage_duration_seconds", duration, stage=stage)
+        if status == "error":
+            registry.incr("stage_errors_total", stage=stage)
+        log_event(
+            "span",
+            stage=stage,
+            parent=parent,
+            status=status,
+            duration_ms=round(duration * 1000, 1),
+            **attributes,
+        )
@@ -0,0 +1,110 @@
+"""
+Process pool for CPU-bound HTML parsing.
+
+BeautifulSoup parsing is pure Python, so threads that fetch pages
+concurrently still parse them one at a time under the GIL. ``ParsePool``
+ships raw HTML bytes to worker processes and gets compact results back
+(text and link dictionaries), never soup objects, so the pickling cost
+stays proportional to the output rather than the parse tree.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import config
+from articles.extractor import extract_from_html
+from newsletter.parser import NewsletterParser
+
+
+@dataclass(frozen=True)
+class ParsedNewsletter:
+    """The parts of a newsletter page the pipeline needs."""
+
+    text: str
+    date: str
+    links: List[Dict[str, str]]
+
+
+def parse_newsletter_html(html, url: str) -> ParsedNewsletter:
+    """Parse a newsletter page into text, issue date and candidate links."""
+    parser = NewsletterParser(html)
+    return ParsedNewsletter(
+        text=parser.get_newsletter_text(),
+        date=parser.extract_date(url),
+        links=parser.extract_links(),
+    )
+
+
+class ParsePool:
+    """Run HTML parsing in worker processes, or inline with one worker."""
+
+    def __init__(self, workers: int):
+        """
+        Initialize the pool; worker processes start on first use.
+        
+        Args:
+            workers: Number of worker processes; 1 or less parses inline
+        """
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._disabled = workers <= 1
+        self._inline = False
+        self._lock = threading.Lock()
+
+    def parse_newsletter(self, html, url: str) -> ParsedNewsletter:
+        """Parse a newsletter page (see ``parse_newsletter_html``)."""
+        return self._run(parse_newsletter_html, html, url)
+
+    def extract_article(self, html, max_chars=None) -> Optional[str]:
+        """Extract the main text of an article page (see ``extract_from_html``)."""
+        return self._run(extract_from_html, html, max_chars)
+
+    def set_inline(self, inline: bool) -> None:
+        """Parse in the calling thread, e.g. so the profiler sees the parsing."""
+        self._inline = inline
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; the pool restarts them if used again."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    # Internal helpers -------------------------------------------------
+
+    def _run(self, func, *args):
+        executor = None if self._inline else self._get_executor()
+        if executor is None:
+            return func(*args)
+        try:
+            return executor.submit(func, *args).result()
+        except BrokenProcessPool:
+            print("WARNING: Parse worker died; restarting the pool and parsing inline.")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            return func(*args)
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self._executor is None and not self._disabled:
+                try:
+                    # Forking a process that already runs threads can deadlock
+                    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context(method),
+                    )
+                except (OSError, NotImplementedError) as e:
+                    # e.g. AWS Lambda has no /dev/shm for process semaphores
+                    print(f"WARNING: Process pool unavailable ({e}); parsing inline.")
+                    self._disabled = True
+            return self._executor
+
+
+# Shared across editions and dates for the lifetime of the process
+parse_pool = ParsePool(config.PARSE_WORKERS)
@@ -0,0 +1,273 @@
+"""
+Opt-in sampling profiler and per-stage memory snapshots.
+
+While a ``Profiler`` runs, a background thread samples the Python stack of
+every thread at a fixed interval and attributes each sample to the pipeline
+stage (``span``) that thread is in. ``tracemalloc`` traces allocations and a
+snapshot is taken whenever the last open span of a profiled stage closes,
+so each stage's retained allocations can be read as the difference to the
+previous snapshot of the same section (usually one date).
+
+Output under ``<output_dir>``:
+
+* ``cpu.folded``: collapsed stacks ("section;stage;frame;... count") for
+  flamegraph.pl, speedscope or inferno
+* ``memory-<section>.txt``: peak traced memory and the top allocation sites
+  per stage of each section
+
+Samples are wall-clock: Python cannot read another thread's CPU clock, so a
+stage blocked on the network shows up as its waiting frame.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import config
+from utils.metrics import add_span_listener, remove_span_listener
+
+# Stages whose memory is snapshotted; every stage is sampled
+PROFILED_STAGES = ("fetch", "parse", "select", "extract", "summarize", "send")
+
+# Allocation sites listed per stage in a memory report
+TOP_ALLOCATIONS = 15
+
+NO_SECTION = "run"
+NO_STAGE = "(no stage)"
+
+_current_section: ContextVar[str] = ContextVar("profile_section", default=NO_SECTION)
+
+
+class Profiler:
+    """Sampling stack profiler with tracemalloc snapshots per stage."""
+
+    def __init__(self, output_dir: Path, interval_seconds: float = 0.005, tracemalloc_frames: int = 1):
+        """
+        Initialize the profiler; nothing is recorded before ``start``.
+
+        Args:
+            output_dir: Directory the reports are written to
+            interval_seconds: Time between two stack samples
+            tracemalloc_frames: Frames stored per traced allocation
+        """
+        self.output_dir = output_dir
+        self.interval_seconds = interval_seconds
+        self.tracemalloc_frames = tracemalloc_frames
+        self.samples: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Open (section, stage) pairs per thread, innermost last
+        self._stages: Dict[int, List[Tuple[str, str]]] = {}
+        self._open: Counter = Counter()
+        self._section_peaks: Dict[str, int] = {}
+        self._snapshots: Dict[str, tracemalloc.Snapshot] = {}
+        self._reports: Dict[str, List[Tuple[str, int, List[tracemalloc.StatisticDiff]]]] = {}
+        self._started_tracemalloc = False
+
+    def start(self) -> None:
+        """Start sampling and tracing allocations."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.tracemalloc_frames)
+            self._started_tracemalloc = True
+        self._snapshots[NO_SECTION] = _take_snapshot()
+        add_span_listener(self._on_span)
+        self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Path:
+        """
+        Stop profiling and write the reports.
+
+        Returns:
+            The output directory
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        remove_span_listener(self._on_span)
+        self._finish_section(NO_SECTION)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with (self.output_dir / "cpu.folded").open("w", encoding="utf-8") as fh:
+            for stack, count in sorted(self.samples.items()):
+                fh.write(f"{stack} {count}\n")
+        for section, stages in self._reports.items():
+            path = self.output_dir / f"memory-{_file_safe(section)}.txt"
+            path.write_text(self._format_memory(section, stages), encoding="utf-8")
+        return self.output_dir
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        """
+        Report memory of the block separately, e.g. for one date.
+
+        The section follows the context into ``asyncio.to_thread`` and the
+        pipeline's thread pools. Allocations of sections that run at the
+        same time (several editions) show up in each other's differences.
+        """
+        token = _current_section.set(name)
+        with self._lock:
+            self._snapshots[name] = _take_snapshot()
+            tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._finish_section(name)
+            _current_section.reset(token)
+
+    def format_stage_summary(self) -> str:
+        """Return the share of samples per stage, most sampled first."""
+        per_stage: Counter = Counter()
+        for stack, count in self.samples.items():
+            per_stage[stack.split(";")[1]] += count
+        total = sum(per_stage.values()) or 1
+        lines = ["Samples per stage:"]
+        for stage, count in per_stage.most_common():
+            lines.append(f"  {stage:<20} {count:>7} {count * 100 / total:>6.1f}%")
+        return "\n".join(lines)
+
+    # Internal helpers -------------------------------------------------
+    def _on_span(self, stage: str, entering: bool) -> None:
+        entry = (_current_section.get(), stage)
+        thread_id = threading.get_ident()
+        with self._lock:
+            stages = self._stages.setdefault(thread_id, [])
+            if entering:
+                stages.append(entry)
+                self._open[entry] += 1
+                return
+            # Tasks of one event loop can close spans out of order
+            for index in range(len(stages) - 1, -1, -1):
+                if stages[index] == entry:
+                    del stages[index]
+                    break
+            self._open[entry] -= 1
+            if stage in PROFILED_STAGES and self._open[entry] <= 0:
+                # Concurrent spans of a stage (parallel extraction) share one snapshot
+                self._snapshot_stage(*entry)
+
+    def _snapshot_stage(self, section: str, stage: str) -> None:
+        snapshot = _take_snapshot()
+        previous = self._snapshots.get(section)
+        if previous is not None:
+            diff = snapshot.compare_to(previous, "lineno")
+            retained = sum(stat.size_diff for stat in diff)
+            self._reports.setdefault(section, []).append((stage, retained, diff[:TOP_ALLOCATIONS]))
+        self._snapshots[section] = snapshot
+
+    def _finish_section(self, section: str) -> None:
+        self._section_peaks[section] = tracemalloc.get_traced_memory()[1]
+        self._snapshots.pop(section, None)
+
+    def _sample_loop(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            frames = sys._current_frames()
+            with self._lock:
+                innermost = {thread_id: open_stages[-1] for thread_id, open_stages in self._stages.items() if open_stages}
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                if thread_id not in innermost and thread_id != threading.main_thread().ident:
+                    # Idle pool workers would drown the stages in wait frames
+                    continue
+                section, stage = innermost.get(thread_id, (NO_SECTION, NO_STAGE))
+                self.samples[f"{section};{stage};{_collapse(frame)}"] += 1
+
+    def _format_memory(self, section: str, stages: List[Tuple[str, int, List[tracemalloc.StatisticDiff]]]) -> str:
+        peak = self._section_peaks.get(section, 0)
+        lines = [f"Memory of {section}: peak traced {peak / 1024 / 1024:.1f} MiB", ""]
+        for stage, retained, diff in stages:
+            lines.append(f"{stage}: {retained / 1024:+.1f} KiB retained; top allocation sites:")
+            for stat in diff:
+                frame = stat.traceback[0]
+                lines.append(
+                    f"  {stat.size_diff / 1024:>+10.1f} KiB {stat.count_diff:>+8} blocks  "
+                    f"{frame.filename}:{frame.lineno}"
+                )
+            lines.append("")
+        return "\n".join(lines)
+
+
+_active: Optional[Profiler] = None
+
+
+@contextmanager
+def profiling(scope: str, enabled: bool = True) -> Iterator[Optional[Profiler]]:
+    """
+    Profile the block if ``enabled`` and write the reports when it ends.
+
+    Args:
+        scope: Name of the run, used in the output directory name
+        enabled: Run the block unprofiled when False
+
+    Yields:
+        The running profiler, or ``None``
+    """
+    global _active
+    if not enabled or _active is not None:
+        # Profiles of overlapping web requests would mix their samples
+        yield None
+        return
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    profiler = Profiler(
+        Path(config.PROFILE_DIR) / f"{stamp}-{scope}",
+        interval_seconds=config.PROFILE_SAMPLE_INTERVAL_MS / 1000,
+        tracemalloc_frames=config.PROFILE_TRACEMALLOC_FRAMES,
+    )
+    _active = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        _active = None
+        output_dir = profiler.stop()
+        print(profiler.format_stage_summary())
+        print(f"Profile written to {output_dir} (flamegraph input: cpu.folded).")
+
+
+@contextmanager
+def profile_section(name: str) -> Iterator[None]:
+    """Report memory of the block separately if a profiler runs; otherwise do nothing."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    with profiler.section(name):
+        yield
+
+
+# Internal helpers -----------------------------------------------------------
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    # The profiler's own bookkeeping is not part of any stage
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+
+
+def _collapse(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _file_safe(name: str) -> str:
+    return "".join(char if char.isalnum() or char in "-_." else "_" for char in name)
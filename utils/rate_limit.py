@@ -0,0 +1,59 @@
+"""Thread-safe and asyncio request rate limiting."""
+
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Space calls evenly so that at most ``per_minute`` happen per minute."""
+
+    def __init__(self, per_minute):
+        """
+        Initialize the limiter.
+        
+        Args:
+            per_minute: Maximum calls per minute (0 or less disables limiting)
+        """
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the caller may issue its request."""
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._next_slot - now)
+            self._next_slot = max(now, self._next_slot) + self.interval
+
+        if wait:
+            time.sleep(wait)
+
+
+class AsyncRateLimiter:
+    """Space coroutine calls evenly to at most ``per_second``, shared by many workers."""
+
+    def __init__(self, per_second):
+        """
+        Initialize the limiter.
+        
+        Args:
+            per_second: Maximum calls per second (0 or less disables limiting)
+        """
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next_slot = 0.0
+
+    async def acquire(self):
+        """Wait until the caller may issue its request."""
+        now = time.monotonic()
+        wait = max(0.0, self._next_slot - now)
+        self._next_slot = max(now, self._next_slot) + self.interval
+        if wait:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold back every caller for ``seconds``, e.g. after a 429 with Retry-After."""
+        self._next_slot = max(self._next_slot, time.monotonic() + seconds)
@@ -4,10 +4,12 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Dict
 
+from utils.files import write_atomic
+
 
 @dataclass(frozen=True)
 class RunStateStore:
@@ -27,6 +29,30 @@ class RunStateStore:
         dates[target_date.isoformat()] = True
         self._write_state(state)
 
+    def mark_missing(self, target_date: date, ttl: timedelta) -> None:
+        """Remember that no issue exists for ``target_date`` for ``ttl``."""
+        state = self._read_state()
+        missing: Dict[str, str] = state.setdefault("missing", {})
+        missing[target_date.isoformat()] = (datetime.now() + ttl).isoformat(timespec="seconds")
+        self._write_state(state)
+
+    def clear_missing(self, target_date: date) -> None:
+        """Forget a negative cache entry, e.g. once the issue has been seen."""
+        state = self._read_state()
+        if state.get("missing", {}).pop(target_date.isoformat(), None) is not None:
+            self._write_state(state)
+
+    def is_known_missing(self, target_date: date) -> bool:
+        """Return True if ``target_date`` is cached as missing and the entry has not expired."""
+        state = self._read_state()
+        expires = state.get("missing", {}).get(target_date.isoformat())
+        if not expires:
+            return False
+        try:
+            return datetime.fromisoformat(expires) > datetime.now()
+        except ValueError:
+            return False
+
     def get_last_run_date(self) -> date | None:
         """Return the most recent recorded run date, or ``None`` if unavailable."""
         state = self._read_state()
@@ -62,10 +88,4 @@ class RunStateStore:
             return {}
 
     def _write_state(self, state: Dict[str, Dict[str, bool]]) -> None:
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
-
-        with tmp_path.open("w", encoding="utf-8") as fh:
-            json.dump(state, fh, ensure_ascii=False, indent=2)
-
-        tmp_path.replace(self.path)
+        write_atomic(self.path, json.dumps(state, ensure_ascii=False, indent=2))
@@ -0,0 +1,36 @@
+"""Shared SQLite connection handling for the local stores."""
+
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def connect(path: Path, schema: str = ""):
+    """
+    Open ``path``, make sure ``schema`` exists and commit on success.
+
+    WAL mode lets readers run while a delivery records progress, and
+    ``synchronous=NORMAL`` keeps each small commit cheap.
+
+    Args:
+        path: Database file, created with its parent directory if missing
+        schema: ``CREATE ... IF NOT EXISTS`` statements run on every open
+
+    Yields:
+        An open ``sqlite3.Connection``
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if schema:
+            conn.executescript(schema)
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
@@ -0,0 +1,81 @@
+"""File-backed caches of generated summaries."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from utils.files import write_atomic
+
+
+@dataclass(frozen=True)
+class SummaryCache:
+    """Store one summary per edition, date and subscriber profile."""
+
+    base_dir: Path
+
+    def path_for(self, edition: str, date_str: str, profile_key: str) -> Path:
+        """Return the file holding the summary for the given keys."""
+        return self.base_dir / edition / date_str / f"{profile_key}.html"
+
+    def get(self, edition: str, date_str: str, profile_key: str) -> Optional[str]:
+        """Return the cached summary, or ``None`` if it was never generated."""
+        return _read(self.path_for(edition, date_str, profile_key))
+
+    def put(self, edition: str, date_str: str, profile_key: str, summary: str) -> None:
+        """Persist ``summary`` atomically."""
+        write_atomic(self.path_for(edition, date_str, profile_key), summary)
+
+    def profiles(self, edition: str, date_str: str) -> List[str]:
+        """Return the profile keys with a stored summary for the given date."""
+        return sorted(path.stem for path in (self.base_dir / edition / date_str).glob("*.html"))
+
+    def get_json(self, edition: str, date_str: str, name: str) -> Optional[object]:
+        """Return a JSON artefact stored next to the summaries, or ``None``."""
+        text = _read(self.base_dir / edition / date_str / f"{name}.json")
+        if text is None:
+            return None
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return None
+
+    def put_json(self, edition: str, date_str: str, name: str, data: object) -> None:
+        """Persist a JSON artefact (e.g. article excerpts) next to the summaries."""
+        write_atomic(
+            self.base_dir / edition / date_str / f"{name}.json",
+            json.dumps(data, ensure_ascii=False, indent=2),
+        )
+
+
+@dataclass(frozen=True)
+class ArticleSummaryCache:
+    """Store one map-step summary per article URL and content version."""
+
+    base_dir: Path
+
+    def path_for(self, url: str, content: str) -> Path:
+        """Return the file for ``url``; edited articles get a new content hash."""
+        url_key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        content_key = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+        return self.base_dir / url_key / f"{content_key}.txt"
+
+    def get(self, url: str, content: str) -> Optional[str]:
+        """Return the cached article summary, or ``None``."""
+        return _read(self.path_for(url, content))
+
+    def put(self, url: str, content: str, summary: str) -> None:
+        """Persist ``summary`` atomically."""
+        write_atomic(self.path_for(url, content), summary)
+
+
+# Internal helpers -----------------------------------------------------------
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        return None
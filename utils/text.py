@@ -19,3 +19,21 @@ def truncate_text(text, max_length, suffix="... [content truncated]"):
         return text
         
     return text[:max_length] + suffix
+
+def estimate_tokens(text):
+    """
+    Roughly estimate the number of LLM tokens in a text.
+    
+    Uses the common ~4 characters per token heuristic, which is close
+    enough for comparing prompt sizes without calling the API.
+    
+    Args:
+        text: Text to measure
+    
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+        
+    return max(1, len(text) // 4)
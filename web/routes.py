@@ -3,11 +3,21 @@ Route definitions for the AI News Briefing web interface.
 Minimal version with essential functionality.
 """
 
-from flask import render_template
+from datetime import date
+
+from flask import Response, abort, redirect, render_template, request
 from web import app
 import main
 from ai.client import AIClient
+from ai.usage import usage_run
+from archive.static import INDEX_PAGE
+from newsletter.editions import EDITIONS, get_edition
+from newsletter.fetcher import NewsletterNotFoundError
 from utils.content import sanitize_ai_content
+from utils.metrics import registry, span
+from utils.deadline import Deadline
+from utils.profiling import profiling
+import config
 
 @app.route('/')
 def index():
@@ -16,14 +26,25 @@ def index():
 
 @app.route('/generate')
 def generate_briefing():
-    """Generate a news briefing and display it."""
+    """Serve the latest briefing from the archive, or generate it and display it."""
     try:
-        # Use existing main.py functionality with web-friendly AI client
-        ai_client = AIClient(web_mode=True)
-        
-        # Get newsletter data and create summary
-        newsletter_data = main.collect_newsletter_data(ai_client)
-        raw_summary = main.create_summary(newsletter_data, ai_client)
+        archive = main.briefing_archive()
+        if archive is not None:
+            page = main.latest_archived_page(archive)
+            if page is not None:
+                # The dated URL is the one browsers can cache
+                return redirect('archive/' + page[:-len('.html')])
+
+        with profiling("web", config.PROFILE_REQUESTS), \
+                span("handler", route="/generate", runtime="flask"), usage_run("web"):
+            # Use existing main.py functionality with web-friendly AI client
+            ai_client = AIClient(web_mode=True)
+            deadline = Deadline.after(config.WEB_TIME_BUDGET_SECONDS)
+            
+            # Get newsletter data and create summary
+            newsletter_data = main.collect_latest_newsletter_data(ai_client, deadline=deadline)
+            raw_summary = main.create_summary(newsletter_data, ai_client, deadline=deadline)
+        main.archive_briefing(newsletter_data, raw_summary)
         
         # Clean and sanitize the AI-generated content
         summary = sanitize_ai_content(raw_summary)
@@ -39,3 +60,89 @@ def generate_briefing():
         
     except Exception as e:
         return render_template('error.html', error=str(e))
+
+@app.route('/archive/')
+def archive_index():
+    """Serve the list of archived briefings."""
+    archive = main.briefing_archive()
+    if archive is not None:
+        cached = serve_archived(archive, INDEX_PAGE)
+        if cached is not None:
+            return cached
+    return render_template('archive_index.html', editions=[])
+
+@app.route('/archive/<edition>/<date_str>')
+def archived_briefing(edition, date_str):
+    """Serve an archived briefing; a missing recent date of a configured edition is generated live."""
+    try:
+        target_date = date.fromisoformat(date_str)
+    except ValueError:
+        abort(404)
+    if edition not in EDITIONS or target_date > date.today():
+        abort(404)
+
+    archive = main.briefing_archive()
+    if archive is not None:
+        cached = serve_archived(archive, archive.page_name(edition, date_str))
+        if cached is not None:
+            return cached
+    if not main.can_generate_live(edition, target_date):
+        abort(404)
+
+    try:
+        with profiling("web", config.PROFILE_REQUESTS), \
+                span("handler", route="/archive", runtime="flask"), usage_run("web"):
+            ai_client = AIClient(web_mode=True)
+            deadline = Deadline.after(config.WEB_TIME_BUDGET_SECONDS)
+            newsletter_data = main.collect_newsletter_data(
+                ai_client, target_date, get_edition(edition), deadline=deadline
+            )
+            raw_summary = main.create_summary(newsletter_data, ai_client, deadline=deadline)
+        main.archive_briefing(newsletter_data, raw_summary)
+    except NewsletterNotFoundError as e:
+        return render_template('error.html', error=str(e)), 404
+    except Exception as e:
+        return render_template('error.html', error=str(e))
+
+    return render_template(
+        'result.html',
+        summary=sanitize_ai_content(raw_summary),
+        date=newsletter_data.get('date', ''),
+        newsletter_url=newsletter_data.get('url', ''),
+        article_links=newsletter_data.get('article_links', []),
+        back_url='../'
+    )
+
+@app.route('/search')
+def search():
+    """Search past newsletters, articles and briefings."""
+    query = request.args.get('q', '').strip()
+    since_str = request.args.get('since', '').strip()
+    try:
+        since = date.fromisoformat(since_str) if since_str else None
+    except ValueError:
+        return render_template('error.html', error=f"Invalid date: {since_str}"), 400
+
+    index = main.search_index()
+    hits = index.search(query, since=since, limit=config.SEARCH_RESULT_LIMIT) if index and query else []
+    return render_template('search.html', query=query, since=since_str, hits=hits)
+
+@app.route('/metrics')
+def metrics():
+    """Expose pipeline metrics in the Prometheus text format."""
+    return Response(registry.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+def serve_archived(archive, name):
+    """Answer from the archive with a 200 or 304, or return None if the page is missing."""
+    static = archive.respond(
+        name,
+        accept_encoding=request.headers.get('Accept-Encoding', ''),
+        if_none_match=request.headers.get('If-None-Match', ''),
+    )
+    if static is None:
+        return None
+    # The body is already encoded; Flask must pass it through untouched
+    response = Response(static.body, status=static.status)
+    response.headers.clear()
+    response.headers.update(static.headers)
+    return response